@@ -37,7 +37,7 @@ help() {
   echo
   echo "[input parameters]"
   echo "./pipeline.sh <stage1> <stageN> --branch=<branch_name>"
-  echo "avaliable stages: build validate_full specs diagrams confluence"
+  echo "avaliable stages: build validate_full specs diagrams confluence pipeline"
   echo
   echo "[examples]"
   echo "example #1 (execute all stages for the develop branch):"
@@ -49,6 +49,9 @@ help() {
   echo "example #3 (execute some stages for the specific branch):"
   echo "./pipeline.sh specs --branch=release-2021-04-14"
   echo
+  echo "example #4 (execute validate, specs, diagrams and confluence stages in one container):"
+  echo "./pipeline.sh build pipeline"
+  echo
   echo
 }
 
@@ -106,6 +109,15 @@ stage_confluence_validate() {
   info "STAGE[${stage}]: done"
 }
 
+stage_pipeline() {
+  stage="pipeline"
+  LEAST_ONE=1
+  info "STAGE[${stage}]: starting..."
+  export git_branch=$BRANCH_NAME && export pipeline_stages="validate,specs,diagrams,confluence" && docker-compose up pipeline_runner pipeline_runner # --exit-code-from
+  check_command_result_code "STAGE[${stage}]: failed."
+  info "STAGE[${stage}]: done"
+}
+
 execute_stages() {
   for stage in "$@"; do
     case "$stage" in
@@ -128,6 +140,10 @@ execute_stages() {
       stage_confluence
       continue
       ;;
+    "pipeline")
+      stage_pipeline
+      continue
+      ;;
     "validate")
       stage_build
       stage_specs
@@ -0,0 +1,188 @@
+import copy
+from typing import Dict, List, Optional, Tuple
+
+from data.confluence.api.property import PropertyKey
+from data.confluence.model.page import ConfluencePage
+
+
+class FakeApiPage:
+    """In-memory pages storage with the interface of ApiPage."""
+
+    __pages: Dict[str, dict]
+
+    __titles: Dict[Tuple[str, str], str]
+
+    __last_id: int
+
+    def __init__(self):
+        self.__pages = {}
+        self.__titles = {}
+        self.__last_id = 0
+        self.requests_cnt = 0
+
+    def add_root_page(self, title: str, space_key: str) -> ConfluencePage:
+        page = ConfluencePage()
+        page.title = title
+        page.space_key = space_key
+        page.body = ""
+        self.__store(page.row_content)
+        return page
+
+    def __store(self, row_content: dict) -> dict:
+        if 'id' not in row_content:
+            self.__last_id += 1
+            row_content['id'] = str(self.__last_id)
+            row_content['version'] = {'number': 1}
+        row_content = copy.deepcopy(row_content)
+        self.__pages[row_content['id']] = row_content
+        self.__titles[(row_content['space']['key'], row_content['title'])] = row_content['id']
+        return row_content
+
+    def __page(self, page_id: str) -> Optional[ConfluencePage]:
+        if page_id not in self.__pages:
+            return None
+        return ConfluencePage(copy.deepcopy(self.__pages[page_id]))
+
+    @property
+    def pages_cnt(self) -> int:
+        return len(self.__pages)
+
+    async def find(self, page_title: str, space_key: str) -> Optional[ConfluencePage]:
+        self.requests_cnt += 1
+        page_id = self.__titles.get((space_key, page_title))
+        return None if page_id is None else self.__page(page_id)
+
+    async def create(self, page: ConfluencePage) -> dict:
+        self.requests_cnt += 1
+        row_content = self.__store(page.row_content)
+        return {'id': row_content['id']}
+
+    async def update(self, page: ConfluencePage) -> dict:
+        self.requests_cnt += 1
+        page.version = self.__pages[page.id]['version']['number'] + 1
+        page.status = "current"
+        self.__store(page.row_content)
+        return {'id': page.id}
+
+    async def delete(self, page_id: str) -> dict:
+        self.requests_cnt += 1
+        for page in await self.childs(page_id):
+            await self.delete(page.id)
+        row_content = self.__pages.pop(page_id, None)
+        if row_content is not None:
+            self.__titles.pop((row_content['space']['key'], row_content['title']), None)
+        return {}
+
+    async def get(self, page_id: str) -> dict:
+        self.requests_cnt += 1
+        return copy.deepcopy(self.__pages.get(page_id))
+
+    async def get_page(self, page_id: str, expand="body.storage") -> Optional[ConfluencePage]:
+        self.requests_cnt += 1
+        return self.__page(page_id)
+
+    async def add_labels_to_page(self, page_id: str, labels: List['str']) -> dict:
+        return {}
+
+    async def version(self, page_id: str) -> int:
+        self.requests_cnt += 1
+        return self.__pages[page_id]['version']['number']
+
+    async def childs(self, page_id: str, start=0, limit=500) -> List[ConfluencePage]:
+        self.requests_cnt += 1
+        childs = [self.__page(e['id']) for e in self.__pages.values()
+                  if e.get('ancestors') and e['ancestors'][0]['id'] == page_id]
+        return childs[start:start + limit]
+
+
+class FakeApiAttachment:
+
+    __attachments: Dict[Tuple[str, str], dict]
+
+    def __init__(self):
+        self.__attachments = {}
+        self.uploaded_bytes = 0
+
+    def __upload(self, page_id: str, local_file_name: str, confluence_file_name: str, attachment_id: str) -> dict:
+        with open(local_file_name, 'rb') as f:
+            self.uploaded_bytes += len(f.read())
+        attachment = {'id': attachment_id, 'title': confluence_file_name}
+        self.__attachments[(page_id, confluence_file_name)] = attachment
+        return {'results': [attachment]}
+
+    async def create(self, page_id: str, local_file_name: str, confluence_file_name: str) -> dict:
+        attachment_id = "att{}".format(len(self.__attachments) + 1)
+        return self.__upload(page_id, local_file_name, confluence_file_name, attachment_id)
+
+    async def update(self, page_id: str, attachment_id: str, local_file_name: str, confluence_file_name: str) -> dict:
+        return self.__upload(page_id, local_file_name, confluence_file_name, attachment_id)
+
+    async def get(self, page_id: str, confluence_file_name: str) -> Optional[dict]:
+        return self.__attachments.get((page_id, confluence_file_name))
+
+    async def get_all(self, page_id: str, start=0, limit=200) -> Optional[dict]:
+        results = [e for (e_page_id, _), e in self.__attachments.items() if e_page_id == page_id]
+        return results[start:start + limit] or None
+
+    async def download(self, paget_id: str, attachment_title: str) -> bytes:
+        return b""
+
+
+class FakeApiProperty:
+
+    __properties: Dict[Tuple[str, str], str]
+
+    def __init__(self):
+        self.__properties = {}
+
+    async def get(self, page_id: str, key: PropertyKey) -> Optional[str]:
+        return self.__properties.get((page_id, key.value))
+
+    async def set(self, page_id, key: PropertyKey, value: str) -> dict:
+        self.__properties[(page_id, key.value)] = value
+        return {'key': key.value, 'value': value}
+
+    async def version(self, page_id: str, key: PropertyKey) -> Optional[int]:
+        return 1 if (page_id, key.value) in self.__properties else None
+
+    async def create(self, page_id, key: PropertyKey, value: str) -> dict:
+        return await self.set(page_id, key, value)
+
+    async def delete(self, page_id, key: PropertyKey) -> dict:
+        self.__properties.pop((page_id, key.value), None)
+        return {}
+
+
+class FakeApiUser:
+
+    async def get_key(self, username: str) -> Optional[str]:
+        return "key-{}".format(username.replace(" ", "-"))
+
+
+class FakeConfluenceService:
+    """Replaces ConfluenceService in benchmarks, so only the pages rendering is measured."""
+
+    def __init__(self):
+        self.__users = FakeApiUser()
+        self.__pages = FakeApiPage()
+        self.__attachments = FakeApiAttachment()
+        self.__properties = FakeApiProperty()
+
+    @property
+    def users(self) -> FakeApiUser:
+        return self.__users
+
+    @property
+    def pages(self) -> FakeApiPage:
+        return self.__pages
+
+    @property
+    def attachments(self) -> FakeApiAttachment:
+        return self.__attachments
+
+    @property
+    def properties(self) -> FakeApiProperty:
+        return self.__properties
+
+    async def release(self):
+        pass
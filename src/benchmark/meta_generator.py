@@ -0,0 +1,261 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import shutil
+from typing import Dict, List
+
+import yaml
+
+DEFAULT_TEMPLATE_META_PATH = os.path.dirname(__file__) + "/../../meta"
+
+
+class SyntheticMetaGenerator:
+    """
+    Generates a synthetic meta repository: settings.yaml, specifications/<category>.yaml and
+    schema/definitions.yaml. Diagrams templates and json schemas are copied from the template meta.
+
+    Storage category gets kafka, activemq and celery (redis) brokers and databases, external category gets s3
+    services, other product categories get application services. Producers own topics, consumers choose topics
+    by the zipf-like distribution, so some topics have the large fan-out.
+    """
+
+    product_categories = ["feature", "observability", "storage"]
+
+    external_categories = ["external"]
+
+    statuses = ["ready"] * 8 + ["develop", "deprecated"]
+
+    languages = ["golang", "cplus", "python", "typescript"]
+
+    __services_cnt: int
+
+    __random: random.Random
+
+    __template_meta_path: str
+
+    __specs: Dict[str, Dict[str, dict]]
+
+    __teams: Dict[str, dict]
+
+    def __init__(self, services_cnt: int, seed: int = 0, template_meta_path: str = DEFAULT_TEMPLATE_META_PATH):
+        self.__services_cnt = services_cnt
+        self.__random = random.Random(seed)
+        self.__template_meta_path = template_meta_path
+        self.__specs = {category: {} for category in self.product_categories + self.external_categories}
+        self.__teams = {}
+
+    @property
+    def storage_category(self) -> str:
+        return "storage"
+
+    @property
+    def app_categories(self) -> List[str]:
+        return [e for e in self.product_categories if e != self.storage_category]
+
+    def __status(self) -> str:
+        return self.__random.choice(self.statuses)
+
+    def __team(self) -> dict:
+        return self.__teams["team_{}".format(self.__random.randrange(len(self.__teams)))]
+
+    def __zipf_index(self, cnt: int) -> int:
+        # zipf (s=1) like: P(index < k) = ln(k + 1) / ln(cnt + 1), the first items are the most popular
+        return min(int(math.exp(self.__random.random() * math.log(cnt + 1))) - 1, cnt - 1)
+
+    def __base_spec(self, category: str, service_type: str, state: str) -> dict:
+        return {
+            "desc": "synthetic {} service".format(service_type),
+            "src": "https://github.com/example/synthetic",
+            "module": category,
+            "owner": "Roman Shafeev",
+            "status": self.__status(),
+            "state": state,
+            "type": service_type,
+        }
+
+    def __generate_brokers_and_storages(self, cnt: Dict[str, int]) -> Dict[str, List[str]]:
+        storage = self.__specs[self.storage_category]
+        names = {"kafka": [], "activemq": [], "redis": [], "db": [], "s3": []}
+        for i in range(cnt["kafka"]):
+            spec = self.__base_spec(self.storage_category, "kafka", "stateful")
+            spec["status"] = "ready"
+            spec["topics"] = {}
+            names["kafka"].append("kafka-{}".format(i))
+            storage[names["kafka"][-1]] = spec
+        for i in range(cnt["activemq"]):
+            spec = self.__base_spec(self.storage_category, "activemq", "stateful")
+            spec["status"] = "ready"
+            names["activemq"].append("activemq-{}".format(i))
+            storage[names["activemq"][-1]] = spec
+        for i in range(cnt["redis"]):
+            spec = self.__base_spec(self.storage_category, "db", "stateful")
+            spec["status"] = "ready"
+            names["redis"].append("redis-{}".format(i))
+            storage[names["redis"][-1]] = spec
+        for i in range(cnt["db"]):
+            spec = self.__base_spec(self.storage_category, "db", "stateful")
+            spec["databases"] = {"db_{}".format(i): {"desc": "synthetic database"}}
+            spec["dev_team"] = [self.__team()]
+            names["db"].append("postgresql-{}".format(i))
+            storage[names["db"][-1]] = spec
+        for i in range(cnt["s3"]):
+            category = self.external_categories[i % len(self.external_categories)]
+            names["s3"].append("s3-{}".format(i))
+            self.__specs[category][names["s3"][-1]] = {"name": names["s3"][-1], "module": "external",
+                                                       "status": "ready", "type": "s3"}
+        return names
+
+    def __generate_apps(self, apps_cnt: int, names: Dict[str, List[str]]):
+        topics = []
+        queues = []
+        tasks = []
+        apps = []
+        for i in range(apps_cnt):
+            category = self.app_categories[i % len(self.app_categories)]
+            service_name = "{}-service-{}".format(category, i)
+            spec = self.__base_spec(category, "grpc_api", "stateless")
+            spec["language"] = self.__random.choice(self.languages)
+            spec["dev_team"] = [self.__team()]
+            if self.__random.random() < 0.1:
+                spec["nodes"] = ["{}-node-{}".format(service_name, j) for j in range(self.__random.randint(1, 3))]
+            spec["interfaces"] = {"grpc": {"protocol": "grpc"}}
+            connect_to = []
+            # consumed topics of the previous services, the popular ones are chosen more often
+            if topics and self.__random.random() < 0.8:
+                consumed = {}
+                for _ in range(self.__random.randint(1, 3)):
+                    consumed.setdefault(topics[self.__zipf_index(len(topics))], None)
+                for topic_kafka_name, topic_name in consumed:
+                    connect_to.append({"name": topic_kafka_name, "data_direction": "rx", "offset_storage": "kafka",
+                                       "protocol": "kafka", "transport": "tcp",
+                                       "topics": {topic_name: None}})
+            # own topics
+            kafka_name = self.__random.choice(names["kafka"])
+            own_topics = {}
+            for j in range(self.__random.randint(1, 2)):
+                topic_name = "{}.topic-{}".format(service_name, j)
+                own_topics[topic_name] = {"desc": "synthetic topic", "protocol": "protobuf"}
+                topics.append((kafka_name, topic_name))
+            connect_to.append({"name": kafka_name, "data_direction": "tx", "protocol": "kafka", "transport": "tcp",
+                               "topics": own_topics})
+            if queues and self.__random.random() < 0.2:
+                queue = queues[self.__zipf_index(len(queues))]
+                connect_to.append({"name": queue[0], "data_direction": "rx", "protocol": "amqp", "transport": "tcp",
+                                   "queues": {queue[1]: None}})
+            if names["activemq"] and self.__random.random() < 0.2:
+                queue = (self.__random.choice(names["activemq"]), "{}.queue".format(service_name))
+                queues.append(queue)
+                connect_to.append({"name": queue[0], "data_direction": "tx", "protocol": "amqp", "transport": "tcp",
+                                   "queues": {queue[1]: {"desc": "synthetic queue"}}})
+            if tasks and self.__random.random() < 0.2:
+                task = tasks[self.__zipf_index(len(tasks))]
+                connect_to.append({"name": task[0], "data_direction": "tx", "protocol": "redis", "transport": "tcp",
+                                   "celery_tasks": {task[1]: None}})
+            if names["redis"] and self.__random.random() < 0.2:
+                task = (self.__random.choice(names["redis"]), "{}.task".format(service_name))
+                tasks.append(task)
+                connect_to.append({"name": task[0], "data_direction": "rx", "protocol": "redis", "transport": "tcp",
+                                   "celery_tasks": {task[1]: {"desc": "synthetic task"}}})
+            if names["db"] and self.__random.random() < 0.5:
+                connect_to.append({"name": self.__random.choice(names["db"]), "data_direction": "rx_tx",
+                                   "protocol": "pg", "transport": "tcp"})
+            if names["s3"] and self.__random.random() < 0.1:
+                connect_to.append({"name": self.__random.choice(names["s3"]), "data_direction": "tx",
+                                   "protocol": "http", "transport": "tcp"})
+            if apps and self.__random.random() < 0.5:
+                connect_to.append({"name": apps[self.__zipf_index(len(apps))], "data_direction": "tx",
+                                   "protocol": "grpc", "transport": "tcp"})
+            spec["connect_to"] = connect_to
+            apps.append(service_name)
+            self.__specs[category][service_name] = spec
+
+    def generate(self):
+        teams_cnt = self.__services_cnt // 25 + 1
+        self.__teams = {"team_{}".format(i): {"name": "Team {}".format(i), "lead": "Roman Shafeev"}
+                        for i in range(teams_cnt)}
+        cnt = {
+            "kafka": max(1, self.__services_cnt // 200),
+            "activemq": max(1, self.__services_cnt // 500),
+            "redis": max(1, self.__services_cnt // 500),
+            "db": max(1, self.__services_cnt // 20),
+            "s3": max(1, self.__services_cnt // 500),
+        }
+        names = self.__generate_brokers_and_storages(cnt)
+        self.__generate_apps(max(1, self.__services_cnt - sum(cnt.values())), names)
+
+    def settings(self) -> dict:
+        categories = self.product_categories + self.external_categories
+        return {
+            "categories": {
+                "product": {e: None for e in self.product_categories},
+                "external": {e: None for e in self.external_categories},
+            },
+            "confluence": {
+                "link": "https://confluence.example.com/display",
+                "space": "SYNTHETIC",
+                "handbook_page": "Services Handbook",
+                "system_diagram_page_title": "{handbook} system diagram",
+                "modules": {e: {"label": "{}-service".format(e), "title": e} for e in categories},
+            },
+            "markdown_template_vars": {"some_var": "some_value"},
+        }
+
+    def definitions(self) -> dict:
+        return {
+            "teams": self.__teams,
+            "status": {e: e for e in ["ready", "develop", "decommission", "deprecated", "draft"]},
+            "layers": {},
+            "type": {e: e for e in ["db", "elasticsearch", "jaeger", "grpc_api", "kafka", "otlp_agent", "s3"]},
+            "state": {"stateful": "stateful", "stateless": "stateless"},
+            "data_direction": {"rx": "rx", "tx": "tx", "rx_tx": "rx_tx"},
+        }
+
+    @staticmethod
+    def __dump(data: dict, fname: str):
+        with open(fname, 'w') as f:
+            yaml.safe_dump(data, f, sort_keys=False, default_flow_style=False)
+
+    def save(self, meta_path: str):
+        os.makedirs(meta_path + "/specifications/schema", exist_ok=True)
+        self.__dump(self.settings(), meta_path + "/settings.yaml")
+        self.__dump({"definitions": self.definitions()}, meta_path + "/specifications/schema/definitions.yaml")
+        for category, specs in self.__specs.items():
+            self.__dump({category: specs}, meta_path + "/specifications/{}.yaml".format(category))
+        template_schema_path = self.__template_meta_path + "/specifications/schema"
+        for schema_name in ("service.json", "third_party.json"):
+            schema_fname = template_schema_path + "/" + schema_name
+            output_schema_fname = meta_path + "/specifications/schema/" + schema_name
+            if os.path.isfile(schema_fname):
+                shutil.copyfile(schema_fname, output_schema_fname)
+                continue
+            # the generated specs have no third_party services, the validator only needs the schema to exist
+            logging.warning("Schema '{}' is not found in the template meta, a permissive schema is written".format(
+                schema_name))
+            with open(output_schema_fname, 'w') as f:
+                json.dump({"type": "object"}, f)
+        shutil.copytree(self.__template_meta_path + "/diagrams", meta_path + "/diagrams", dirs_exist_ok=True)
+
+    @property
+    def services_cnt(self) -> int:
+        return sum(len(e) for e in self.__specs.values())
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="synthetic meta repository generator")
+    args_parser.add_argument("-o", "--output", dest="output", help="output meta path", required=True)
+    args_parser.add_argument("--services", dest="services", type=int, default=1000, required=False)
+    args_parser.add_argument("--seed", dest="seed", type=int, default=0, required=False)
+    args_parser.add_argument("--template_meta_path", dest="template_meta_path",
+                             default=DEFAULT_TEMPLATE_META_PATH, required=False)
+    args = args_parser.parse_args()
+    generator = SyntheticMetaGenerator(args.services, args.seed, args.template_meta_path)
+    generator.generate()
+    generator.save(args.output)
+    print("{} services were generated to '{}'".format(generator.services_cnt, args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import cssutils
+import yaml
+
+sys.path.append(os.path.dirname(__file__) + "/../confluence_publisher/src")
+
+from benchmark.fake_confluence import FakeConfluenceService
+from benchmark.meta_generator import SyntheticMetaGenerator
+from core.config.loader import ConfigurationLoader
+from core.git.branch import Branch
+from core.git.specs_repo import GitSpecsRepositoryHelper
+from core.specs.specs import ServicesSpecs
+from core.specs.validate.specs_validator import SpecsValidator
+from core.specs.watcher import SpecsWatcher
+from core.yaml import read_yaml
+from data.template.templates_storage import HtmlTemplatesStorage
+from diagrams_generator.builder import DiagramsBuilder
+from diagrams_generator.diagrams.styles_wrapper import StylesWrapper, StyleSelector
+from diagrams_generator.diagrams.template import XmlTemplate
+from diagrams_generator.generator.generator import Generator
+from diagrams_generator.generator.service.service_network_generator import ServiceNetworkGenerator
+from diagrams_generator.generator.service.service_style_selector import ServiceStyleSelector
+from pipeline_runner.app import generate_specs
+from publisher import PagesPublisher
+from specs_generator.generator import SpecsGenerator
+
+DEFAULT_CONFIG = os.path.dirname(__file__) + "/../pipeline_runner/config/base.yaml"
+
+DEFAULT_HTML_TEMPLATES_PATH = os.path.dirname(__file__) + "/../confluence_publisher/res/template-onprem"
+
+DEFAULT_BASELINE = os.path.dirname(__file__) + "/baseline.json"
+
+
+class StagesBenchmark:
+    """
+    Times the pipeline stages against a synthetic meta repository.
+    Per-service stages (service diagrams, confluence pages) are measured on the evenly spaced sample of services.
+    The watch stage times a one-service edit as pipeline_runner --watch handles it, with the warm caches.
+    """
+
+    __meta_path: str
+
+    __output_path: str
+
+    __configuration: dict
+
+    __branch: Branch
+
+    __sample_cnt: int
+
+    __results: Dict[str, dict]
+
+    __services_specs: Optional[ServicesSpecs]
+
+    __watcher: SpecsWatcher
+
+    __builder: DiagramsBuilder
+
+    def __init__(self, meta_path: str, output_path: str, configuration: dict, sample_cnt: int):
+        self.__meta_path = meta_path
+        self.__output_path = output_path
+        self.__configuration = configuration
+        self.__branch = Branch("develop")
+        self.__sample_cnt = sample_cnt
+        self.__results = {}
+        self.__services_specs = None
+
+    @property
+    def topics_info_fname(self) -> str:
+        return GitSpecsRepositoryHelper.topics_info_fname()
+
+    def __sample(self) -> List[str]:
+        services = [name for name, spec in self.__services_specs.available_services.items()
+                    if spec.service_module != 'external']
+        step = max(1, len(services) // self.__sample_cnt)
+        return services[::step][:self.__sample_cnt]
+
+    async def __measure(self, name: str, func: Callable, **extra):
+        ts = time.monotonic()
+        result = {}
+        try:
+            ret = func()
+            if asyncio.iscoroutine(ret):
+                ret = await ret
+            if isinstance(ret, dict):
+                result.update(ret)
+        except Exception as e:
+            logging.error("Stage '{}' failed: {}".format(name, e))
+            result["error"] = "{}: {}".format(type(e).__name__, e)
+        result["secs"] = round(time.monotonic() - ts, 4)
+        result.update(extra)
+        if "services" in result and result["services"]:
+            result["secs_per_service"] = round(result["secs"] / result["services"], 5)
+        self.__results[name] = result
+        logging.warning("[{}] {}".format(name, result))
+
+    def __load_specs(self) -> dict:
+        self.__services_specs = ServicesSpecs(self.__meta_path, self.topics_info_fname, self.__branch)
+        return {"services": len(self.__services_specs.all_services),
+                "channels": len(self.__services_specs.channels.channels())}
+
+    def __validate(self) -> dict:
+        validator = SpecsValidator(self.__meta_path)
+        valid, errors, warns = validator.validate()
+        return {"errors": len(errors), "warns": len(warns)}
+
+    def __save_specs(self) -> dict:
+        generator = SpecsGenerator(self.__meta_path, self.__configuration, self.topics_info_fname, self.__branch,
+                                   self.__services_specs)
+        generator.save(self.__output_path + "/specs")
+        return {"services": len(self.__services_specs.available_services)}
+
+    async def __load_diagrams_resources(self):
+        template_path = self.__meta_path + "/diagrams"
+        self.__styles_wrapper = StylesWrapper(template_path + "/network/styles.css",
+                                              template_path + "/network/props.yaml")
+        self.__template = XmlTemplate()
+        await self.__template.load(template_path, "network", "template")
+        self.__template_service = XmlTemplate()
+        await self.__template_service.load(template_path, "network", "template_service")
+
+    async def __system_diagram(self) -> dict:
+        generator = Generator(self.__configuration, self.__services_specs, self.__template,
+                              StyleSelector(self.__styles_wrapper), self.__branch, False)
+        await generator.generate()
+        await generator.save(self.__output_path)
+        return {}
+
+    async def __service_diagrams(self) -> dict:
+        # only the diagrams of the sample are generated (and timed)
+        services = self.__sample()
+        for service_name in services:
+            service = self.__services_specs.get_service_spec(service_name)
+            generator = ServiceNetworkGenerator(service_name, self.__configuration, self.__services_specs,
+                                                self.__template_service,
+                                                ServiceStyleSelector(service, self.__styles_wrapper),
+                                                self.__branch, False)
+            await generator.generate()
+            await generator.save(self.__output_path)
+        return {"services": len(services)}
+
+    async def __publish(self) -> dict:
+        services = self.__sample()
+        confluence = FakeConfluenceService()
+        settings = self.__services_specs.settings
+        handbook_page = confluence.pages.add_root_page(settings.confluence.handbook_page_title,
+                                                       settings.confluence.space)
+        for category_name in settings.service_categories.product_services:
+            page = confluence.pages.add_root_page(f"{settings.confluence.module_prefix}{category_name}",
+                                                  settings.confluence.space)
+            page.parent_id = handbook_page.id
+        with tempfile.TemporaryDirectory(prefix="confluence_cache_") as cache_path:
+            publisher = PagesPublisher(HtmlTemplatesStorage(DEFAULT_HTML_TEMPLATES_PATH),
+                                       self.__configuration['publish']['max_releases_cnt'],
+                                       self.__configuration,
+                                       self.__services_specs,
+                                       confluence,
+                                       self.__configuration['app']['max_parallel_publish_tasks_cnt'],
+                                       self.__branch,
+                                       cache_path,
+                                       False,
+                                       set(services))
+            await publisher.publish()
+        return {"services": len(services), "pages": confluence.pages.pages_cnt,
+                "requests": confluence.pages.requests_cnt}
+
+    async def __prepare_watch(self):
+        self.__watcher = SpecsWatcher(self.__meta_path, self.topics_info_fname, self.__branch)
+        self.__builder = DiagramsBuilder(self.__configuration, self.__meta_path, self.__output_path,
+                                         self.__configuration['app']['max_parallel_tasks_cnt'])
+        # the first build loads the resources and fills the caches, as the full run before watching does
+        await self.__builder.build(self.__watcher.services_specs, self.__branch, set())
+
+    def __edit_service(self) -> str:
+        service_name = self.__sample()[0]
+        category = self.__watcher.services_specs.get_service_spec(service_name).category
+        category_fname = ServicesSpecs.category_specs_fname(self.__meta_path, category)
+        specs = read_yaml(category_fname)
+        specs[category][service_name]["desc"] = "{} (edited)".format(specs[category][service_name].get("desc"))
+        with open(category_fname, 'w') as f:
+            yaml.safe_dump(specs, f, sort_keys=False)
+        # the watcher compares mtimes, the edit must not fall into the same tick
+        st = os.stat(category_fname)
+        os.utime(category_fname, (st.st_atime + 1, st.st_mtime + 1))
+        return service_name
+
+    async def __watch_rebuild(self) -> dict:
+        self.__edit_service()
+        ts = time.monotonic()
+        specs_diff = self.__watcher.poll()
+        poll_secs = time.monotonic() - ts
+        services = set(specs_diff.affected_services)
+        generate_specs(self.__meta_path, self.__configuration, self.topics_info_fname, self.__branch,
+                       specs_diff.current, self.__output_path + "/specs", services)
+        await self.__builder.build(specs_diff.current, self.__branch, services)
+        return {"affected_services": len(services), "poll_secs": round(poll_secs, 4)}
+
+    async def run(self) -> Dict[str, dict]:
+        GitSpecsRepositoryHelper.repo_path = self.__output_path
+        await self.__measure("specs_load", self.__load_specs)
+        await self.__measure("specs_validate", self.__validate)
+        await self.__measure("specs_save", self.__save_specs)
+        await self.__load_diagrams_resources()
+        await self.__measure("system_diagram", self.__system_diagram)
+        await self.__measure("service_diagrams", self.__service_diagrams)
+        await self.__measure("confluence_publish", self.__publish)
+        await self.__prepare_watch()
+        await self.__measure("watch_rebuild", self.__watch_rebuild)
+        return self.__results
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float) -> bool:
+    """
+    Prints the stages timings against the baseline ones.
+    Returns False if any stage is slower than max_slowdown times the baseline or fails while the baseline one passed.
+    """
+    ok = True
+    baseline_runs = {e["services"]: e for e in baseline["runs"]}
+    for run in results["runs"]:
+        if run["services"] not in baseline_runs:
+            print("{:>6} services: no baseline run, skipped".format(run["services"]))
+            continue
+        for stage, result in run["stages"].items():
+            base_result = baseline_runs[run["services"]]["stages"].get(stage)
+            if base_result is None or "error" in base_result:
+                continue
+            if "error" in result:
+                print("{:>6} services {:<20} FAILED: {}".format(run["services"], stage, result["error"]))
+                ok = False
+                continue
+            if base_result["secs"] == 0:
+                continue
+            key = "secs_per_service" if "secs_per_service" in result and "secs_per_service" in base_result \
+                else "secs"
+            ratio = result[key] / base_result[key] if base_result[key] else 1.0
+            status = "OK"
+            if ratio > max_slowdown:
+                status = "SLOWER"
+                ok = False
+            print("{:>6} services {:<20} {:>9.4f} -> {:>9.4f} ({:.2f}x) {}".format(
+                run["services"], stage, base_result[key], result[key], ratio, status))
+    return ok
+
+
+async def run_suite(args) -> dict:
+    configuration = ConfigurationLoader.load(args.config)
+    runs = []
+    for services_cnt in [int(e) for e in args.sizes.split(",")]:
+        with tempfile.TemporaryDirectory(prefix="benchmark_") as tmp_path:
+            meta_path = tmp_path + "/meta"
+            ts = time.monotonic()
+            meta_generator = SyntheticMetaGenerator(services_cnt, args.seed)
+            meta_generator.generate()
+            meta_generator.save(meta_path)
+            logging.warning("{} services were generated in {:.2f} sec".format(meta_generator.services_cnt,
+                                                                              time.monotonic() - ts))
+            benchmark = StagesBenchmark(meta_path, tmp_path + "/arch_specs_autogen", configuration, args.sample)
+            runs.append({"services": services_cnt, "stages": await benchmark.run()})
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "sample": args.sample,
+        "runs": runs,
+    }
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="pipeline stages benchmark on synthetic meta repositories")
+    args_parser.add_argument("--sizes", dest="sizes", default="100,1000,10000", help="services counts",
+                             required=False)
+    args_parser.add_argument("--seed", dest="seed", type=int, default=0, required=False)
+    args_parser.add_argument("--sample", dest="sample", type=int, default=100, required=False,
+                             help="services count for service diagrams and confluence pages stages")
+    args_parser.add_argument("-c", "--config", dest="config", default=DEFAULT_CONFIG, required=False)
+    args_parser.add_argument("-o", "--output", dest="output", default="benchmark_results.json", required=False)
+    args_parser.add_argument("--baseline", dest="baseline", default=DEFAULT_BASELINE, required=False,
+                             help="results json to compare with, the committed baseline by default")
+    args_parser.add_argument("--no_baseline", dest="no_baseline", action="store_true", required=False,
+                             help="do not compare the results with the baseline")
+    args_parser.add_argument("--compare", dest="compare", required=False,
+                             help="compare the saved results json with the baseline without running the suite")
+    args_parser.add_argument("--max_slowdown", dest="max_slowdown", type=float, default=1.25, required=False,
+                             help="exit with an error if a stage is slower than the baseline one by this factor")
+    args = args_parser.parse_args()
+
+    if args.compare:
+        with open(args.compare) as f:
+            results = json.load(f)
+    else:
+        logging.basicConfig(format='%(asctime)s %(levelname)-8s %(message)s', level=logging.WARNING)
+        cssutils.log.setLevel(logging.FATAL)
+        results = asyncio.run(run_suite(args))
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print("results were saved to '{}'".format(args.output))
+    if args.no_baseline:
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print("baseline '{}' ({}, python {})".format(args.baseline, baseline["created"], baseline["python"]))
+    if not compare(results, baseline, args.max_slowdown):
+        print("some stages failed or are slower than the baseline by more than {}x".format(args.max_slowdown))
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
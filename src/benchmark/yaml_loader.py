@@ -0,0 +1,110 @@
+import argparse
+import os
+import tempfile
+from time import time
+
+import yaml
+from yaml.constructor import ConstructorError
+
+from core.yaml import read_yaml
+
+
+def synthetic_specs_yaml(services_cnt: int, category="feature") -> str:
+    lines = [
+        "definitions:",
+        "  status:",
+        "    ready: &ready \"ready\"",
+        "  teams:",
+        "    dev_team: &dev_team",
+        "      name: DEV Team",
+        "      lead: Roman Shafeev",
+        "  data_direction:",
+        "    rx: &rx \"rx\"",
+        "    tx: &tx \"tx\"",
+        "",
+        "{}:".format(category),
+    ]
+    for i in range(services_cnt):
+        lines.extend([
+            "  service-{}:".format(i),
+            "    desc: synthetic service {}".format(i),
+            "    module: {}".format(category),
+            "    owner: Roman Shafeev",
+            "    status: *ready",
+            "    nodes:",
+            "      - service-{}-node".format(i),
+            "    dev_team:",
+            "      - *dev_team",
+            "    connect_to:",
+            "      - name: kafka",
+            "        data_direction: *tx",
+            "        topics:",
+            "          topic-{}:".format(i),
+            "            desc: topic {}".format(i),
+            "      - name: service-{}".format((i + 1) % services_cnt),
+            "        protocol: grpc",
+            "        data_direction: *rx",
+        ])
+    return "\n".join(lines) + "\n"
+
+
+def no_duplicates_constructor(loader, node, deep=False):
+    """Check for duplicate keys (the previous loader of the specs)."""
+
+    mapping = {}
+    for key_node, value_node in node.value:
+        key = loader.construct_object(key_node, deep=deep)
+        value = loader.construct_object(value_node, deep=deep)
+        if key in mapping:
+            raise ConstructorError("while constructing a mapping", node.start_mark,
+                                   "found duplicate key (%s)" % key, key_node.start_mark)
+        mapping[key] = value
+
+    return loader.construct_mapping(node, deep)
+
+
+class LegacyLoader(yaml.UnsafeLoader):
+    pass
+
+
+LegacyLoader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, no_duplicates_constructor)
+
+
+def legacy_read_yaml(fname: str):
+    with open(fname, 'r') as stream:
+        return yaml.load(stream, Loader=LegacyLoader)
+
+
+def measure(func, fname: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        ts = time()
+        func(fname)
+        elapsed = time() - ts
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    args_parser = argparse.ArgumentParser(description="yaml loaders benchmark on a synthetic specs file")
+    args_parser.add_argument("--services", dest="services", type=int, default=5000, required=False)
+    args_parser.add_argument("--repeat", dest="repeat", type=int, default=3, required=False)
+    args = args_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = os.path.join(tmp_dir, "feature.yaml")
+        with open(fname, 'w') as f:
+            f.write(synthetic_specs_yaml(args.services))
+        if legacy_read_yaml(fname) != read_yaml(fname):
+            raise Exception("Loaders results are different!")
+        size_mb = os.path.getsize(fname) / 1024.0 / 1024.0
+        legacy_secs = measure(legacy_read_yaml, fname, args.repeat)
+        specs_loader_secs = measure(read_yaml, fname, args.repeat)
+    print("services: {}, file size: {:.2f} MB".format(args.services, size_mb))
+    print("yaml.unsafe_load + no_duplicates_constructor: {:.3f} sec".format(legacy_secs))
+    print("SpecsLoader (libyaml={}): {:.3f} sec".format(yaml.__with_libyaml__, specs_loader_secs))
+    print("speedup: {:.1f}x".format(legacy_secs / specs_loader_secs))
+
+
+if __name__ == '__main__':
+    main()
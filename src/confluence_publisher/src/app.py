@@ -7,7 +7,8 @@ from branch_cleaner import BranchCleaner
 from core.app import AppCore
 from core.git.branch import Branch
 from core.git.specs_repo import GitSpecsRepositoryHelper
-from core.specs.specs import ServicesSpecs
+from core.specs.snapshot import ServicesSpecsSnapshot
+from core.unpublished_services import UnpublishedServices
 from data.confluence.service import ConfluenceService
 from data.specs.owners_validator import OwnersValidator
 from data.template.templates_storage import HtmlTemplatesStorage
@@ -36,6 +37,10 @@ class App(AppCore):
             "-s", "--specs_repo_path", dest="specs_repo_path", help="specs_repo_path", required=True)
         args_parser.add_argument('--validate_only', action='store_true')
         args_parser.add_argument('--publish_only_diagrams', action='store_true')
+        args_parser.add_argument(
+            '--publish_changed_only', '--publish-changed-only', dest="publish_changed_only", action='store_true',
+            help="publish only services whose specs or diagrams files were changed and not published yet")
+        AppCore.add_affected_only_args(args_parser)
 
         args_parser.add_argument(
             "--removed_branch", "--removed_branch", dest="removed_branch",
@@ -62,8 +67,10 @@ class App(AppCore):
             cache_path = self.args.cache_path
             confluence = ConfluenceService(self.configuration['confluence'])
 
-            services_specs = ServicesSpecs(self.args.meta_path, GitSpecsRepositoryHelper.topics_info_fname(),
-                                               current_branch)
+            snapshot = ServicesSpecsSnapshot(GitSpecsRepositoryHelper.specs_snapshot_fname())
+            services_specs = snapshot.load_or_create(self.args.meta_path,
+                                                     GitSpecsRepositoryHelper.topics_info_fname(),
+                                                     current_branch)
 
             validator = OwnersValidator(services_specs, confluence, cache_path)
             valid, errors = await validator.validate()
@@ -85,6 +92,12 @@ class App(AppCore):
                 raise Exception("You try to execute confluence_publisher utility for the non-master/non-release "
                                 "branch '{}'!".format(current_branch.name) +
                                 "Please, checkout git repository to the master or release branch and try again!")
+            services = self.affected_services(services_specs, current_branch)
+            unpublished = UnpublishedServices(GitSpecsRepositoryHelper.unpublished_services_fname())
+            if self.args.publish_changed_only:
+                logging.info("{} services with changed specs/diagrams will be published".format(
+                    len(unpublished.services)))
+                services = set(unpublished.services) if services is None else services & unpublished.services
             html_templates_storage = HtmlTemplatesStorage(self.args.html_templates_path)
             confluence_pages = PagesPublisher(html_templates_storage,
                                               self.max_releases_cnt,
@@ -94,8 +107,13 @@ class App(AppCore):
                                               self.max_parallel_tasks_cnt,
                                               current_branch,
                                               cache_path,
-                                              self.args.publish_only_diagrams)
+                                              self.args.publish_only_diagrams,
+                                              services,
+                                              GitSpecsRepositoryHelper.markdown_cache_fname())
             await confluence_pages.publish()
+            if not self.args.publish_only_diagrams:
+                unpublished.remove(services)
+                unpublished.save()
         finally:
             if confluence is not None:
                 await confluence.release()
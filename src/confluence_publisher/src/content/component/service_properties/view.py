@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from jinja2 import Template
+from core.render.markdown import MarkdownRenderer
 from data.specs.service_spec_ext import ServiceSpecExt
 from data.template.templates_storage import HtmlTemplatesStorage, HtmlComponentTemplateName
 
@@ -8,8 +9,11 @@ from data.template.templates_storage import HtmlTemplatesStorage, HtmlComponentT
 class ServicePropertiesView:
     __template: Template
 
-    def __init__(self, html_templates_storage: HtmlTemplatesStorage):
+    __markdown_renderer: MarkdownRenderer
+
+    def __init__(self, html_templates_storage: HtmlTemplatesStorage, markdown_renderer: MarkdownRenderer):
         self.__template = html_templates_storage.get_component(HtmlComponentTemplateName.service_properties)
+        self.__markdown_renderer = markdown_renderer
 
     # @staticmethod
     # def account_link(user_key, owner_name):
@@ -66,11 +70,16 @@ class ServicePropertiesView:
             teams_s = teams_s + " " + team['name']
         return teams_s
 
+    def __desc(self, spec: ServiceSpecExt) -> str:
+        if 'desc' not in spec.raw or spec.raw['desc'] is None or len(spec.raw['desc']) == 0:
+            return ""
+        return self.__markdown_renderer.render(spec.raw['desc'])
+
     async def render(self, spec: ServiceSpecExt) -> str:
         settings = spec.settings
         render_params = {
             "service_name": spec.service_name,
-            "desc": spec.raw['desc'] if 'desc' in spec.raw and spec.raw['desc'] is not None else "",
+            "desc": self.__desc(spec),
             "source_link": self.source_code_link(spec),
             "status": spec.raw['status'],
             "language": spec.raw['language'] if 'language' in spec.raw else "",
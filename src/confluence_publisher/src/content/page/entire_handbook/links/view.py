@@ -1,6 +1,5 @@
 import hashlib
 import json
-import os.path
 from datetime import datetime
 
 from core.git.branch import Branch
@@ -24,43 +23,19 @@ class EntireLinksView:
         return self.__html_templates_storage.get_page(template_name)
 
     async def render(self, spec: ServiceSpecExt) -> str:
-        network_json_name = GitSpecsRepositoryHelper.network_fname(spec.service_name)
-        with open(network_json_name) as f:
-            network_table = json.loads(f.read())
+        network_table = GitSpecsRepositoryHelper.specs_table(spec.service_name, "network")
+        if network_table is None:
+            raise FileNotFoundError("Network specs of the service '{}' not found".format(spec.service_name))
         topics_table = []
         if spec.is_kafka_broker:
-            topics_json_name = GitSpecsRepositoryHelper.topics_fname(spec.service_name)
-            with open(topics_json_name) as f:
-                topics_table = json.loads(f.read())
+            topics_table = GitSpecsRepositoryHelper.specs_table(spec.service_name, "topics") or []
         celery_tasks_table = []
         if spec.is_celery_broker:
-            celery_tasks_json_name = GitSpecsRepositoryHelper.celery_tasks_fname(spec.service_name)
-            with open(celery_tasks_json_name) as f:
-                celery_tasks_table = json.loads(f.read())
-
-        rx_celery_tasks_table = []
-        rx_celery_tasks_json_name = GitSpecsRepositoryHelper.rx_celery_tasks_fname(spec.service_name)
-        if os.path.isfile(rx_celery_tasks_json_name):
-            with open(rx_celery_tasks_json_name) as f:
-                rx_celery_tasks_table = json.loads(f.read())
-
-        tx_celery_tasks_table = []
-        tx_celery_tasks_json_name = GitSpecsRepositoryHelper.tx_celery_tasks_fname(spec.service_name)
-        if os.path.isfile(tx_celery_tasks_json_name):
-            with open(tx_celery_tasks_json_name) as f:
-                tx_celery_tasks_table = json.loads(f.read())
-
-        rx_topics_table = []
-        rx_topics_json_name = GitSpecsRepositoryHelper.rx_topics_fname(spec.service_name)
-        if os.path.isfile(rx_topics_json_name):
-            with open(rx_topics_json_name) as f:
-                rx_topics_table = json.loads(f.read())
-
-        tx_topics_table = []
-        tx_topics_json_name = GitSpecsRepositoryHelper.tx_topics_fname(spec.service_name)
-        if os.path.isfile(tx_topics_json_name):
-            with open(tx_topics_json_name) as f:
-                tx_topics_table = json.loads(f.read())
+            celery_tasks_table = GitSpecsRepositoryHelper.specs_table(spec.service_name, "celery_tasks") or []
+        rx_celery_tasks_table = GitSpecsRepositoryHelper.specs_table(spec.service_name, "rx_celery_tasks") or []
+        tx_celery_tasks_table = GitSpecsRepositoryHelper.specs_table(spec.service_name, "tx_celery_tasks") or []
+        rx_topics_table = GitSpecsRepositoryHelper.specs_table(spec.service_name, "rx_topics") or []
+        tx_topics_table = GitSpecsRepositoryHelper.specs_table(spec.service_name, "tx_topics") or []
 
         render_params = {
             "service_name": spec.service_name,
@@ -3,6 +3,7 @@ from content.component.service_properties.view import ServicePropertiesView
 from content.page.entire_handbook.diagram.view import EntireDiagramView
 from content.page.entire_handbook.links.view import EntireLinksView
 from content.page.handbook.html_parser import ServiceHandbookPageParser
+from core.render.markdown import MarkdownRenderer
 from core.specs.service.spec import ServiceType
 from data.confluence.model.title import NetworkCurrentDiagramPageTitle, \
     NetworkCurrentLinksPageTitle, ServiceHandbookManualPageTitle
@@ -22,9 +23,9 @@ class EntireHandbookPageView:
     __links_view: EntireLinksView
 
 
-    def __init__(self, html_templates_storage: HtmlTemplatesStorage):
+    def __init__(self, html_templates_storage: HtmlTemplatesStorage, markdown_renderer: MarkdownRenderer):
         self.__html_templates_storage = html_templates_storage
-        self.__props_view = ServicePropertiesView(html_templates_storage)
+        self.__props_view = ServicePropertiesView(html_templates_storage, markdown_renderer)
         self.__include_page_view = IncludePageView(html_templates_storage)
         self.__diagram_view = EntireDiagramView(html_templates_storage)
         self.__links_view = EntireLinksView(html_templates_storage)
@@ -3,6 +3,7 @@ from typing import Optional
 
 from content.page.handbook.view import HandbookPageView
 from core.git.branch import Branch
+from core.render.markdown import MarkdownRenderer
 from core.specs.settings import ServiceCategoryNameWrapper
 from data.confluence.api.property import PropertyKey
 from data.confluence.model.page import ConfluencePage
@@ -22,11 +23,12 @@ class HandbookPagePublisher:
     def __init__(self,
                  confluence: ConfluenceService,
                  branch: Branch,
-                 html_templates_storage: HtmlTemplatesStorage):
+                 html_templates_storage: HtmlTemplatesStorage,
+                 markdown_renderer: MarkdownRenderer):
         self.__confluence = confluence
         self.__html_templates_storage = html_templates_storage
         self.__branch = branch
-        self.__page_view = HandbookPageView(html_templates_storage)
+        self.__page_view = HandbookPageView(html_templates_storage, markdown_renderer)
 
     async def __prepare_handbook_page(self, spec: ServiceSpecExt, page: Optional[ConfluencePage],
                                       force_recreate_handbook: int) -> ConfluencePage:
@@ -1,6 +1,7 @@
 from content.component.include_page.view import IncludePageView
 from content.component.service_properties.view import ServicePropertiesView
 from content.page.handbook.html_parser import ServiceHandbookPageParser
+from core.render.markdown import MarkdownRenderer
 from core.specs.service.spec import ServiceType
 from data.confluence.model.title import NetworkCurrentDiagramPageTitle, \
     NetworkCurrentLinksPageTitle, ServiceHandbookManualPageTitle
@@ -15,9 +16,9 @@ class HandbookPageView:
 
     __include_page_view: IncludePageView
 
-    def __init__(self, html_templates_storage: HtmlTemplatesStorage):
+    def __init__(self, html_templates_storage: HtmlTemplatesStorage, markdown_renderer: MarkdownRenderer):
         self.__html_templates_storage = html_templates_storage
-        self.__props_view = ServicePropertiesView(html_templates_storage)
+        self.__props_view = ServicePropertiesView(html_templates_storage, markdown_renderer)
         self.__include_page_view = IncludePageView(html_templates_storage)
 
     async def __update_service_handbook_page(self, spec: ServiceSpecExt, page_body_s: str) -> str:
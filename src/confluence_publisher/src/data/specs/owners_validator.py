@@ -19,9 +19,8 @@ class OwnersValidator:
 
     async def validate(self) -> Tuple[bool, List[Dict[str, str]]]:
         errors = []
-        for service_name in self.__services_specs.all_services:
-            service_spec = ServiceSpecExt.create(self.__services_specs.get_service_spec(service_name),
-                                                 self.__user_keys_storage)
+        for service_name, spec in self.__services_specs.all_services.items():
+            service_spec = ServiceSpecExt.create(spec, self.__user_keys_storage)
             owners = await service_spec.owner_keys()
             for owner_name in owners:
                 if owners[owner_name] is None:
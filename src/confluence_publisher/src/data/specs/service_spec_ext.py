@@ -9,6 +9,8 @@ from data.confluence.cache.users_keys_cache_storage import UsersKeysCacheStorage
 
 
 class ServiceSpecExt(ServiceSpec):
+    __slots__ = ('__user_keys_storage',)
+
     __user_keys_storage: UsersKeysCacheStorage
 
     def __init__(self, user_keys_storage: UsersKeysCacheStorage, service_name: str, settings: Settings):
@@ -1,5 +1,5 @@
 import logging
-from typing import Set
+from typing import Optional, Set
 
 from content.page.diagram.publisher import DiagramPublisher
 from content.page.entire_handbook.publisher import EntireHandbookPagePublisher
@@ -13,6 +13,7 @@ from content.page.handbook.network.current.publisher import NetworkCurrentPublis
 from content.page.handbook.publisher import HandbookPagePublisher
 from content.page.system.branch.diagram.publisher import SystemNetworkBranchDiagramPublisher
 from core.git.branch import Branch
+from core.render.markdown import MarkdownRenderer
 from core.specs.service.spec import ServiceType
 from core.specs.specs import ServicesSpecs
 from core.task.task_pool import TasksPool
@@ -45,6 +46,10 @@ class PagesPublisher:
 
     __publish_only_diagrams: bool
 
+    __services: Optional[Set[str]]
+
+    __markdown_renderer: MarkdownRenderer
+
     def __init__(self,
                  html_templates_storage: HtmlTemplatesStorage,
                  max_releases_cnt: int,
@@ -54,7 +59,9 @@ class PagesPublisher:
                  max_parallel_tasks_cnt: int,
                  branch: Branch,
                  cache_path: str,
-                 publish_only_diagrams: bool):
+                 publish_only_diagrams: bool,
+                 services: Optional[Set[str]] = None,
+                 markdown_cache_fname: Optional[str] = None):
         self.__html_templates_storage = html_templates_storage
         self.__max_releases_cnt = max_releases_cnt
         self.__confluence = confluence
@@ -64,6 +71,9 @@ class PagesPublisher:
         self.__branch = branch
         self.__user_keys_storage = UsersKeysCacheStorage(self.__confluence, cache_path)
         self.__publish_only_diagrams = publish_only_diagrams
+        self.__services = services
+        self.__markdown_renderer = MarkdownRenderer(services_specs.settings.markdown_template_vars,
+                                                    markdown_cache_fname)
 
     @property
     def branch(self) -> Branch:
@@ -72,6 +82,7 @@ class PagesPublisher:
     async def publish(self):
         await self.__clean_services()
         await self.__publish_pages()
+        self.__markdown_renderer.save()
 
     async def __publish_pages(self):
         tasks_pool = TasksPool(self.__max_parallel_tasks_cnt)
@@ -82,9 +93,10 @@ class PagesPublisher:
         if not self.__publish_only_diagrams:
             await tasks_pool.append(self.__publish_system_diagram_pages())
             await self.__publish_category_pages()
-            for service_name in self.__services_specs.all_services:
-                service_spec = ServiceSpecExt.create(self.__services_specs.get_service_spec(service_name),
-                                                     self.__user_keys_storage)
+            for service_name, spec in self.__services_specs.all_services.items():
+                if self.__services is not None and service_name not in self.__services:
+                    continue
+                service_spec = ServiceSpecExt.create(spec, self.__user_keys_storage)
                 if service_spec.service_module in ['external']:
                     continue
                 if self.__app_configuration["publish"]["service"] != 'all' and \
@@ -148,7 +160,8 @@ class PagesPublisher:
         force_recreate_network_pages = self.__app_configuration['publish']['force_recreate_network_pages']
         handbook_page_publisher = EntireHandbookPagePublisher(self.__confluence,
                                                               self.branch,
-                                                              self.__html_templates_storage)
+                                                              self.__html_templates_storage,
+                                                              self.__markdown_renderer)
         handbook_page = await handbook_page_publisher.publish(spec,
                                                               force_recreate_handbook,
                                                               force_rewrite_handbook_properties)
@@ -160,7 +173,8 @@ class PagesPublisher:
         force_recreate_network_pages = self.__app_configuration['publish']['force_recreate_network_pages']
         handbook_page_publisher = HandbookPagePublisher(self.__confluence,
                                                         self.branch,
-                                                        self.__html_templates_storage)
+                                                        self.__html_templates_storage,
+                                                        self.__markdown_renderer)
         handbook_page = await handbook_page_publisher.publish(spec,
                                                               force_recreate_handbook,
                                                               force_rewrite_handbook_properties)
@@ -2,9 +2,15 @@ import argparse
 import logging
 from functools import wraps
 from time import time
+from typing import Optional, Set
 
 from core.config.loader import ConfigurationLoader
+from core.git.branch import Branch
 from core.git.specs_repo import GitSpecsRepositoryHelper
+from core.specs.diff import SpecsDiff
+from core.specs.specs import ServicesSpecs
+from core.specs.validate.specs_validator import SpecsValidator
+from core.yaml import WITH_LIBYAML
 
 
 class AppCore:
@@ -14,6 +20,8 @@ class AppCore:
 
     def __init__(self, args_parser: argparse.ArgumentParser):
         self.args = args_parser.parse_args()
+        if getattr(self.args, "affected_only", False) and self.args.base_revision is None:
+            args_parser.error("--base_revision is required with --affected_only")
         self.__configuration = ConfigurationLoader.load(self.args.config)
         self.set_basic_logging()
 
@@ -24,11 +32,57 @@ class AppCore:
             level=logging.DEBUG,
             datefmt='%Y-%m-%d %H:%M:%S')
         logging.getLogger().setLevel(self.configuration['logging']['level'])
+        if WITH_LIBYAML:
+            logging.info("Specs are parsed by the libyaml loader")
+        else:
+            logging.warning("libyaml is not available, specs are parsed by the pure python yaml loader")
 
     @property
     def configuration(self) -> dict:
         return self.__configuration
 
+    @staticmethod
+    def add_affected_only_args(args_parser: argparse.ArgumentParser):
+        args_parser.add_argument(
+            '--affected_only', '--affected-only', dest="affected_only", action='store_true',
+            help="process only services affected by the meta changes since base_revision. topics_info is not "
+                 "versioned with the meta: both revisions are loaded with the current one, so its changes do not "
+                 "make services affected")
+        args_parser.add_argument(
+            "--base_revision", "--base-revision", dest="base_revision", default=None, required=False,
+            help="git revision of the meta processed by the previous run, required with --affected_only")
+
+    def affected_services(self, services_specs: ServicesSpecs, current_branch: Branch) -> Optional[Set[str]]:
+        """None means all services should be processed."""
+        if not self.args.affected_only:
+            return None
+        try:
+            specs_diff = SpecsDiff.from_revision(self.args.meta_path, self.args.base_revision,
+                                                 GitSpecsRepositoryHelper.topics_info_fname(),
+                                                 current_branch, services_specs)
+        except Exception as e:
+            logging.warning("Could not compare specs with '{}', all services are processed: {}".format(
+                self.args.base_revision, e))
+            return None
+        specs_diff.log()
+        if len(specs_diff.affected_services) == 0:
+            logging.warning("No services are affected by the meta changes since '{}', nothing is processed".format(
+                self.args.base_revision))
+        return set(specs_diff.affected_services)
+
+    def validated_services(self, specs_validator: SpecsValidator) -> Optional[Set[str]]:
+        """None means all services should be validated."""
+        if not self.args.affected_only:
+            return None
+        try:
+            scope = specs_validator.scope(self.args.base_revision)
+        except Exception as e:
+            logging.warning("Could not compare specs with '{}', all services are validated: {}".format(
+                self.args.base_revision, e))
+            return None
+        scope.log()
+        return scope.services
+
 
 def timing(f):
     @wraps(f)
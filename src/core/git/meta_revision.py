@@ -0,0 +1,41 @@
+import io
+import logging
+import os
+import subprocess
+import tarfile
+from typing import Iterator
+
+
+class GitMetaRevision:
+    """Exports the meta directory of the given git revision, e.g. to compare the specs with the working tree."""
+
+    @staticmethod
+    def __git(path: str, *args) -> bytes:
+        proc = subprocess.run(["git", "-C", path] + list(args), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if proc.returncode != 0:
+            raise Exception("git {} failed: {}".format(" ".join(args), proc.stderr.decode('utf-8').strip()))
+        return proc.stdout
+
+    @classmethod
+    def commit_hash(cls, meta_path: str, revision: str) -> str:
+        return cls.__git(meta_path, "rev-parse", "--verify", revision + "^{commit}").decode('utf-8').strip()
+
+    @staticmethod
+    def safe_members(tar: tarfile.TarFile, out_path: str) -> Iterator[tarfile.TarInfo]:
+        """Regular files and directories of the archive which are extracted inside out_path."""
+        root = os.path.realpath(out_path)
+        for member in tar:
+            path = os.path.realpath(os.path.join(root, member.name))
+            if not (member.isfile() or member.isdir()) or os.path.commonpath([root, path]) != root:
+                logging.debug("Skip '{}' of the meta archive".format(member.name))
+                continue
+            yield member
+
+    @classmethod
+    def export(cls, meta_path: str, revision: str, out_path: str):
+        top_level = cls.__git(meta_path, "rev-parse", "--show-toplevel").decode('utf-8').strip()
+        prefix = cls.__git(meta_path, "rev-parse", "--show-prefix").decode('utf-8').strip()
+        # tree-ish "<revision>:<prefix>" puts the meta files at the root of the archive
+        archive = cls.__git(top_level, "archive", "--format=tar", "{}:{}".format(revision, prefix))
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(out_path, members=cls.safe_members(tar, out_path))
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+from typing import Dict, List, Optional, Tuple
+
+from core.output_writer import OutputWriter
+
+
+class SpecsBundle:
+    """
+    Reader of the specs tables of all services stored in one JSON-lines file (a line per table).
+    The index file {service: {table: [offset, length, sha1]}} gives the random access to a table,
+    the bundle is memory-mapped.
+    """
+    VERSION = 1
+
+    basename = "bundle.jsonl"
+
+    __bundle_fname: str
+
+    __index: Dict[str, Dict[str, list]]
+
+    __file = None
+
+    __mmap: Optional[mmap.mmap]
+
+    def __init__(self, bundle_fname: str, index: Dict[str, Dict[str, list]]):
+        self.__bundle_fname = bundle_fname
+        self.__index = index
+        self.__file = None
+        self.__mmap = None
+
+    @classmethod
+    def fname(cls, specs_path: str) -> str:
+        return os.path.join(specs_path, cls.basename)
+
+    @staticmethod
+    def index_fname(bundle_fname: str) -> str:
+        return os.path.splitext(bundle_fname)[0] + ".index.json"
+
+    @classmethod
+    def remove(cls, bundle_fname: str):
+        for fname in (cls.index_fname(bundle_fname), bundle_fname):
+            if os.path.exists(fname):
+                os.remove(fname)
+
+    @classmethod
+    def load(cls, bundle_fname: str) -> Optional['SpecsBundle']:
+        index_fname = cls.index_fname(bundle_fname)
+        if not os.path.isfile(index_fname) or not os.path.isfile(bundle_fname):
+            return None
+        with open(index_fname, 'r') as f:
+            index = json.load(f)
+        if index.get("version") != cls.VERSION:
+            return None
+        return cls(bundle_fname, index["services"])
+
+    @property
+    def services(self) -> List[str]:
+        return list(self.__index)
+
+    def tables(self, service_name: str) -> List[str]:
+        return list(self.__index.get(service_name, {}))
+
+    def entry(self, service_name: str, table: str) -> Optional[list]:
+        return self.__index.get(service_name, {}).get(table)
+
+    def raw_table(self, service_name: str, table: str) -> Optional[bytes]:
+        entry = self.entry(service_name, table)
+        if entry is None:
+            return None
+        if self.__mmap is None:
+            self.__file = open(self.__bundle_fname, 'rb')
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset, length = entry[0], entry[1]
+        return self.__mmap[offset:offset + length]
+
+    def table(self, service_name: str, table: str) -> Optional[list]:
+        raw = self.raw_table(service_name, table)
+        if raw is None:
+            return None
+        return json.loads(raw.decode('utf-8'))
+
+    def close(self):
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__file.close()
+        self.__mmap = None
+        self.__file = None
+
+
+class SpecsBundleBuilder:
+    """Collects the serialized tables of the services and writes the bundle and its index in one pass."""
+
+    __entries: List[Tuple[str, str, bytes]]
+
+    def __init__(self):
+        self.__entries = []
+
+    @property
+    def entries(self) -> List[Tuple[str, str, bytes]]:
+        return self.__entries
+
+    def add(self, service_name: str, tables: Dict[str, list]):
+        for table, rows in tables.items():
+            self.add_raw(service_name, table, json.dumps(rows, ensure_ascii=False).encode('utf-8'))
+
+    def add_raw(self, service_name: str, table: str, data: bytes):
+        self.__entries.append((service_name, table, data))
+
+    def extend(self, entries: List[Tuple[str, str, bytes]]):
+        self.__entries.extend(entries)
+
+    def sort(self, service_names: List[str]):
+        """Orders the services as in service_names, the order of the tables of a service is kept."""
+        order = {service_name: i for i, service_name in enumerate(service_names)}
+        self.__entries.sort(key=lambda entry: order.get(entry[0], len(order)))
+
+    def save(self, bundle_fname: str, writer: OutputWriter, base: Optional[SpecsBundle] = None):
+        """Changed tables are reported to the writer as specs/<service>/<table>.json artefacts."""
+        chunks = []
+        index = {}
+        offset = 0
+        for service_name, table, data in self.__entries:
+            data_hash = hashlib.sha1(data).hexdigest()
+            index.setdefault(service_name, {})[table] = [offset, len(data), data_hash]
+            chunks.append(data)
+            chunks.append(b"\n")
+            offset += len(data) + 1
+            base_entry = base.entry(service_name, table) if base is not None else None
+            if base_entry is None or base_entry[2] != data_hash:
+                writer.mark_changed(os.path.join("specs", service_name, table + ".json"))
+        writer.write_bytes(bundle_fname, b"".join(chunks))
+        writer.write_json(SpecsBundle.index_fname(bundle_fname), {"version": SpecsBundle.VERSION, "services": index})
+        logging.info("Specs bundle '{}': {} services, {} tables".format(bundle_fname, len(index), len(self.__entries)))
@@ -1,11 +1,20 @@
 import hashlib
+import json
+import os
+from typing import Optional
 
 from aiofile import AIOFile
 
+from core.git.specs_bundle import SpecsBundle
+
 
 class GitSpecsRepositoryHelper:
     repo_path: str
 
+    __bundle: Optional[SpecsBundle] = None
+
+    __bundle_mtime_ns: Optional[int] = None
+
     @classmethod
     async def file_hash(cls, filename: str) -> str:
         async with AIOFile(filename, 'r') as afp:
@@ -16,6 +25,66 @@ class GitSpecsRepositoryHelper:
     def topics_info_fname(cls) -> str:
         return "{}/topics_info.yaml".format(cls.repo_path)
 
+    @classmethod
+    def specs_snapshot_fname(cls) -> str:
+        return "{}/.cache/specs_snapshot.bin".format(cls.repo_path)
+
+    @classmethod
+    def schema_validation_cache_fname(cls) -> str:
+        return "{}/.cache/schema_validation.json".format(cls.repo_path)
+
+    @classmethod
+    def markdown_cache_fname(cls) -> str:
+        return "{}/.cache/markdown.json".format(cls.repo_path)
+
+    @classmethod
+    def text_extents_cache_fname(cls) -> str:
+        return "{}/.cache/text_extents.json".format(cls.repo_path)
+
+    @classmethod
+    def specs_manifest_fname(cls) -> str:
+        return "{}/.cache/specs_manifest.json".format(cls.repo_path)
+
+    @classmethod
+    def diagrams_manifest_fname(cls) -> str:
+        return "{}/.cache/diagrams_manifest.json".format(cls.repo_path)
+
+    @classmethod
+    def unpublished_services_fname(cls) -> str:
+        return "{}/.cache/unpublished_services.json".format(cls.repo_path)
+
+    @classmethod
+    def specs_bundle_fname(cls) -> str:
+        return SpecsBundle.fname("{}/specs".format(cls.repo_path))
+
+    @classmethod
+    def specs_bundle(cls) -> Optional[SpecsBundle]:
+        """The bundle is reloaded if its index was rewritten."""
+        try:
+            mtime_ns = os.stat(SpecsBundle.index_fname(cls.specs_bundle_fname())).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        if mtime_ns != cls.__bundle_mtime_ns:
+            if cls.__bundle is not None:
+                cls.__bundle.close()
+            cls.__bundle = SpecsBundle.load(cls.specs_bundle_fname()) if mtime_ns is not None else None
+            cls.__bundle_mtime_ns = mtime_ns
+        return cls.__bundle
+
+    @classmethod
+    def specs_table(cls, service_name: str, table: str) -> Optional[list]:
+        """Rows of the specs table (e.g. 'network', 'rx_topics') from the bundle or from <service>/<table>.json."""
+        bundle = cls.specs_bundle()
+        if bundle is not None:
+            rows = bundle.table(service_name, table)
+            if rows is not None:
+                return rows
+        fname = "{}/specs/{}/{}.json".format(cls.repo_path, service_name, table)
+        if not os.path.exists(fname):
+            return None
+        with open(fname, 'r') as f:
+            return json.load(f)
+
     @classmethod
     def system_diagram_fname(cls) -> str:
         return "{}/system_arch_diagram.xml".format(cls.repo_path)
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class OutputWriter:
+    """
+    Writes generated artefacts only if their content was changed, the files are replaced atomically.
+    The manifest keeps sha1/size/mtime of the written files, so the existing file is not read again
+    while its size and mtime match the manifest. Files of the deleted services are removed with their manifest
+    entries when the manifest is saved.
+    """
+
+    __root_path: str
+
+    __manifest_fname: Optional[str]
+
+    __manifest: Dict[str, dict]
+
+    __updated: Dict[str, dict]
+
+    __changed: List[str]
+
+    __removed: List[str]
+
+    def __init__(self, root_path: str, manifest_fname: Optional[str] = None):
+        self.__root_path = os.path.abspath(root_path)
+        self.__manifest_fname = manifest_fname
+        self.__manifest = self.__load_manifest()
+        self.__updated = {}
+        self.__changed = []
+        self.__removed = []
+
+    @property
+    def root_path(self) -> str:
+        return self.__root_path
+
+    @property
+    def manifest_fname(self) -> Optional[str]:
+        return self.__manifest_fname
+
+    @property
+    def changed(self) -> List[str]:
+        """Changed files, relative to the root path."""
+        return self.__changed
+
+    @property
+    def removed(self) -> List[str]:
+        """Files of the deleted services removed by save_manifest, relative to the root path."""
+        return self.__removed
+
+    @property
+    def updated(self) -> Dict[str, dict]:
+        """Manifest entries of the files written by this writer."""
+        return self.__updated
+
+    def changed_services(self, specs_dir: str = "specs") -> Set[str]:
+        services = set()
+        for fname in self.__changed:
+            parts = fname.split(os.sep)
+            if len(parts) > 2 and parts[0] == specs_dir:
+                services.add(parts[1])
+        return services
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha1(data).hexdigest()
+
+    def __load_manifest(self) -> Dict[str, dict]:
+        if self.__manifest_fname is None or not os.path.isfile(self.__manifest_fname):
+            return {}
+        try:
+            with open(self.__manifest_fname, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Could not load output manifest '{}': {}".format(self.__manifest_fname, e))
+            return {}
+
+    def __existing_hash(self, fname: str, key: str) -> Optional[str]:
+        try:
+            st = os.stat(fname)
+        except FileNotFoundError:
+            return None
+        entry = self.__manifest.get(key)
+        if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha1"]
+        with open(fname, 'rb') as f:
+            return self.content_hash(f.read())
+
+    def write_bytes(self, fname: str, data: bytes) -> bool:
+        key = os.path.relpath(os.path.abspath(fname), self.__root_path)
+        data_hash = self.content_hash(data)
+        changed = self.__existing_hash(fname, key) != data_hash
+        if changed:
+            file_dir = os.path.dirname(fname)
+            if file_dir and not os.path.exists(file_dir):
+                os.makedirs(file_dir, exist_ok=True)
+            tmp_fname = "{}.{}.tmp".format(fname, os.getpid())
+            with open(tmp_fname, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_fname, fname)
+            self.__changed.append(key)
+        st = os.stat(fname)
+        self.__updated[key] = {"sha1": data_hash, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        return changed
+
+    def write_text(self, fname: str, text: str) -> bool:
+        return self.write_bytes(fname, text.encode('utf-8'))
+
+    def write_json(self, fname: str, obj) -> bool:
+        return self.write_text(fname, json.dumps(obj, ensure_ascii=False, indent=4))
+
+    def mark_changed(self, key: str):
+        """Reports an artefact stored inside another file (e.g. a table of the specs bundle) as changed."""
+        self.__changed.append(key)
+
+    def take_written(self) -> Tuple[Dict[str, dict], List[str]]:
+        """Returns the updated and changed files since the previous call, e.g. of one service of a worker."""
+        updated, changed = self.__updated, self.__changed
+        self.__updated = {}
+        self.__changed = []
+        return updated, changed
+
+    def merge(self, updated: Dict[str, dict], changed: List[str]):
+        """Merges results of the writer of another process (e.g. a worker of the process pool)."""
+        self.__updated.update(updated)
+        self.__changed.extend(changed)
+
+    def __remove_file(self, key: str, specs_dir: str):
+        fname = os.path.join(self.__root_path, key)
+        try:
+            os.remove(fname)
+        except FileNotFoundError:
+            pass
+        # empty directories of the service are removed up to the specs dir
+        stop_dir = os.path.join(self.__root_path, specs_dir)
+        file_dir = os.path.dirname(fname)
+        while file_dir != stop_dir and file_dir.startswith(stop_dir):
+            try:
+                os.rmdir(file_dir)
+            except OSError:
+                break
+            file_dir = os.path.dirname(file_dir)
+
+    def __prune(self, manifest: Dict[str, dict], services: Set[str], specs_dir: str):
+        for key in list(manifest):
+            parts = key.split(os.sep)
+            if len(parts) <= 2 or parts[0] != specs_dir or parts[1] in services or key in self.__updated:
+                continue
+            del manifest[key]
+            self.__remove_file(key, specs_dir)
+            self.__removed.append(key)
+
+    def save_manifest(self, services: Optional[Iterable[str]] = None, specs_dir: str = "specs"):
+        """
+        With services (all services of the specs) the files of the manifest which belong to the other services
+        are removed.
+        """
+        if self.__manifest_fname is None:
+            logging.info("Output writer: {} files, {} changed".format(len(self.__updated), len(self.__changed)))
+            return
+        manifest = dict(self.__manifest)
+        manifest.update(self.__updated)
+        if services is not None:
+            self.__prune(manifest, set(services), specs_dir)
+        logging.info("Output writer: {} files, {} changed, {} removed".format(
+            len(self.__updated), len(self.__changed), len(self.__removed)))
+        try:
+            manifest_dir = os.path.dirname(self.__manifest_fname)
+            if manifest_dir and not os.path.exists(manifest_dir):
+                os.makedirs(manifest_dir)
+            tmp_fname = "{}.{}.tmp".format(self.__manifest_fname, os.getpid())
+            with open(tmp_fname, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_fname, self.__manifest_fname)
+        except OSError as e:
+            logging.warning("Could not save output manifest '{}': {}".format(self.__manifest_fname, e))
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import markdown2
+from jinja2 import Environment
+
+
+class MarkdownRenderer:
+    """
+    Renders markdown jinja2 templates of the specs (descriptions, protocols) to html.
+    Templates are compiled by one shared Environment, the html is cached in LRU by the hash of the source text
+    and can be saved to the cache file to be reused by the next runs.
+    """
+
+    max_cache_size = 65536
+
+    __environment: Optional[Environment] = None
+
+    __template_vars: dict
+
+    __vars_hash: str
+
+    __cache: 'OrderedDict[str, str]'
+
+    __cache_fname: Optional[str]
+
+    __rendered: Dict[str, str]
+
+    __hits: int
+
+    __misses: int
+
+    def __init__(self, template_vars, cache_fname: Optional[str] = None, max_cache_size: Optional[int] = None):
+        self.__template_vars = dict(template_vars)
+        # the cached html depends on the template vars and the markdown converter
+        self.__vars_hash = hashlib.sha1(json.dumps(
+            [markdown2.__version__, self.__template_vars], sort_keys=True, default=str).encode('utf8')).hexdigest()
+        self.__cache = OrderedDict()
+        self.__rendered = {}
+        self.__cache_fname = cache_fname
+        if max_cache_size is not None:
+            self.max_cache_size = max_cache_size
+        self.__hits = 0
+        self.__misses = 0
+        self.__load()
+
+    @classmethod
+    def environment(cls) -> Environment:
+        if cls.__environment is None:
+            cls.__environment = Environment()
+        return cls.__environment
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def rendered(self) -> Dict[str, str]:
+        """html rendered by this renderer, not loaded from the cache file."""
+        return self.__rendered
+
+    def take_rendered(self) -> Dict[str, str]:
+        """Returns the html rendered since the previous call, e.g. for one service of a worker."""
+        rendered = self.__rendered
+        self.__rendered = {}
+        return rendered
+
+    def add(self, rendered: Dict[str, str]):
+        for key, html in rendered.items():
+            self.__put(key, html)
+            self.__rendered[key] = html
+
+    def __put(self, key: str, html: str):
+        self.__cache[key] = html
+        self.__cache.move_to_end(key)
+        if len(self.__cache) > self.max_cache_size:
+            self.__cache.popitem(last=False)
+
+    @staticmethod
+    def text_hash(md_template_text: str) -> str:
+        return hashlib.sha1(md_template_text.encode('utf8')).hexdigest()
+
+    def render(self, md_template_text: str) -> str:
+        key = self.text_hash(md_template_text)
+        html = self.__cache.get(key)
+        if html is not None:
+            self.__cache.move_to_end(key)
+            self.__hits += 1
+            return html
+        self.__misses += 1
+        md_text = self.environment().from_string(md_template_text).render(self.__template_vars)
+        html = markdown2.markdown(md_text)
+        self.__put(key, html)
+        self.__rendered[key] = html
+        return html
+
+    def __load(self):
+        if self.__cache_fname is None or not os.path.isfile(self.__cache_fname):
+            return
+        try:
+            with open(self.__cache_fname, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Could not load markdown cache '{}': {}".format(self.__cache_fname, e))
+            return
+        if cache.get("vars_hash") != self.__vars_hash:
+            return
+        for key, html in cache["html"][-self.max_cache_size:]:
+            self.__cache[key] = html
+
+    def save(self):
+        if self.__cache_fname is None or len(self.__rendered) == 0:
+            return
+        try:
+            cache_dir = os.path.dirname(self.__cache_fname)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            tmp_fname = "{}.{}.tmp".format(self.__cache_fname, os.getpid())
+            with open(tmp_fname, 'w') as f:
+                json.dump({"vars_hash": self.__vars_hash, "html": list(self.__cache.items())}, f)
+            os.replace(tmp_fname, self.__cache_fname)
+        except OSError as e:
+            logging.warning("Could not save markdown cache '{}': {}".format(self.__cache_fname, e))
@@ -0,0 +1,138 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from core.specs.service.connector import ServiceSpecConnector, ChannelType
+from core.specs.service.spec import ServiceSpec
+
+
+class ChannelKey(NamedTuple):
+    broker: str
+    channel_type: ChannelType
+    name: str
+
+
+class ChannelGraph:
+    """
+    Producers/consumers adjacency of the broker channels (topics, queues, celery tasks)
+    together with the connect_to edges between services. It is built once by ServicesSpecs.
+    """
+    BROKER_CHANNEL_TYPES = (ChannelType.topic, ChannelType.queue, ChannelType.celery_task)
+
+    __producers: Dict[ChannelKey, Dict[str, None]]
+
+    __consumers: Dict[ChannelKey, Dict[str, None]]
+
+    __broker_channels: Dict[str, Dict[ChannelKey, None]]
+
+    __service_channels: Dict[str, Dict[str, Dict[ChannelKey, None]]]
+
+    __outbound: Dict[str, List[ServiceSpecConnector]]
+
+    __inbound: Dict[str, List[ServiceSpecConnector]]
+
+    def __init__(self):
+        self.__producers = {}
+        self.__consumers = {}
+        self.__broker_channels = {}
+        self.__service_channels = {}
+        self.__outbound = {}
+        self.__inbound = {}
+
+    @staticmethod
+    def connector_channels(connector: ServiceSpecConnector) -> List[ChannelKey]:
+        if connector.channel_type not in ChannelGraph.BROKER_CHANNEL_TYPES or not connector.has_channels:
+            return []
+        broker_name = connector.dest.service_name
+        return [ChannelKey(broker_name, connector.channel_type, name) for name in connector.channels]
+
+    def add_channel(self, key: ChannelKey):
+        if key in self.__producers:
+            return
+        self.__producers[key] = {}
+        self.__consumers[key] = {}
+        self.__broker_channels.setdefault(key.broker, {})[key] = None
+
+    def add_broker(self, broker: ServiceSpec):
+        for channel_type, channels in ((ChannelType.topic, broker.topics),
+                                       (ChannelType.queue, broker.queues),
+                                       (ChannelType.celery_task, broker.celery_tasks)):
+            if channels is None:
+                continue
+            for channel_name in channels:
+                self.add_channel(ChannelKey(broker.service_name, channel_type, channel_name))
+
+    def add_connector(self, connector: ServiceSpecConnector):
+        source_name = connector.source.service_name
+        self.__outbound.setdefault(source_name, []).append(connector)
+        self.__inbound.setdefault(connector.dest.service_name, []).append(connector)
+        if not connector.dest.is_broker:
+            return
+        for key in self.connector_channels(connector):
+            self.add_channel(key)
+            service_channels = self.__service_channels.setdefault(source_name, {"rx": {}, "tx": {}})
+            if connector.data_direction in ("tx", "rx_tx"):
+                self.__producers[key][source_name] = None
+                service_channels["tx"][key] = None
+            if connector.data_direction in ("rx", "rx_tx"):
+                self.__consumers[key][source_name] = None
+                service_channels["rx"][key] = None
+
+    def channels(self,
+                 broker_name: Optional[str] = None,
+                 channel_type: Optional[ChannelType] = None) -> List[ChannelKey]:
+        keys = self.__producers if broker_name is None else self.__broker_channels.get(broker_name, {})
+        return [key for key in keys if channel_type is None or key.channel_type == channel_type]
+
+    def has_channel(self, key: ChannelKey) -> bool:
+        return key in self.__producers
+
+    def producers(self, key: ChannelKey) -> Tuple[str, ...]:
+        return tuple(self.__producers.get(key, ()))
+
+    def consumers(self, key: ChannelKey) -> Tuple[str, ...]:
+        return tuple(self.__consumers.get(key, ()))
+
+    def fan_in(self, key: ChannelKey) -> int:
+        return len(self.__producers.get(key, ()))
+
+    def fan_out(self, key: ChannelKey) -> int:
+        return len(self.__consumers.get(key, ()))
+
+    def service_channels(self, service_name: str, data_direction: Optional[str] = None) -> List[ChannelKey]:
+        service_channels = self.__service_channels.get(service_name)
+        if service_channels is None:
+            return []
+        if data_direction is not None:
+            return list(service_channels[data_direction])
+        return list(service_channels["tx"]) + [k for k in service_channels["rx"] if k not in service_channels["tx"]]
+
+    def outbound_connectors(self, service_name: str) -> List[ServiceSpecConnector]:
+        return self.__outbound.get(service_name, [])
+
+    def inbound_connectors(self, service_name: str) -> List[ServiceSpecConnector]:
+        return self.__inbound.get(service_name, [])
+
+    def neighbours(self, service_name: str) -> List[str]:
+        neighbours = {}
+        for connector in self.outbound_connectors(service_name):
+            neighbours[connector.dest.service_name] = None
+        for connector in self.inbound_connectors(service_name):
+            neighbours[connector.source.service_name] = None
+        for key in self.service_channels(service_name, "rx"):
+            neighbours.update(self.__producers[key])
+        for key in self.service_channels(service_name, "tx"):
+            neighbours.update(self.__consumers[key])
+        neighbours.pop(service_name, None)
+        return list(neighbours)
+
+    @classmethod
+    def build(cls, services: Iterable[ServiceSpec]) -> 'ChannelGraph':
+        graph = cls()
+        brokers = []
+        for spec in services:
+            for connector in spec.connectors:
+                graph.add_connector(connector)
+            if spec.is_broker:
+                brokers.append(spec)
+        for broker in brokers:
+            graph.add_broker(broker)
+        return graph
@@ -0,0 +1,129 @@
+import logging
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+from core.git.branch import Branch
+from core.git.meta_revision import GitMetaRevision
+from core.specs.specs import ServicesSpecs
+
+
+class SpecsDiff:
+    """
+    Changed services between two ServicesSpecs (e.g. two git revisions of meta) and the closure of services
+    whose generated artefacts depend on them: connect_to neighbours, producers/consumers of the shared
+    channels and brokers. Any change of the settings or the schema definitions affects all services.
+    """
+
+    __base: ServicesSpecs
+
+    __current: ServicesSpecs
+
+    __added: List[str]
+
+    __removed: List[str]
+
+    __modified: List[str]
+
+    __is_global_change: bool
+
+    __affected: Optional[List[str]]
+
+    def __init__(self, base: ServicesSpecs, current: ServicesSpecs):
+        self.__base = base
+        self.__current = current
+        base_hashes = base.source_hashes
+        current_hashes = current.source_hashes
+        self.__added = [s for s in current_hashes if s not in base_hashes]
+        self.__removed = [s for s in base_hashes if s not in current_hashes]
+        self.__modified = [s for s, h in current_hashes.items() if s in base_hashes and base_hashes[s] != h]
+        self.__is_global_change = base.settings.raw != current.settings.raw or \
+            base.definitions_hash != current.definitions_hash
+        self.__affected = None
+
+    @classmethod
+    def from_revision(cls,
+                      meta_path: str,
+                      base_revision: str,
+                      topics_info_filename: str,
+                      branch: Branch,
+                      current: Optional[ServicesSpecs] = None) -> 'SpecsDiff':
+        """
+        The base specs are loaded from the meta of base_revision with the current topics info file: the file is
+        written to the specs repository and is not versioned with the meta, so changes of the topics info are not
+        reported as the modified services.
+        """
+        if current is None:
+            current = ServicesSpecs(meta_path, topics_info_filename, branch)
+        with tempfile.TemporaryDirectory(prefix="meta_") as base_meta_path:
+            GitMetaRevision.export(meta_path, base_revision, base_meta_path)
+            base = ServicesSpecs(base_meta_path, topics_info_filename, branch)
+        return cls(base, current)
+
+    @property
+    def base(self) -> ServicesSpecs:
+        return self.__base
+
+    @property
+    def current(self) -> ServicesSpecs:
+        return self.__current
+
+    @property
+    def added_services(self) -> List[str]:
+        return self.__added
+
+    @property
+    def removed_services(self) -> List[str]:
+        return self.__removed
+
+    @property
+    def modified_services(self) -> List[str]:
+        return self.__modified
+
+    @property
+    def changed_services(self) -> List[str]:
+        return self.__added + self.__modified + self.__removed
+
+    @property
+    def is_global_change(self) -> bool:
+        return self.__is_global_change
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.__is_global_change and not self.changed_services
+
+    @staticmethod
+    def __dependent_services(services_specs: ServicesSpecs, service_name: str) -> Iterable[str]:
+        channels = services_specs.channels
+        dependent = {}
+        for neighbour in channels.neighbours(service_name):
+            dependent[neighbour] = None
+        # rx/tx tables list all producers and consumers of the channel, not only the opposite side
+        for key in channels.service_channels(service_name):
+            dependent[key.broker] = None
+            dependent.update((s, None) for s in channels.producers(key))
+            dependent.update((s, None) for s in channels.consumers(key))
+        return dependent
+
+    @property
+    def affected_services(self) -> List[str]:
+        """Services of the current specs whose artefacts should be regenerated."""
+        if self.__affected is not None:
+            return self.__affected
+        all_services = self.__current.all_services
+        if self.__is_global_change:
+            self.__affected = list(all_services)
+            return self.__affected
+        affected: Dict[str, None] = {}
+        for service_name in self.changed_services:
+            affected[service_name] = None
+            # dependencies of both revisions: a removed connection changes the former neighbour too
+            for services_specs in (self.__base, self.__current):
+                affected.update((s, None) for s in self.__dependent_services(services_specs, service_name))
+        self.__affected = [s for s in all_services if s in affected]
+        return self.__affected
+
+    def log(self):
+        if self.__is_global_change:
+            logging.info("Specs diff: settings or definitions were changed, all services are affected")
+        logging.info("Specs diff: added {}, modified {}, removed {}, affected {}".format(
+            self.__added, self.__modified, self.__removed, self.affected_services))
@@ -0,0 +1,88 @@
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from core.specs.service.spec import ServiceSpec
+
+
+class ServicesIndex:
+    """Immutable lookup tables for service names, node aliases, categories and availability."""
+
+    __all_services: Mapping[str, ServiceSpec]
+
+    __available_services: Mapping[str, ServiceSpec]
+
+    __unavailable_services: Mapping[str, ServiceSpec]
+
+    __specs_by_node: Mapping[str, ServiceSpec]
+
+    __raw_specs_by_node: Mapping[str, Optional[dict]]
+
+    __categories: Mapping[str, Tuple[str, ...]]
+
+    def __init__(self,
+                 row_services_specs: dict,
+                 categories: list,
+                 available_services: Dict[str, ServiceSpec],
+                 unavailable_services: Dict[str, ServiceSpec]):
+        all_services = {}
+        all_services.update(unavailable_services)
+        all_services.update(available_services)
+        self.__all_services = MappingProxyType(all_services)
+        self.__available_services = MappingProxyType(dict(available_services))
+        self.__unavailable_services = MappingProxyType(dict(unavailable_services))
+
+        specs_by_node = {}
+        for service_name, spec in all_services.items():
+            specs_by_node.setdefault(service_name, spec)
+            for node in self.__nodes(spec.raw):
+                specs_by_node.setdefault(node, spec)
+        self.__specs_by_node = MappingProxyType(specs_by_node)
+
+        raw_specs_by_node = {}
+        categories_services = {}
+        for category in categories:
+            category_specs = row_services_specs[category]
+            categories_services[category] = tuple(category_specs)
+            for service_name in category_specs:
+                raw_specs_by_node.setdefault(service_name, category_specs[service_name])
+            for service_name in category_specs:
+                for node in self.__nodes(category_specs[service_name]):
+                    raw_specs_by_node.setdefault(node, category_specs[service_name])
+        self.__raw_specs_by_node = MappingProxyType(raw_specs_by_node)
+        self.__categories = MappingProxyType(categories_services)
+
+    @staticmethod
+    def __nodes(raw: Optional[dict]) -> list:
+        if raw is None or 'nodes' not in raw or not isinstance(raw['nodes'], list):
+            return []
+        return [node for node in raw['nodes'] if isinstance(node, str)]
+
+    @property
+    def all_services(self) -> Mapping[str, ServiceSpec]:
+        return self.__all_services
+
+    @property
+    def available_services(self) -> Mapping[str, ServiceSpec]:
+        return self.__available_services
+
+    @property
+    def unavailable_services(self) -> Mapping[str, ServiceSpec]:
+        return self.__unavailable_services
+
+    def is_available(self, service_name: str) -> bool:
+        return service_name in self.__available_services
+
+    def spec(self, service_name: str) -> Optional[ServiceSpec]:
+        return self.__all_services.get(service_name)
+
+    def spec_by_node(self, service_node_name: str) -> Optional[ServiceSpec]:
+        return self.__specs_by_node.get(service_node_name)
+
+    def has_raw_spec(self, service_node_name: str) -> bool:
+        return service_node_name in self.__raw_specs_by_node
+
+    def raw_spec(self, service_node_name: str) -> Optional[dict]:
+        return self.__raw_specs_by_node.get(service_node_name)
+
+    def category_services(self, category: str) -> Tuple[str, ...]:
+        return self.__categories.get(category, ())
@@ -11,10 +11,14 @@ class ChannelType(Enum):
 
 
 class ServiceSpecConnector:
+    __slots__ = ('__connect_to', 'source', 'dest', '__channel_type', '__channels', '__data_direction')
+
     __connect_to: Optional[dict]
     source: 'ServiceSpec'
     dest: 'ServiceSpec'
     __channel_type: ChannelType
+    __channels: Optional[dict]
+    __data_direction: str
 
     @staticmethod
     def __many(channel_type: ChannelType) -> str:
@@ -25,11 +29,16 @@ class ServiceSpecConnector:
         elif channel_type == ChannelType.celery_task:
             return "celery_tasks"
 
-    def __init__(self, raw: dict, source: 'ServiceSpec', dest: 'ServiceSpec'):
+    def __init__(self, raw: dict, source: 'ServiceSpec', dest: 'ServiceSpec', compiled: bool = False):
         self.__connect_to = raw
         self.source = source
         self.dest = dest
         self.__set_channel_type()
+        self.__set_channels()
+        self.__data_direction = raw["data_direction"] if "data_direction" in raw else ""
+        if compiled:
+            # raw specs were already extended by this connector (e.g. loaded from a specs snapshot)
+            return
         self.__set_transport()
         self.__update_service_specs()
 
@@ -60,18 +69,25 @@ class ServiceSpecConnector:
         else:
             self.__channel_type = ChannelType.other
 
+    def __set_channels(self):
+        self.__channels = None
+        if self.__channel_type == ChannelType.other:
+            return
+        key = self.__many(self.__channel_type)
+        if key in self.__connect_to and self.__connect_to[key] != None:
+            self.__channels = self.__connect_to[key]
+
+    @property
+    def raw(self) -> dict:
+        return self.__connect_to
+
     @property
     def has_channels(self) -> bool:
-        return self.channels is not None
+        return self.__channels is not None
 
     @property
     def channels(self) -> Optional[dict]:
-        if self.channel_type == ChannelType.other:
-            return None
-        key = self.__many(self.__channel_type)
-        if key in self.__connect_to and self.__connect_to[key] != None:
-            return self.__connect_to[key]
-        return None
+        return self.__channels
 
     @property
     def to_broker_connect(self) -> bool:
@@ -103,9 +119,7 @@ class ServiceSpecConnector:
 
     @property
     def data_direction(self) -> str:
-        if "data_direction" not in self.__connect_to:
-            return ""
-        return self.__connect_to["data_direction"]
+        return self.__data_direction
 
     @property
     def description(self) -> str:
@@ -116,7 +130,7 @@ class ServiceSpecConnector:
     def __update_service_specs(self):
 
         if self.channel_type == ChannelType.celery_task:
-            self.dest.raw['used_as_celery'] = True
+            self.dest.set_used_as_celery()
         if not self.dest.is_broker:
             return
         if self.channel_type not in [ChannelType.celery_task, ChannelType.topic, ChannelType.queue]:
@@ -1,5 +1,4 @@
 import logging
-from ctypes import Array
 from enum import Enum, auto
 from typing import Optional, List
 
@@ -32,6 +31,14 @@ class ServiceStatus(Enum):
 
 
 class ServiceSpec:
+    """
+    Status, type, module, category and the broker flags are compiled from the raw spec when it is set.
+    The compiled fields are not updated by the changes of the raw dict: assign the new raw spec or use
+    the setters (e.g. set_used_as_celery) instead of mutating these fields of raw.
+    """
+    __slots__ = ('service_name', '__raw_spec', '__settings', '__connectors',
+                 '__status', '__type', '__service_type', '__module', '__category', '__is_product',
+                 '__is_kafka_broker', '__is_mq_broker', '__is_celery_broker')
 
     service_name: str
 
@@ -41,11 +48,48 @@ class ServiceSpec:
 
     __connectors: List[ServiceSpecConnector]
 
+    __status: ServiceStatus
+
+    __type: str
+
+    __service_type: ServiceType
+
+    __module: Optional[str]
+
+    __category: Optional[str]
+
+    __is_product: bool
+
+    __is_kafka_broker: bool
+
+    __is_mq_broker: bool
+
+    __is_celery_broker: bool
+
     def __init__(self, service_name: str, settings: Settings):
         self.service_name = service_name
-        self.__raw_spec = None
         self.__settings = settings
         self.__connectors = []
+        self.raw = None
+
+    def __compile(self):
+        # derived fields are computed once, when the raw spec is set
+        raw = self.__raw_spec if self.__raw_spec is not None else {}
+        try:
+            self.__status = ServiceStatus[raw['status']]
+        except (KeyError, TypeError):
+            self.__status = ServiceStatus.unknown
+        self.__type = raw['type'] if 'type' in raw else ""
+        try:
+            self.__service_type = ServiceType(self.__type)
+        except ValueError:
+            self.__service_type = ServiceType.unknown
+        self.__module = raw.get('module')
+        self.__category = raw.get('category')
+        self.__is_product = self.__category in self.__settings.service_categories.product_services
+        self.__is_kafka_broker = self.__type in [ServiceType.kafka.value]
+        self.__is_mq_broker = self.__type in [ServiceType.activemq.value]
+        self.__is_celery_broker = raw.get('used_as_celery') is True
 
     @property
     def wiki_name(self) -> str:
@@ -53,15 +97,15 @@ class ServiceSpec:
 
     @property
     def is_pro(self) -> bool:
-        return self.status == ServiceStatus.ready
+        return self.__status == ServiceStatus.ready
 
     @property
     def is_release_service(self):
-        return self.status == ServiceStatus.ready
+        return self.__status == ServiceStatus.ready
 
     @property
     def is_master_service(self):
-        return self.status in [ServiceStatus.ready, ServiceStatus.develop, ServiceStatus.deprecated]
+        return self.__status in [ServiceStatus.ready, ServiceStatus.develop, ServiceStatus.deprecated]
 
     @property
     def unavailable(self) -> bool:
@@ -75,35 +119,43 @@ class ServiceSpec:
 
     @property
     def service_module(self) -> str:
-        if 'module' not in self.__raw_spec:
-            print('error')
-        return self.__raw_spec['module']
+        if self.__module is None:
+            if self.__raw_spec is None or 'module' not in self.__raw_spec:
+                raise Exception(
+                    "Could not find 'module' field of the service '{}'. Please, check meta data!".format(
+                        self.service_name))
+            return self.__raw_spec['module']
+        return self.__module
 
     @property
     def category(self) -> str:
-        return self.__raw_spec['category']
+        if self.__category is None:
+            return self.__raw_spec['category']
+        return self.__category
 
     @property
     def is_product(self) -> bool:
-        return self.category in self.__settings.service_categories.product_services
+        return self.__is_product
 
     @property
     def is_kafka_broker(self) -> bool:
-        return self.type in [ServiceType.kafka.value]
+        return self.__is_kafka_broker
 
     @property
     def is_mq_broker(self) -> bool:
-        return self.type in [ServiceType.activemq.value]
+        return self.__is_mq_broker
 
     @property
     def is_celery_broker(self) -> bool:
-        return 'used_as_celery' in self.__raw_spec and self.__raw_spec['used_as_celery'] is True
+        return self.__is_celery_broker
+
+    def set_used_as_celery(self):
+        self.__raw_spec['used_as_celery'] = True
+        self.__is_celery_broker = True
 
     @property
     def is_broker(self) -> bool:
-        return (self.is_kafka_broker is True or
-                self.is_celery_broker is True  or
-                self.is_mq_broker is True)
+        return self.__is_kafka_broker or self.__is_celery_broker or self.__is_mq_broker
 
     @property
     def settings(self) -> Settings:
@@ -111,19 +163,15 @@ class ServiceSpec:
 
     @property
     def type(self) -> str:
-        try:
-            if 'type' not in self.__raw_spec:
-                return ""
-            return self.__raw_spec['type']
-        except:
-            return ""
+        return self.__type
+
+    @property
+    def service_type(self) -> ServiceType:
+        return self.__service_type
 
     @property
     def status(self) -> ServiceStatus:
-        try:
-            return ServiceStatus[self.__raw_spec['status']]
-        except:
-            return ServiceStatus.unknown
+        return self.__status
 
     @property
     def dev_teams(self) -> Optional[list]:
@@ -149,6 +197,7 @@ class ServiceSpec:
     @raw.setter
     def raw(self, value: dict):
         self.__raw_spec = value
+        self.__compile()
 
     @property
     def connectors(self) -> List[ServiceSpecConnector]:
@@ -121,6 +121,20 @@ class Settings:
         self.__service_categories_name = ServiceCategoryNameWrapper(self.__raw["categories"])
         self.__confluence = ConfluenceSettings(self.__raw["confluence"])
 
+    @classmethod
+    def from_raw(cls, meta_path: str, raw: dict) -> 'Settings':
+        """Settings of the already parsed settings.yaml (e.g. loaded from a specs snapshot)."""
+        self = cls.__new__(cls)
+        self.__meta_path = meta_path
+        self.__raw = raw
+        self.__service_categories_name = ServiceCategoryNameWrapper(raw["categories"])
+        self.__confluence = ConfluenceSettings(raw["confluence"])
+        return self
+
+    @property
+    def raw(self) -> dict:
+        return self.__raw
+
     @property
     def meta_path(self):
         return self.__meta_path
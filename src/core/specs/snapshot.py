@@ -0,0 +1,121 @@
+import glob
+import hashlib
+import logging
+import marshal
+import os
+import struct
+from typing import List, Optional
+
+from core.git.branch import Branch
+from core.specs.specs import ServicesSpecs
+
+
+class ServicesSpecsSnapshot:
+    """
+    Compiled binary snapshot of ServicesSpecs which is shared by the pipeline stages.
+    The first stage parses yaml specs and writes the snapshot, next stages load it instead of parsing.
+
+    File layout: MAGIC | VERSION (uint16) | sha256 of the meta inputs and the specs code (32 bytes) |
+    marshal of ServicesSpecs.snapshot_state(). Only plain data is stored (no pickle), so the file in the shared
+    output volume could not run code, the code hash invalidates snapshots of the other versions of the model.
+    """
+    MAGIC = b"ARCHSPEC"
+
+    # format of the file, the changes of the specs model are covered by the code hash
+    VERSION = 4
+
+    __header = struct.Struct(">8sH32s")
+
+    __code_hash: Optional[bytes] = None
+
+    __fname: str
+
+    def __init__(self, fname: str):
+        self.__fname = fname
+
+    @property
+    def fname(self) -> str:
+        return self.__fname
+
+    @staticmethod
+    def input_files(meta_path: str, topics_info_filename: str) -> List[str]:
+        files = [meta_path + "/settings.yaml"]
+        files.extend(sorted(glob.glob(meta_path + "/specifications/*.yaml")))
+        files.append(meta_path + "/specifications/schema/definitions.yaml")
+        if os.path.isfile(topics_info_filename):
+            files.append(topics_info_filename)
+        return files
+
+    @staticmethod
+    def code_files() -> List[str]:
+        core_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        files = sorted(glob.glob(core_path + "/specs/**/*.py", recursive=True))
+        files.extend([core_path + "/yaml.py", core_path + "/git/branch.py"])
+        return files
+
+    @classmethod
+    def code_hash(cls) -> bytes:
+        """Hash of the sources which parse and extend the specs."""
+        if cls.__code_hash is None:
+            h = hashlib.sha256()
+            for fname in cls.code_files():
+                h.update(os.path.basename(fname).encode('utf8'))
+                with open(fname, 'rb') as f:
+                    h.update(f.read())
+            cls.__code_hash = h.digest()
+        return cls.__code_hash
+
+    @classmethod
+    def inputs_hash(cls, meta_path: str, topics_info_filename: str, branch: Branch) -> bytes:
+        h = hashlib.sha256(cls.code_hash())
+        h.update("{}:{}:{}".format(cls.VERSION, os.path.abspath(meta_path), branch.name).encode('utf8'))
+        for fname in cls.input_files(meta_path, topics_info_filename):
+            h.update(os.path.basename(fname).encode('utf8'))
+            with open(fname, 'rb') as f:
+                h.update(f.read())
+        return h.digest()
+
+    def load(self, inputs_hash: bytes) -> Optional[ServicesSpecs]:
+        if not os.path.isfile(self.__fname):
+            return None
+        with open(self.__fname, 'rb') as f:
+            header = f.read(self.__header.size)
+            if len(header) != self.__header.size:
+                return None
+            magic, version, snapshot_hash = self.__header.unpack(header)
+            if magic != self.MAGIC or version != self.VERSION or snapshot_hash != inputs_hash:
+                return None
+            try:
+                state = marshal.load(f)
+                if not isinstance(state, dict):
+                    raise ValueError("unexpected snapshot state")
+                return ServicesSpecs.from_snapshot_state(state)
+            except Exception as e:
+                logging.warning("Could not load specs snapshot '{}': {}".format(self.__fname, e))
+                return None
+
+    def save(self, services_specs: ServicesSpecs, inputs_hash: bytes):
+        snapshot_dir = os.path.dirname(self.__fname)
+        if snapshot_dir and not os.path.exists(snapshot_dir):
+            os.makedirs(snapshot_dir)
+        # raises ValueError for the values which are not plain data (e.g. yaml dates)
+        data = marshal.dumps(services_specs.snapshot_state())
+        tmp_fname = "{}.{}.tmp".format(self.__fname, os.getpid())
+        with open(tmp_fname, 'wb') as f:
+            f.write(self.__header.pack(self.MAGIC, self.VERSION, inputs_hash))
+            f.write(data)
+        os.replace(tmp_fname, self.__fname)
+
+    def load_or_create(self, meta_path: str, topics_info_filename: str, branch: Branch) -> ServicesSpecs:
+        inputs_hash = self.inputs_hash(meta_path, topics_info_filename, branch)
+        services_specs = self.load(inputs_hash)
+        if services_specs is not None:
+            logging.info("Specs were loaded from the snapshot '{}'".format(self.__fname))
+            return services_specs
+        services_specs = ServicesSpecs(meta_path, topics_info_filename, branch)
+        try:
+            self.save(services_specs, inputs_hash)
+            logging.info("Specs snapshot '{}' was updated".format(self.__fname))
+        except (OSError, ValueError) as e:
+            logging.warning("Could not save specs snapshot '{}': {}".format(self.__fname, e))
+        return services_specs
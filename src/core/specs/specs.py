@@ -1,7 +1,11 @@
+import hashlib
+import json
 import logging
 import os
-from typing import Optional
+from typing import Dict, Mapping, Optional
 
+from core.specs.channels import ChannelGraph
+from core.specs.index import ServicesIndex
 from core.specs.service.connector import ServiceSpecConnector, ChannelType
 from core.specs.service.spec import ServiceSpec
 from core.yaml import read_yaml
@@ -21,8 +25,14 @@ class ServicesSpecs:
 
     __unavailable_services: dict
 
+    __index: ServicesIndex
+
+    __channels: ChannelGraph
+
     __settings: Settings
 
+    __source_hashes: Dict[str, str]
+
     def __init__(self, meta_path: str, topics_info_filename: str, current_banch: Branch):
         self.__current_banch = current_banch
         self.__settings = Settings(meta_path)
@@ -35,12 +45,78 @@ class ServicesSpecs:
         self.__unavailable_services = {}
         self.__extend_specs()
 
+    @classmethod
+    def from_row_specs(cls,
+                       settings: Settings,
+                       row_services_specs: dict,
+                       topics_info: dict,
+                       current_banch: Branch) -> 'ServicesSpecs':
+        """Builds specs from already parsed yaml, row_services_specs are extended in place."""
+        self = cls.__new__(cls)
+        self.__current_banch = current_banch
+        self.__settings = settings
+        self.row_services_specs = row_services_specs
+        self.__topics_info = topics_info
+        self.__services = {}
+        self.__unavailable_services = {}
+        self.__extend_specs()
+        return self
+
+    def snapshot_state(self) -> dict:
+        """
+        Plain data (dicts, lists, strings, numbers) of the specs. Raw specs are stored already extended,
+        so from_snapshot_state() only creates the spec/connector objects and does not repeat the extension.
+        """
+        return {
+            "meta_path": self.__settings.meta_path,
+            "settings": self.__settings.raw,
+            "row_services_specs": self.row_services_specs,
+            "topics_info": self.__topics_info,
+            "current_branch": self.__current_banch.name,
+            "source_hashes": self.__source_hashes,
+        }
+
+    @classmethod
+    def from_snapshot_state(cls, state: dict) -> 'ServicesSpecs':
+        self = cls.__new__(cls)
+        self.__setstate__(state)
+        return self
+
+    def __getstate__(self) -> dict:
+        return self.snapshot_state()
+
+    def __setstate__(self, state: dict):
+        self.row_services_specs = state["row_services_specs"]
+        self.__topics_info = state["topics_info"]
+        self.__current_banch = Branch(state["current_branch"])
+        self.__settings = Settings.from_raw(state["meta_path"], state["settings"])
+        self.__source_hashes = state["source_hashes"]
+        self.__services = {}
+        self.__unavailable_services = {}
+        self.__extend_specs(compiled=True)
+
+    @staticmethod
+    def category_specs_fname(meta_path: str, category: str) -> str:
+        return meta_path + "/specifications/{}.yaml".format(category)
+
+    @staticmethod
+    def definitions_fname(meta_path: str) -> str:
+        return meta_path + "/specifications/schema/definitions.yaml"
+
+    @staticmethod
+    def upload_category_specs(meta_path: str, category: str) -> dict:
+        return read_yaml(ServicesSpecs.category_specs_fname(meta_path, category))[category]
+
+    @staticmethod
+    def upload_definitions(meta_path: str) -> dict:
+        return read_yaml(ServicesSpecs.definitions_fname(meta_path))["definitions"]
+
     @staticmethod
     def upload_row_services_specs(meta_path: str, settings: Settings) -> dict:
         out = {"definitions": {}}
         for category in settings.service_categories.all:
-            out[category] = read_yaml(meta_path + "/specifications/{}.yaml".format(category))[category]
-        out["definitions"] = read_yaml(meta_path + "/specifications/schema/definitions.yaml")["definitions"]
+            out[category] = ServicesSpecs.upload_category_specs(meta_path, category)
+        out["definitions"] = ServicesSpecs.upload_definitions(meta_path)
         return out
 
     def __is_service_avaliable(self, service: ServiceSpec) -> bool:
@@ -50,10 +126,25 @@ class ServicesSpecs:
             return False
         return service.is_master_service
 
-    def __extend_specs(self):
+    @staticmethod
+    def raw_spec_hash(spec_raw: Optional[dict]) -> str:
+        try:
+            dump = json.dumps(spec_raw, sort_keys=True, default=str)
+        except TypeError:
+            # keys of the different types could not be sorted
+            dump = json.dumps(spec_raw, default=str)
+        return hashlib.sha1(dump.encode('utf8')).hexdigest()
+
+    def __extend_specs(self, compiled: bool = False):
+        if not compiled:
+            self.__source_hashes = {}
         for e in self.service_categories.all:
             for service_name in self.row_services_specs[e]:
                 spec_raw = self.row_services_specs[e][service_name]
+                if not compiled:
+                    # hash of the spec as it is written in yaml, before any extension
+                    self.__source_hashes.setdefault(service_name,
+                                                    self.raw_spec_hash({"category": e, "spec": spec_raw}))
                 if spec_raw is None:
                     continue
                 spec_raw['category'] = e
@@ -64,16 +155,18 @@ class ServicesSpecs:
                 else:
                     self.__unavailable_services[service_spec.service_name] = service_spec
                     service_spec.raw['unavailable'] = True
+        self.__index = ServicesIndex(self.row_services_specs, self.service_categories.all,
+                                     self.__services, self.__unavailable_services)
 
-        for service_name in self.available_services:
-            source_spec = self.get_service_spec(service_name)
+        for source_spec in self.available_services.values():
             if 'connect_to' not in source_spec.raw or \
                     source_spec.raw['connect_to'] is None:
                 continue
             for c in source_spec.raw['connect_to']:
                 dest_spec = self.get_service_spec(c['name'])
-                connector = ServiceSpecConnector(c, source_spec, dest_spec)
+                connector = ServiceSpecConnector(c, source_spec, dest_spec, compiled)
                 source_spec.connectors.append(connector)
+        self.__channels = ChannelGraph.build(self.available_services.values())
 
 
     @property
@@ -85,48 +178,41 @@ class ServicesSpecs:
         return self.__settings.service_categories
 
     @property
-    def available_services(self):
-        return self.__services
+    def index(self) -> ServicesIndex:
+        return self.__index
+
+    @property
+    def channels(self) -> ChannelGraph:
+        return self.__channels
+
+    @property
+    def available_services(self) -> Mapping[str, ServiceSpec]:
+        return self.__index.available_services
+
+    @property
+    def all_services(self) -> Mapping[str, ServiceSpec]:
+        return self.__index.all_services
 
     @property
-    def all_services(self):
-        all_services = {}
-        all_services.update(self.__unavailable_services)
-        all_services.update(self.__services)
-        return all_services
+    def unavailable_services(self) -> Mapping[str, ServiceSpec]:
+        return self.__index.unavailable_services
 
     @property
-    def unavailable_services(self):
-        return self.__unavailable_services
+    def source_hashes(self) -> Mapping[str, str]:
+        return self.__source_hashes
+
+    @property
+    def definitions_hash(self) -> str:
+        return self.raw_spec_hash(self.row_services_specs["definitions"])
 
     def get_service_spec_raw(self, service_name: str) -> Optional[dict]:
-        for e in self.settings.service_categories.all:
-            if service_name in self.row_services_specs[e]:
-                return self.row_services_specs[e][service_name]
-            for service_name in self.row_services_specs[e]:
-                if 'nodes' in self.row_services_specs[e][service_name] and \
-                        service_name in self.row_services_specs[e][service_name]['nodes']:
-                    return self.row_services_specs[e][service_name]
-        return None
+        return self.__index.raw_spec(service_name)
 
     def exists_service_spec(self, service_name: str) -> bool:
         return self.get_service_spec_raw(service_name) is not None
 
     def get_service_spec(self, service_name) -> Optional[ServiceSpec]:
-        if service_name not in self.all_services:
-            return None
-        if service_name in self.__services:
-            return self.__services[service_name]
-        return self.__unavailable_services[service_name]
+        return self.__index.spec(service_name)
 
     def get_service_spec_by_node(self, service_node_name) -> Optional[ServiceSpec]:
-        for service_name in self.all_services:
-            service = self.get_service_spec(service_name)
-            if service is None:
-                continue
-            if service_name == service_node_name:
-                return service
-            if 'nodes' in service.raw and \
-                    service_node_name in service.raw['nodes']:
-                return service
-        return None
+        return self.__index.spec_by_node(service_node_name)
@@ -0,0 +1,158 @@
+import logging
+from typing import Tuple, Dict, List, Union
+
+from core.specs.channels import ChannelGraph, ChannelKey
+from core.specs.specs import ServicesSpecs
+
+
+class GraphLinter:
+    """
+    Topology diagnostics of the product services: unused and one-sided broker channels, services nobody connects to,
+    isolated services and data flow cycles through brokers.
+    Every rule is a linear pass over the channels graph built by ServicesSpecs.
+    """
+
+    __services_specs: ServicesSpecs
+
+    def __init__(self, services_specs: ServicesSpecs):
+        self.__services_specs = services_specs
+
+    @property
+    def graph(self) -> ChannelGraph:
+        return self.__services_specs.channels
+
+    @staticmethod
+    def channel_name(key: ChannelKey) -> str:
+        return "{}/{}".format(key.broker, key.name)
+
+    def __is_product(self, service_name: str) -> bool:
+        spec = self.__services_specs.get_service_spec(service_name)
+        return spec is not None and spec.is_product
+
+    def __check_channels(self, errors: List, warns: List):
+        graph = self.graph
+        for key in graph.channels():
+            if not self.__is_product(key.broker):
+                continue
+            producers = graph.producers(key)
+            consumers = graph.consumers(key)
+            if len(producers) == 0 and len(consumers) == 0:
+                warns.append({
+                    'service': key.broker,
+                    'warn': "[{}] {}. Nobody produces or consumes it".format(key.name, key.channel_type.value)
+                })
+            elif len(consumers) == 0:
+                warns.append({
+                    'service': key.broker,
+                    'warn': "[{}] {}. Could not find any consumers, producers: {}".format(
+                        key.name, key.channel_type.value, ", ".join(producers))
+                })
+            elif len(producers) == 0:
+                warns.append({
+                    'service': key.broker,
+                    'warn': "[{}] {}. Could not find any producers, consumers: {}".format(
+                        key.name, key.channel_type.value, ", ".join(consumers))
+                })
+
+    def __check_services(self, errors: List, warns: List):
+        graph = self.graph
+        for service_name, service_spec in self.__services_specs.all_services.items():
+            if not service_spec.is_product:
+                continue
+            if len(graph.inbound_connectors(service_name)) > 0:
+                continue
+            if len(graph.outbound_connectors(service_name)) == 0:
+                warns.append({
+                    'service': service_name,
+                    'warn': "Isolated service. Nobody connects to it and it has no 'connect_to'"
+                })
+            else:
+                warns.append({
+                    'service': service_name,
+                    'warn': "Nobody connects to the service"
+                })
+
+    def __successors(self, node: Union[str, ChannelKey]) -> List[Union[str, ChannelKey]]:
+        if isinstance(node, ChannelKey):
+            return list(self.graph.consumers(node))
+        return self.graph.service_channels(node, "tx")
+
+    def data_flow_cycles(self) -> List[List[Union[str, ChannelKey]]]:
+        # Tarjan's strongly connected components over the services -> channel -> services graph (iterative)
+        index = {}
+        low_link = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+        for root in self.__services_specs.all_services:
+            if root in index:
+                continue
+            work = [(root, iter(self.__successors(root)))]
+            index[root] = low_link[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while len(work) > 0:
+                node, successors = work[-1]
+                pushed = False
+                for successor in successors:
+                    if successor not in index:
+                        index[successor] = low_link[successor] = len(index)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(self.__successors(successor))))
+                        pushed = True
+                        break
+                    if successor in on_stack:
+                        low_link[node] = min(low_link[node], index[successor])
+                if pushed:
+                    continue
+                work.pop()
+                if len(work) > 0:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+                if low_link[node] != index[node]:
+                    continue
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1:
+                    component.reverse()
+                    cycles.append(component)
+        return cycles
+
+    def __check_cycles(self, errors: List, warns: List):
+        for cycle in self.data_flow_cycles():
+            services = [e for e in cycle if not isinstance(e, ChannelKey)]
+            if not any(self.__is_product(e) for e in services):
+                continue
+            warns.append({
+                'service': services[0],
+                'warn': "Data flow cycle through brokers. Services: {}. Channels: {}".format(
+                    ", ".join(services),
+                    ", ".join(self.channel_name(e) for e in cycle if isinstance(e, ChannelKey)))
+            })
+
+    def validate(self) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
+        errors = []
+        warns = []
+        self.__check_services(errors, warns)
+        self.__check_channels(errors, warns)
+        self.__check_cycles(errors, warns)
+        return len(errors) == 0, errors, warns
+
+    @staticmethod
+    def print(errors: List[Dict[str, str]], warns: List[Dict[str, str]]):
+        for e in errors:
+            logging.error("[{}]: {}".format(e["service"], e["error"]))
+
+        for e in warns:
+            logging.warning("[{}]: {}".format(e["service"], e["warn"]))
+
+        if len(errors) > 0:
+            logging.error("Graph Lint Results: Failed.")
+        else:
+            logging.info("Graph Lint Results: OK.")
@@ -0,0 +1,54 @@
+from collections.abc import Hashable
+from typing import Dict, List, NamedTuple, Optional
+
+from core.specs.settings import ServiceCategoryNameWrapper
+
+
+class NameOccurrence(NamedTuple):
+    position: int
+    service_key: str
+    spec: Optional[dict]
+    node: Optional[str]
+
+
+class ServiceNamesIndex:
+    """
+    Service names and node names of the raw specs in the order of the categories/services/nodes.
+    Every name refers to the list of its occurrences, so the duplicates are found without the specs scan.
+    """
+
+    __occurrences: Dict[str, List[NameOccurrence]]
+
+    def __init__(self, specs: dict, service_categories: ServiceCategoryNameWrapper):
+        self.__occurrences = {}
+        position = 0
+        for e in service_categories.all:
+            for service_key in specs[e]:
+                spec = specs[e][service_key]
+                self.__occurrences.setdefault(service_key, []).append(
+                    NameOccurrence(position, service_key, spec, None))
+                position += 1
+                for node in self.nodes(spec):
+                    self.__occurrences.setdefault(node, []).append(NameOccurrence(position, service_key, spec, node))
+                    position += 1
+
+    @staticmethod
+    def nodes(spec: Optional[dict]) -> List[str]:
+        if not isinstance(spec, dict) or 'nodes' not in spec or not isinstance(spec['nodes'], list):
+            return []
+        return [node for node in spec['nodes'] if isinstance(node, str)]
+
+    def occurrences(self, names: List[str]) -> List[NameOccurrence]:
+        found = []
+        for name in set(names):
+            found.extend(self.__occurrences.get(name, []))
+        found.sort(key=lambda e: e.position)
+        return found
+
+    def search(self, name: str) -> Optional[dict]:
+        if not isinstance(name, Hashable):
+            return None
+        occurrences = self.__occurrences.get(name)
+        if not occurrences:
+            return None
+        return occurrences[0].spec
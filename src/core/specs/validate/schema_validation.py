@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from jsonschema import Draft202012Validator
+
+from core.specs.validate.validator import Validator, SchemaType
+
+_worker_validators: Dict[SchemaType, Draft202012Validator] = {}
+
+
+def schema_errors(validators: Dict[SchemaType, Draft202012Validator], service_spec: dict) -> List[str]:
+    if 'third_party' in service_spec:
+        schema_validator = validators[SchemaType.third_party]
+    else:
+        schema_validator = validators[SchemaType.service]
+    return [error.message for error in sorted(schema_validator.iter_errors(service_spec), key=lambda e: e.path)]
+
+
+def init_worker(schemas: Dict[SchemaType, dict]):
+    # schemas are compiled once per worker process
+    global _worker_validators
+    _worker_validators = {schema_type: Draft202012Validator(schema) for schema_type, schema in schemas.items()}
+
+
+def validate_batch(batch: List[Tuple[int, dict]]) -> List[Tuple[int, List[str]]]:
+    return [(idx, schema_errors(_worker_validators, service_spec)) for idx, service_spec in batch]
+
+
+class SchemaValidationEngine(Validator):
+    """
+    JSON-schema validation of the raw service specs.
+    Results are cached on disk by the hash of the raw spec and the schemas, the missed specs are validated
+    by a process pool in batches and merged in the order of the input.
+    """
+
+    min_parallel_specs_cnt = 64
+
+    batch_size = 32
+
+    __schemas: Dict[SchemaType, dict]
+
+    __validators: Dict[SchemaType, Draft202012Validator]
+
+    __schemas_hash: str
+
+    __cache_fname: Optional[str]
+
+    __max_workers: Optional[int]
+
+    def __init__(self, meta_path: str, cache_fname: Optional[str] = None, max_workers: Optional[int] = None):
+        super().__init__(meta_path)
+        self.__schemas = {schema_type: self.source_schema(schema_type) for schema_type in SchemaType}
+        self.__validators = {schema_type: Draft202012Validator(schema) for schema_type, schema in self.__schemas.items()}
+        self.__schemas_hash = hashlib.sha1(json.dumps(
+            {schema_type.name: schema for schema_type, schema in self.__schemas.items()},
+            sort_keys=True).encode('utf8')).hexdigest()
+        self.__cache_fname = cache_fname
+        self.__max_workers = max_workers
+
+    def validator(self, schema_type: SchemaType) -> Draft202012Validator:
+        return self.__validators[schema_type]
+
+    @property
+    def validators(self) -> Dict[SchemaType, Draft202012Validator]:
+        return self.__validators
+
+    def schema_errors(self, service_spec: dict) -> List[str]:
+        return schema_errors(self.__validators, service_spec)
+
+    def spec_hash(self, service_spec: dict) -> str:
+        h = hashlib.sha1(self.__schemas_hash.encode('utf8'))
+        try:
+            h.update(json.dumps(service_spec, sort_keys=True, default=str).encode('utf8'))
+        except TypeError:
+            h.update(json.dumps(service_spec, default=str).encode('utf8'))
+        return h.hexdigest()
+
+    def __load_cache(self) -> Dict[str, List[str]]:
+        if self.__cache_fname is None or not os.path.isfile(self.__cache_fname):
+            return {}
+        try:
+            with open(self.__cache_fname, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Could not load validation cache '{}': {}".format(self.__cache_fname, e))
+            return {}
+
+    def __save_cache(self, cache: Dict[str, List[str]]):
+        if self.__cache_fname is None:
+            return
+        try:
+            cache_dir = os.path.dirname(self.__cache_fname)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            tmp_fname = "{}.{}.tmp".format(self.__cache_fname, os.getpid())
+            with open(tmp_fname, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_fname, self.__cache_fname)
+        except OSError as e:
+            logging.warning("Could not save validation cache '{}': {}".format(self.__cache_fname, e))
+
+    def __validate_missed(self, missed: List[Tuple[int, dict]]) -> Dict[int, List[str]]:
+        if len(missed) < self.min_parallel_specs_cnt:
+            return {idx: self.schema_errors(service_spec) for idx, service_spec in missed}
+        batches = [missed[i:i + self.batch_size] for i in range(0, len(missed), self.batch_size)]
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.__max_workers,
+                                 initializer=init_worker, initargs=(self.__schemas,)) as executor:
+            for batch_result in executor.map(validate_batch, batches):
+                results.update(batch_result)
+        return results
+
+    def validate(self, service_specs: List[dict], prune: bool = True) -> List[List[str]]:
+        """
+        Returns schema errors of every spec in the order of service_specs. The results are merged into the cache,
+        prune=True (service_specs are all specs) drops the cached results of the specs which are not in service_specs.
+        """
+        cache = self.__load_cache()
+        hashes = [self.spec_hash(service_spec) for service_spec in service_specs]
+        missed = [(idx, service_spec) for idx, service_spec in enumerate(service_specs) if hashes[idx] not in cache]
+        validated = self.__validate_missed(missed)
+        logging.debug("Schema validation: {} specs, {} cached".format(len(service_specs),
+                                                                      len(service_specs) - len(missed)))
+        results = []
+        new_cache = {} if prune else dict(cache)
+        for idx, spec_hash in enumerate(hashes):
+            errors = validated[idx] if idx in validated else cache[spec_hash]
+            new_cache[spec_hash] = errors
+            results.append(errors)
+        if missed or len(new_cache) != len(cache):
+            self.__save_cache(new_cache)
+        return results
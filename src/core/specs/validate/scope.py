@@ -0,0 +1,141 @@
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional, Set
+
+from core.git.meta_revision import GitMetaRevision
+from core.specs.settings import Settings
+from core.specs.specs import ServicesSpecs
+from core.specs.validate.names_index import ServiceNamesIndex
+from core.specs.validate.validator import SchemaType
+
+
+class ValidationScope:
+    """
+    Raw specs services which should be re-validated after the meta changes since the base revision:
+    changed services, services which refer to their service/node names or share them, and services which use
+    changed statuses, layers or teams of the definitions. Changes of the settings or the json schemas require
+    the full validation (services is None).
+    """
+
+    __changed: List[str]
+
+    __services: Optional[Set[str]]
+
+    def __init__(self, base_meta_path: str, base_specs: dict, meta_path: str, specs: dict):
+        base_settings = Settings(base_meta_path)
+        settings = Settings(meta_path)
+        self.__changed = []
+        self.__services = None
+        if base_settings.raw != settings.raw or \
+                self.__schemas(base_meta_path) != self.__schemas(meta_path):
+            return
+        categories = settings.service_categories.all
+        base_hashes = self.__hashes(base_specs, categories)
+        hashes = self.__hashes(specs, categories)
+        self.__changed = list(dict.fromkeys(
+            [key for key in hashes if base_hashes.get(key) != hashes[key]] +
+            [key for key in base_hashes if key not in hashes]))
+
+        changed_names = set()
+        for category, service_key in self.__changed:
+            for e in (base_specs, specs):
+                spec = (e.get(category) or {}).get(service_key)
+                changed_names.add(service_key)
+                changed_names.update(ServiceNamesIndex.nodes(spec))
+        changed_definitions = self.__changed_definitions(base_specs["definitions"], specs["definitions"])
+
+        services = {service_key for category, service_key in self.__changed if service_key in specs[category]}
+        for category in categories:
+            for service_key, spec in specs[category].items():
+                if service_key in services or not isinstance(spec, dict):
+                    continue
+                if self.__refers(service_key, spec, changed_names, changed_definitions):
+                    services.add(service_key)
+        self.__services = services
+
+    @staticmethod
+    def __schemas(meta_path: str) -> List[Optional[bytes]]:
+        schemas = []
+        for schema_type in SchemaType:
+            file_name = "{}/specifications/schema/{}.json".format(meta_path, schema_type.name)
+            if not os.path.isfile(file_name):
+                schemas.append(None)
+                continue
+            with open(file_name, 'rb') as f:
+                schemas.append(f.read())
+        return schemas
+
+    @staticmethod
+    def __hashes(specs: dict, categories: List[str]) -> Dict[tuple, str]:
+        hashes = {}
+        for category in categories:
+            for service_key, spec in specs[category].items():
+                hashes[(category, service_key)] = ServicesSpecs.raw_spec_hash(spec)
+        return hashes
+
+    @staticmethod
+    def __definition_values(definitions: dict) -> Dict[str, Set[str]]:
+        return {
+            "status": set((definitions.get("status") or {}).values()),
+            "layers": set((definitions.get("layers") or {}).values()),
+            "teams": set(e['name'] for e in (definitions.get("teams") or {}).values()
+                         if isinstance(e, dict) and 'name' in e),
+        }
+
+    def __changed_definitions(self, base_definitions: dict, definitions: dict) -> Dict[str, Set[str]]:
+        base_values = self.__definition_values(base_definitions)
+        values = self.__definition_values(definitions)
+        return {kind: base_values[kind] ^ values[kind] for kind in values}
+
+    @staticmethod
+    def __refers(service_key: str,
+                 spec: dict,
+                 changed_names: Set[str],
+                 changed_definitions: Dict[str, Set[str]]) -> bool:
+        names = [service_key] + ServiceNamesIndex.nodes(spec)
+        if any(name in changed_names for name in names):
+            return True
+        connect_to = spec.get("connect_to")
+        if isinstance(connect_to, list):
+            for e in connect_to:
+                if isinstance(e, dict) and isinstance(e.get('name'), str) and e['name'] in changed_names:
+                    return True
+        if isinstance(spec.get("status"), str) and spec["status"] in changed_definitions["status"]:
+            return True
+        if isinstance(spec.get("layer"), str) and spec["layer"] in changed_definitions["layers"]:
+            return True
+        dev_team = spec.get("dev_team")
+        if isinstance(dev_team, list):
+            for team in dev_team:
+                if isinstance(team, dict) and isinstance(team.get('name'), str) and \
+                        team['name'] in changed_definitions["teams"]:
+                    return True
+        return False
+
+    @classmethod
+    def from_revision(cls, meta_path: str, base_revision: str, specs: dict) -> 'ValidationScope':
+        with tempfile.TemporaryDirectory(prefix="meta_") as base_meta_path:
+            GitMetaRevision.export(meta_path, base_revision, base_meta_path)
+            base_specs = ServicesSpecs.upload_row_services_specs(base_meta_path, Settings(base_meta_path))
+            return cls(base_meta_path, base_specs, meta_path, specs)
+
+    @property
+    def changed_services(self) -> List[str]:
+        return [service_key for _, service_key in self.__changed]
+
+    @property
+    def services(self) -> Optional[Set[str]]:
+        return self.__services
+
+    @property
+    def is_full(self) -> bool:
+        return self.__services is None
+
+    def log(self):
+        if self.is_full:
+            logging.info("Validation scope: settings or schemas were changed, all services are validated")
+            return
+        logging.info("Validation scope: changed services: {}".format(", ".join(self.changed_services) or "-"))
+        logging.info("Validation scope: {} services are validated: {}".format(
+            len(self.__services), ", ".join(sorted(self.__services)) or "-"))
@@ -1,10 +1,12 @@
 import json
 import logging
-from typing import Tuple, Dict, List, Optional
+from collections.abc import Hashable
+from typing import Tuple, Dict, List, Optional, Set
 
 import validators
 from jsonschema import Draft202012Validator
 
+from core.specs.validate.names_index import ServiceNamesIndex
 from core.specs.validate.validator import Validator, SchemaType
 
 
@@ -13,13 +15,33 @@ class ServiceSpecValidator(Validator):
 
     __schema_validator: Draft202012Validator
 
-    def __init__(self, meta_path: str, specs: dict):
+    __names_index: ServiceNamesIndex
+
+    __statuses: Set[str]
+
+    __layers: Set[str]
+
+    __teams: Set[str]
+
+    def __init__(self, meta_path: str, specs: dict,
+                 validators: Optional[Dict[SchemaType, Draft202012Validator]] = None):
+        """validators: schemas compiled by the caller (e.g. by SchemaValidationEngine), compiled here if None."""
         super().__init__(meta_path)
         self.__specs = specs
-        self.__schema_validator = self.validator(SchemaType.service)
-        self.__third_party_schema_validator = self.validator(SchemaType.third_party)
-
-    def validate(self, service_key: str, service_spec: dict) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
+        if validators is None:
+            validators = {schema_type: self.validator(schema_type) for schema_type in SchemaType}
+        self.__schema_validator = validators[SchemaType.service]
+        self.__third_party_schema_validator = validators[SchemaType.third_party]
+        self.__names_index = ServiceNamesIndex(specs, self.service_categories)
+        definitions = specs["definitions"]
+        self.__statuses = set((definitions.get("status") or {}).values())
+        self.__layers = set((definitions.get("layers") or {}).values())
+        self.__teams = set(e['name'] for e in (definitions.get("teams") or {}).values() if 'name' in e)
+
+    def validate(self,
+                 service_key: str,
+                 service_spec: dict,
+                 schema_errors: Optional[List[str]] = None) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
         errors = []
         warns = []
         if service_spec is None or not isinstance(service_spec, dict):
@@ -28,15 +50,17 @@ class ServiceSpecValidator(Validator):
                 'error': "Empty dict."
             })
             return len(errors) == 0, errors, warns
-        if 'third_party' in service_spec:
-            schema_validator = self.__third_party_schema_validator
-        else:
-            schema_validator = self.__schema_validator
-        validator_errors = sorted(schema_validator.iter_errors(service_spec), key=lambda e: e.path)
-        for error in validator_errors:
+        if schema_errors is None:
+            if 'third_party' in service_spec:
+                schema_validator = self.__third_party_schema_validator
+            else:
+                schema_validator = self.__schema_validator
+            validator_errors = sorted(schema_validator.iter_errors(service_spec), key=lambda e: e.path)
+            schema_errors = [error.message for error in validator_errors]
+        for error in schema_errors:
             errors.append({
                 'service': service_key,
-                'error': error.message
+                'error': error
             })
         self.__check_name_uniqueness(service_key, service_spec, errors)
         self.__check_connect_to_name(service_key, service_spec, errors)
@@ -83,38 +107,22 @@ class ServiceSpecValidator(Validator):
 
     def __check_name_uniqueness(self, service_key: str, service_spec: dict, errors: List):
         # name uniqueness check
-        names = [service_key]
-        if 'nodes' in service_spec and isinstance(service_spec['nodes'], list):
-            for node in service_spec['nodes']:
-                if isinstance(node, str):
-                    names.append(node)
-
-        found_cnt = 0
-        for e in self.service_categories.all:
-            for service_key in self.__specs[e]:
-                found_spec = self.__specs[e][service_key]
-                if found_spec == service_spec:
-                    continue
-                if service_key in names:
-                    found_cnt = found_cnt + 1
-                    if found_cnt > 0:
-                        errors.append({
-                            'service': service_key,
-                            'error': "duplicate service name. All service names should be uniqueness."
-                        })
-
-                if 'nodes' in found_spec and isinstance(found_spec['nodes'], list):
-                    for node in found_spec['nodes']:
-                        if isinstance(node, str):
-                            if node in names:
-                                found_cnt = found_cnt + 1
-                                if found_cnt > 0:
-                                    msg = '''duplicate service node name '{}'. All service names should be 
-                                    uniqueness."'''.format(node)
-                                    errors.append({
-                                        'service': service_key,
-                                        'error': msg
-                                    })
+        names = [service_key] + self.__names_index.nodes(service_spec)
+        for found in self.__names_index.occurrences(names):
+            if found.spec == service_spec:
+                continue
+            if found.node is None:
+                errors.append({
+                    'service': found.service_key,
+                    'error': "duplicate service name. All service names should be uniqueness."
+                })
+            else:
+                msg = '''duplicate service node name '{}'. All service names should be 
+                                    uniqueness."'''.format(found.node)
+                errors.append({
+                    'service': found.service_key,
+                    'error': msg
+                })
 
     def __check_connect_to_name(self, service_key: str, service_spec: dict, errors: List):
         if "connect_to" not in service_spec:
@@ -158,12 +166,14 @@ class ServiceSpecValidator(Validator):
                     "data_direction" not in connect_to:
                 continue
             if connect_to_service['type'] == "kafka" and \
-                    connect_to["data_direction"] == "rx" and \
+                    connect_to["data_direction"] in ("rx", "rx_tx") and \
                     "offset_storage" not in connect_to:
-                errors.append({
-                    'service': service_key,
-                    'error': "Please, set 'offset_storage' field for 'connect_to' == {}".format(connect_to['name'])
-                })
+                # required for consumers, rx_tx connectors were not checked before: only a warning for them
+                message = "Please, set 'offset_storage' field for 'connect_to' == {}".format(connect_to['name'])
+                if connect_to["data_direction"] == "rx":
+                    errors.append({'service': service_key, 'error': message})
+                else:
+                    warns.append({'service': service_key, 'warn': message})
 
             if connect_to_service['type'] == "kafka" and \
                     connect_to["data_direction"] == "rx" and \
@@ -222,30 +232,15 @@ class ServiceSpecValidator(Validator):
             })
 
     def __has_status(self, status_name: str) -> bool:
-        for e in self.__specs["definitions"]["status"]:
-            if status_name == self.__specs["definitions"]["status"][e]:
-                return True
-        return False
+        return status_name in self.__statuses
 
     def __has_layer(self, layer_name: str) -> bool:
-        for e in self.__specs["definitions"]["layers"]:
-            if layer_name == self.__specs["definitions"]["layers"][e]:
-                return True
-        return False
+        return layer_name in self.__layers
 
     def __found_team(self, team_name: str) -> Optional[Dict]:
-        for e in self.__specs["definitions"]["teams"]:
-            if team_name == self.__specs["definitions"]["teams"][e]['name']:
-                return self.__specs["definitions"]["teams"][e]['name']
+        if isinstance(team_name, Hashable) and team_name in self.__teams:
+            return team_name
+        return None
 
     def __search_service(self, service_key: str) -> Optional[Dict]:
-        for e in self.service_categories.all:
-            for key in self.__specs[e]:
-                spec = self.__specs[e][key]
-                if key == service_key:
-                    return spec
-                if 'nodes' in spec and isinstance(spec['nodes'], list):
-                    for node in spec['nodes']:
-                        if isinstance(node, str) and node == service_key:
-                            return spec
-        return None
+        return self.__names_index.search(service_key)
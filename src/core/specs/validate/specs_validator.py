@@ -1,8 +1,10 @@
 import logging
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional, Set
 
 from core.specs.settings import Settings
 from core.specs.specs import ServicesSpecs
+from core.specs.validate.schema_validation import SchemaValidationEngine
+from core.specs.validate.scope import ValidationScope
 from core.specs.validate.service_spec_validator import ServiceSpecValidator
 
 
@@ -12,10 +14,16 @@ class SpecsValidator:
     __logger: logging.Logger = None
     __settings: Settings
 
-    def __init__(self, meta_path: str):
+    __schema_cache_fname: Optional[str]
+
+    __max_workers: Optional[int]
+
+    def __init__(self, meta_path: str, schema_cache_fname: Optional[str] = None, max_workers: Optional[int] = None):
         self.__settings = Settings(meta_path)
         self.__specs = ServicesSpecs.upload_row_services_specs(meta_path, self.__settings)
         self.__meta_path = meta_path
+        self.__schema_cache_fname = schema_cache_fname
+        self.__max_workers = max_workers
 
     @property
     def logger(self) -> logging.Logger:
@@ -32,17 +40,34 @@ class SpecsValidator:
             self.__logger = logger
         return self.__logger
 
-    def validate(self) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
+    def scope(self, base_revision: str) -> ValidationScope:
+        return ValidationScope.from_revision(self.__meta_path, base_revision, self.__specs)
+
+    def validate(self, services: Optional[Set[str]] = None) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
+        """services: validated services, None means all. Names are still checked against all specs."""
         errors = []
         warns = []
-        any_service_validator = ServiceSpecValidator(self.__meta_path, self.__specs)
+        product_specs = [self.__specs[e][service_key]
+                         for e in self.__settings.service_categories.all
+                         if e in self.__settings.service_categories.product_services
+                         for service_key in self.__specs[e]
+                         if isinstance(self.__specs[e][service_key], dict) and
+                         (services is None or service_key in services)]
+        # the schemas are compiled once and shared by the engine and the per-service validator
+        schema_engine = SchemaValidationEngine(self.__meta_path, self.__schema_cache_fname, self.__max_workers)
+        any_service_validator = ServiceSpecValidator(self.__meta_path, self.__specs, schema_engine.validators)
+        schema_errors = iter(schema_engine.validate(product_specs, services is None))
         for e in self.__settings.service_categories.all:
             for service_key in self.__specs[e]:
+                if services is not None and service_key not in services:
+                    continue
                 service_errors = []
                 service_warns = []
                 if e in self.__settings.service_categories.product_services:
-                    service_result, service_errors, service_warns = any_service_validator.validate(service_key,
-                                                                                    self.__specs[e][service_key])
+                    service_spec = self.__specs[e][service_key]
+                    service_schema_errors = next(schema_errors) if isinstance(service_spec, dict) else None
+                    service_result, service_errors, service_warns = any_service_validator.validate(
+                        service_key, service_spec, service_schema_errors)
                 errors.extend(service_errors)
                 warns.extend(service_warns)
         return len(errors) == 0, errors, warns
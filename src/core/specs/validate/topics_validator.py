@@ -1,68 +1,102 @@
 import logging
 import os
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional, Set
 
-from core.specs.service.spec import ServiceType
 from core.specs.specs import ServicesSpecs
 
 
 class TopicsValidator:
+    """
+    Checks kafka topics metadata of the product brokers: the .proto file of the topic protocol and description.
+    The dash proto tree is listed once, the check is skipped if the dash repo is not available.
+    Producers/consumers of the topics are checked by GraphLinter.
+    """
+    DASH_REPO_VAR = "{{dash_repo_master}}"
 
     __services_specs: ServicesSpecs
 
-    def __init__(self, services_specs: ServicesSpecs):
+    __dash_repo_path: str
+
+    __proto_files: Optional[Set[str]]
+
+    def __init__(self, services_specs: ServicesSpecs, dash_repo_path: Optional[str] = None):
         self.__services_specs = services_specs
+        self.__dash_repo_path = dash_repo_path if dash_repo_path else os.path.dirname(__file__) + "/../../../../.."
+        self.__proto_files = None
+
+    @classmethod
+    def proto_path(cls, protocol: Optional[str]) -> Optional[str]:
+        if not isinstance(protocol, str) or protocol.find(cls.DASH_REPO_VAR) == -1:
+            return None
+        fpath_s = protocol.find('/')
+        fpath_f = protocol.rfind('.proto')
+        if fpath_s < 0 or fpath_f < 0 or fpath_f < fpath_s:
+            return None
+        return os.path.normpath(protocol[fpath_s + 1:fpath_f + 6])
+
+    @property
+    def dash_repo_path(self) -> str:
+        return self.__dash_repo_path
+
+    def __list_proto_files(self, proto_paths: Set[str]) -> Set[str]:
+        # only top-level directories referenced by the topics are walked
+        proto_files = set()
+        if any(os.sep not in e for e in proto_paths):
+            proto_files.update(e for e in os.listdir(self.__dash_repo_path) if e.endswith(".proto"))
+        for root in sorted({e.split(os.sep, 1)[0] for e in proto_paths if os.sep in e}):
+            for dir_path, _, fnames in os.walk(os.path.join(self.__dash_repo_path, root)):
+                rel_dir_path = os.path.relpath(dir_path, self.__dash_repo_path)
+                proto_files.update(os.path.join(rel_dir_path, e) for e in fnames if e.endswith(".proto"))
+        return proto_files
+
+    def proto_files(self, proto_paths: Set[str]) -> Set[str]:
+        if self.__proto_files is None:
+            self.__proto_files = self.__list_proto_files(proto_paths)
+        return self.__proto_files
+
+    def __kafka_topics(self) -> List[Tuple[str, str, dict]]:
+        topics = []
+        for service_name, service_spec in self.__services_specs.all_services.items():
+            if not service_spec.is_product or not service_spec.is_kafka_broker or service_spec.topics is None:
+                continue
+            for topic_name, info in service_spec.topics.items():
+                topics.append((service_name, topic_name, info if isinstance(info, dict) else {}))
+        return topics
 
     def validate(self) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
         errors = []
         warns = []
-        for service_name in self.__services_specs.all_services:
-            service_spec = self.__services_specs.get_service_spec(service_name)
+        topics = self.__kafka_topics()
+        proto_paths = {}
+        for service_name, topic_name, info in topics:
+            proto_path = self.proto_path(info.get('protocol'))
+            if proto_path is not None:
+                proto_paths[(service_name, topic_name)] = proto_path
+        if len(proto_paths) > 0 and not os.path.isdir(self.__dash_repo_path):
+            logging.warning("Dash repo '{}' is not found, .proto files of {} topics are not checked".format(
+                self.__dash_repo_path, len(proto_paths)))
+            proto_paths = {}
+        proto_files = self.proto_files(set(proto_paths.values())) if len(proto_paths) > 0 else set()
 
-            if not service_spec.is_product:
-                continue
-            if service_spec.type == ServiceType.kafka.value:
-                for topic_name in service_spec.raw["topics"]:
-                    info = service_spec.kafka_topic_info(topic_name)
-                    if 'protocol' in info and info['protocol'].find("{{dash_repo_master}}") != -1:
-                        path = os.path.dirname(__file__) + "/../../../../.."
-                        fpath_s = info['protocol'].find('/')
-                        fpath_f = info['protocol'].rfind('.proto')
-                        if fpath_s >= 0 and fpath_f >= 0:
-                            protocol_fname = path + info['protocol'][fpath_s:fpath_f+6]
-                            if not os.path.isfile(protocol_fname):
-                                errors.append({
-                                    'service': service_name,
-                                    'error': "[{}] topic. Could not find .proto file {} in dash!".format(topic_name, protocol_fname)
-                                })
-
-                    if ('tx' not in info or info['tx'] is None or len(info['tx']) == 0) and \
-                            ('rx' not in info or info['rx'] is None or len(info['rx']) == 0):
-                        warns.append({
-                            'service': "kafka",
-                            'warn': "[{}] topic. Wrong topic!".format(topic_name)
-                        })
-                    else:
-                        if 'tx' not in info or info['tx'] is None or len(info['tx']) == 0:
-                            warns.append({
-                                'service': service_name,
-                                'warn': "[{}] topic. Could not find any producers".format(topic_name)
-                            })
-                        if 'rx' not in info or info['rx'] is None or len(info['rx']) == 0:
-                            warns.append({
-                                'service': service_name,
-                                'warn': "[{}] topic. Could not find any consumers".format(topic_name)
-                            })
-                    if "sales-demo-" not in topic_name and ('desc' not in info or info['desc'] is None or len(info['desc']) == 0):
-                        warns.append({
-                            'service': service_name,
-                            'warn': "[{}] topic. no description".format(topic_name)
-                        })
-                    if "sales-demo-" not in topic_name and ('protocol' not in info or info['protocol'] is None or len(info['protocol']) == 0):
-                        warns.append({
-                            'service': service_name,
-                            'warn': "[{}] topic. no protocol".format(topic_name)
-                        })
+        for service_name, topic_name, info in topics:
+            proto_path = proto_paths.get((service_name, topic_name))
+            if proto_path is not None and proto_path not in proto_files:
+                errors.append({
+                    'service': service_name,
+                    'error': "[{}] topic. Could not find .proto file {} in dash!".format(
+                        topic_name, os.path.join(self.__dash_repo_path, proto_path))
+                })
+
+            if "sales-demo-" not in topic_name and not info.get('desc'):
+                warns.append({
+                    'service': service_name,
+                    'warn': "[{}] topic. no description".format(topic_name)
+                })
+            if "sales-demo-" not in topic_name and not info.get('protocol'):
+                warns.append({
+                    'service': service_name,
+                    'warn': "[{}] topic. no protocol".format(topic_name)
+                })
         return len(errors) == 0, errors, warns
 
     @staticmethod
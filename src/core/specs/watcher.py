@@ -0,0 +1,131 @@
+import asyncio
+import copy
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Optional
+
+from core.git.branch import Branch
+from core.specs.diff import SpecsDiff
+from core.specs.settings import Settings
+from core.specs.specs import ServicesSpecs
+from core.yaml import read_yaml
+
+
+class SpecsWatcher:
+    """
+    Polls the meta files and rebuilds ServicesSpecs when they are changed.
+    Only the changed category file is parsed again, the other categories are taken from the pristine
+    (not extended) parsed yaml. The rebuild itself is not incremental: all categories are deep-copied
+    and extended again, parsing of the yaml is the part which is saved.
+    Settings and definitions changes cause the full reload.
+    """
+
+    __meta_path: str
+
+    __topics_info_filename: str
+
+    __branch: Branch
+
+    __settings: Settings
+
+    __definitions: dict
+
+    __topics_info: dict
+
+    __categories: Dict[str, dict]
+
+    __mtimes: Dict[str, float]
+
+    __services_specs: ServicesSpecs
+
+    def __init__(self, meta_path: str, topics_info_filename: str, branch: Branch):
+        self.__meta_path = meta_path
+        self.__topics_info_filename = topics_info_filename
+        self.__branch = branch
+        self.__mtimes = {}
+        self.__load()
+
+    @property
+    def services_specs(self) -> ServicesSpecs:
+        return self.__services_specs
+
+    @property
+    def settings_fname(self) -> str:
+        return self.__meta_path + "/settings.yaml"
+
+    @property
+    def definitions_fname(self) -> str:
+        return ServicesSpecs.definitions_fname(self.__meta_path)
+
+    def __category_fname(self, category: str) -> str:
+        return ServicesSpecs.category_specs_fname(self.__meta_path, category)
+
+    def __watched_files(self) -> Dict[str, Optional[str]]:
+        """file name -> category, None for the files which require the full reload"""
+        files = {self.settings_fname: None, self.definitions_fname: None, self.__topics_info_filename: None}
+        for category in self.__settings.service_categories.all:
+            files[self.__category_fname(category)] = category
+        return files
+
+    @staticmethod
+    def __mtime(fname: str) -> float:
+        try:
+            return os.stat(fname).st_mtime
+        except OSError:
+            return 0.0
+
+    def __update_mtimes(self):
+        self.__mtimes = {fname: self.__mtime(fname) for fname in self.__watched_files()}
+
+    def __load(self):
+        self.__settings = Settings(self.__meta_path)
+        self.__definitions = ServicesSpecs.upload_definitions(self.__meta_path)
+        if os.path.isfile(self.__topics_info_filename):
+            self.__topics_info = read_yaml(self.__topics_info_filename)
+        else:
+            self.__topics_info = {}
+        self.__categories = {category: ServicesSpecs.upload_category_specs(self.__meta_path, category)
+                             for category in self.__settings.service_categories.all}
+        self.__update_mtimes()
+        self.__services_specs = self.__build()
+
+    def __build(self) -> ServicesSpecs:
+        row_services_specs = {"definitions": self.__definitions}
+        row_services_specs.update(self.__categories)
+        # ServicesSpecs extends raw specs in place, so the pristine copies are kept for the next rebuild
+        return ServicesSpecs.from_row_specs(self.__settings, copy.deepcopy(row_services_specs),
+                                            self.__topics_info, self.__branch)
+
+    def changed_files(self) -> Dict[str, Optional[str]]:
+        watched_files = self.__watched_files()
+        return {fname: category for fname, category in watched_files.items()
+                if self.__mtime(fname) != self.__mtimes.get(fname)}
+
+    def poll(self) -> Optional[SpecsDiff]:
+        changed_files = self.changed_files()
+        if not changed_files:
+            return None
+        base = self.__services_specs
+        try:
+            if None in changed_files.values():
+                logging.info("Specs watcher: reload all specs")
+                self.__load()
+            else:
+                for fname, category in changed_files.items():
+                    logging.info("Specs watcher: reload '{}'".format(fname))
+                    self.__categories[category] = ServicesSpecs.upload_category_specs(self.__meta_path, category)
+                self.__update_mtimes()
+                self.__services_specs = self.__build()
+        except Exception as e:
+            # the file could be saved partially, wait for the next change
+            logging.error("Specs watcher: could not load specs: {}".format(e))
+            self.__update_mtimes()
+            return None
+        return SpecsDiff(base, self.__services_specs)
+
+    async def watch(self, on_change: Callable[[SpecsDiff], Awaitable[None]], interval_secs: float = 0.5):
+        while True:
+            specs_diff = self.poll()
+            if specs_diff is not None and not specs_diff.is_empty:
+                await on_change(specs_diff)
+            await asyncio.sleep(interval_secs)
@@ -0,0 +1,33 @@
+import json
+import os
+import shutil
+
+import pytest
+import yaml
+
+# the example meta of the repository
+META_PATH = os.path.join(os.path.dirname(__file__), "../../../meta")
+
+
+@pytest.fixture
+def meta_path(tmp_path) -> str:
+    path = str(tmp_path / "meta")
+    shutil.copytree(META_PATH, path)
+    return path
+
+
+def read_category(meta_path: str, category: str) -> dict:
+    with open("{}/specifications/{}.yaml".format(meta_path, category)) as f:
+        return yaml.safe_load(f)[category]
+
+
+def write_category(meta_path: str, category: str, specs: dict):
+    with open("{}/specifications/{}.yaml".format(meta_path, category), 'w') as f:
+        yaml.safe_dump({category: specs}, f, sort_keys=False)
+
+
+def write_schemas(meta_path: str, schema: dict):
+    """Replaces service/third_party json-schemas of the meta."""
+    for schema_name in ("service", "third_party"):
+        with open("{}/specifications/schema/{}.json".format(meta_path, schema_name), 'w') as f:
+            json.dump(schema, f)
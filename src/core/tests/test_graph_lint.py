@@ -0,0 +1,106 @@
+from core.git.branch import Branch
+from core.specs.specs import ServicesSpecs
+from core.specs.validate.graph_lint import GraphLinter
+from core.specs.validate.specs_validator import SpecsValidator
+from core.tests.conftest import read_category, write_category, write_schemas
+
+
+def service(connect_to: list = None) -> dict:
+    spec = {"desc": "test service", "module": "feature", "owner": "owner", "status": "ready",
+            "state": "stateless", "type": "grpc_api"}
+    if connect_to is not None:
+        spec["connect_to"] = connect_to
+    return spec
+
+
+def kafka_connector(data_direction: str, topic: str, offset_storage: str = "kafka") -> dict:
+    connector = {"name": "kafka", "data_direction": data_direction, "topics": {topic: None}}
+    if data_direction == "rx":
+        connector["offset_storage"] = offset_storage
+    return connector
+
+
+def add_topics(meta_path: str, *topics: str):
+    storage = read_category(meta_path, "storage")
+    for topic in topics:
+        storage["kafka"]["topics"][topic] = {"desc": topic}
+    write_category(meta_path, "storage", storage)
+
+
+def lint(meta_path: str):
+    services_specs = ServicesSpecs(meta_path, "{}/topics.yaml".format(meta_path), Branch("develop"))
+    return GraphLinter(services_specs)
+
+
+def service_warns(warns: list, service_name: str) -> list:
+    return [e["warn"] for e in warns if e["service"] == service_name]
+
+
+def test_services_nobody_connects_to(meta_path):
+    feature = read_category(meta_path, "feature")
+    feature["lonely"] = service()
+    feature["client"] = service([{"name": "server"}])
+    feature["server"] = service()
+    write_category(meta_path, "feature", feature)
+
+    valid, errors, warns = lint(meta_path).validate()
+    assert valid
+    assert service_warns(warns, "lonely") == ["Isolated service. Nobody connects to it and it has no 'connect_to'"]
+    assert service_warns(warns, "client") == ["Nobody connects to the service"]
+    assert service_warns(warns, "server") == []
+    # external services are not linted
+    assert service_warns(warns, "s3") == []
+
+
+def test_one_sided_channels(meta_path):
+    add_topics(meta_path, "only-produced", "only-consumed", "unused")
+    feature = read_category(meta_path, "feature")
+    feature["producer"] = service([kafka_connector("tx", "only-produced")])
+    feature["consumer"] = service([kafka_connector("rx", "only-consumed")])
+    write_category(meta_path, "feature", feature)
+
+    valid, errors, warns = lint(meta_path).validate()
+    kafka_warns = service_warns(warns, "kafka")
+    assert any(w.startswith("[only-produced]") and "Could not find any consumers, producers: producer" in w
+               for w in kafka_warns)
+    assert any(w.startswith("[only-consumed]") and "Could not find any producers, consumers: consumer" in w
+               for w in kafka_warns)
+    assert any(w.startswith("[unused]") and "Nobody produces or consumes it" in w for w in kafka_warns)
+    assert not any(w.startswith("[jaeger-spans]") for w in kafka_warns)
+
+
+def test_data_flow_cycles(meta_path):
+    add_topics(meta_path, "t1", "t2", "t3")
+    feature = read_category(meta_path, "feature")
+    # a -> t1 -> b -> t2 -> a is a cycle, c only consumes t2 and produces t3 nobody reads
+    feature["a"] = service([kafka_connector("tx", "t1"), kafka_connector("rx", "t2")])
+    feature["b"] = service([kafka_connector("rx", "t1"), kafka_connector("tx", "t2")])
+    feature["c"] = service([kafka_connector("rx", "t2"), kafka_connector("tx", "t3")])
+    write_category(meta_path, "feature", feature)
+
+    linter = lint(meta_path)
+    cycles = linter.data_flow_cycles()
+    assert len(cycles) == 1
+    assert sorted(e for e in cycles[0] if isinstance(e, str)) == ["a", "b"]
+    assert sorted(linter.channel_name(e) for e in cycles[0] if not isinstance(e, str)) == ["kafka/t1", "kafka/t2"]
+
+    valid, errors, warns = linter.validate()
+    cycle_warns = [e for e in warns if e["warn"].startswith("Data flow cycle")]
+    assert len(cycle_warns) == 1
+    assert "Services: a, b" in cycle_warns[0]["warn"] or "Services: b, a" in cycle_warns[0]["warn"]
+
+
+def test_example_meta_has_no_cycles(meta_path):
+    assert lint(meta_path).data_flow_cycles() == []
+
+
+def test_offset_storage_is_checked_without_graph_lint(meta_path):
+    write_schemas(meta_path, {"type": "object"})
+    observability = read_category(meta_path, "observability")
+    del observability["jaeger-ingester"]["connect_to"][0]["offset_storage"]
+    write_category(meta_path, "observability", observability)
+
+    valid, errors, warns = SpecsValidator(meta_path).validate()
+    assert not valid
+    assert {"service": "jaeger-ingester",
+            "error": "Please, set 'offset_storage' field for 'connect_to' == kafka"} in errors
@@ -0,0 +1,79 @@
+import json
+
+from core.render.markdown import MarkdownRenderer
+
+
+def test_default_cache_size():
+    assert MarkdownRenderer({}).max_cache_size == 65536
+
+
+def test_render_template_vars():
+    renderer = MarkdownRenderer({"some_var": "some_value"})
+    assert renderer.render("**{{ some_var }}**") == "<p><strong>some_value</strong></p>\n"
+
+
+def test_lru_eviction():
+    renderer = MarkdownRenderer({}, max_cache_size=2)
+    renderer.render("a")
+    renderer.render("b")
+    # "a" becomes the most recently used, "b" is evicted by "c"
+    renderer.render("a")
+    renderer.render("c")
+    assert (renderer.hits, renderer.misses) == (1, 3)
+    renderer.render("a")
+    renderer.render("c")
+    assert (renderer.hits, renderer.misses) == (3, 3)
+    renderer.render("b")
+    assert (renderer.hits, renderer.misses) == (3, 4)
+
+
+def test_cache_file_round_trip(tmp_path):
+    cache_fname = str(tmp_path / ".cache/markdown.json")
+    renderer = MarkdownRenderer({"some_var": "v1"}, cache_fname)
+    html = renderer.render("{{ some_var }}")
+    renderer.save()
+
+    loaded = MarkdownRenderer({"some_var": "v1"}, cache_fname)
+    assert loaded.render("{{ some_var }}") == html
+    assert (loaded.hits, loaded.misses) == (1, 0)
+    assert loaded.rendered == {}
+
+
+def test_cache_file_is_invalidated_by_vars(tmp_path):
+    cache_fname = str(tmp_path / "markdown.json")
+    renderer = MarkdownRenderer({"some_var": "v1"}, cache_fname)
+    renderer.render("{{ some_var }}")
+    renderer.save()
+
+    changed = MarkdownRenderer({"some_var": "v2"}, cache_fname)
+    assert changed.render("{{ some_var }}") == "<p>v2</p>\n"
+    assert (changed.hits, changed.misses) == (0, 1)
+
+
+def test_cache_file_keeps_most_recent(tmp_path):
+    cache_fname = str(tmp_path / "markdown.json")
+    renderer = MarkdownRenderer({}, cache_fname)
+    for text in ("a", "b", "c"):
+        renderer.render(text)
+    renderer.save()
+
+    loaded = MarkdownRenderer({}, cache_fname, max_cache_size=2)
+    loaded.render("c")
+    loaded.render("b")
+    loaded.render("a")
+    assert (loaded.hits, loaded.misses) == (2, 1)
+
+
+def test_save_without_rendering(tmp_path):
+    cache_fname = tmp_path / "markdown.json"
+    MarkdownRenderer({}, str(cache_fname)).save()
+    assert not cache_fname.exists()
+
+
+def test_broken_cache_file(tmp_path):
+    cache_fname = tmp_path / "markdown.json"
+    cache_fname.write_text("{")
+    renderer = MarkdownRenderer({}, str(cache_fname))
+    renderer.render("a")
+    renderer.save()
+    assert json.loads(cache_fname.read_text())["html"][0][1] == "<p>a</p>\n"
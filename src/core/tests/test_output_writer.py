@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+from core.output_writer import OutputWriter
+from core.unpublished_services import UnpublishedServices
+
+
+def table_fname(root_path, service_name: str, table: str = "table") -> str:
+    return os.path.join(str(root_path), "specs", service_name, table + ".json")
+
+
+def test_change_detection(tmp_path):
+    writer = OutputWriter(str(tmp_path))
+    assert writer.write_json(table_fname(tmp_path, "api"), [1])
+    assert writer.write_json(table_fname(tmp_path, "kafka"), [1])
+    assert writer.changed_services() == {"api", "kafka"}
+
+    writer = OutputWriter(str(tmp_path))
+    assert not writer.write_json(table_fname(tmp_path, "api"), [1])
+    assert writer.write_json(table_fname(tmp_path, "kafka"), [2])
+    assert writer.changed == [os.path.join("specs", "kafka", "table.json")]
+    assert writer.changed_services() == {"kafka"}
+    assert set(writer.updated) == {os.path.join("specs", s, "table.json") for s in ("api", "kafka")}
+
+
+def test_manifest_skips_reading_unchanged_files(tmp_path):
+    manifest_fname = str(tmp_path / ".cache/manifest.json")
+    fname = table_fname(tmp_path, "api")
+    writer = OutputWriter(str(tmp_path), manifest_fname)
+    writer.write_text(fname, "aaaa")
+    writer.save_manifest()
+    with open(manifest_fname) as f:
+        assert list(json.load(f)) == [os.path.join("specs", "api", "table.json")]
+
+    # same size and mtime: the manifest hash is trusted and the file is not read
+    st = os.stat(fname)
+    with open(fname, 'w') as f:
+        f.write("bbbb")
+    os.utime(fname, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert not OutputWriter(str(tmp_path), manifest_fname).write_text(fname, "aaaa")
+
+    # without the manifest the content is compared
+    assert OutputWriter(str(tmp_path)).write_text(fname, "aaaa")
+
+
+def test_atomic_replace(tmp_path, monkeypatch):
+    fname = table_fname(tmp_path, "api")
+    OutputWriter(str(tmp_path)).write_text(fname, "old")
+
+    def failed_replace(src, dst):
+        raise OSError("replace failed")
+
+    monkeypatch.setattr(os, "replace", failed_replace)
+    with pytest.raises(OSError):
+        OutputWriter(str(tmp_path)).write_text(fname, "new")
+    with open(fname) as f:
+        assert f.read() == "old"
+
+
+def test_prune_deleted_services(tmp_path):
+    manifest_fname = str(tmp_path / ".cache/manifest.json")
+    writer = OutputWriter(str(tmp_path), manifest_fname)
+    for service_name in ("api", "removed"):
+        writer.write_text(table_fname(tmp_path, service_name), service_name)
+    writer.write_text(os.path.join(str(tmp_path), "specs", "bundle.jsonl"), "bundle")
+    writer.save_manifest({"api", "removed"})
+    assert writer.removed == []
+
+    # an affected-only run which does not write the files of api
+    writer = OutputWriter(str(tmp_path), manifest_fname)
+    writer.save_manifest({"api"})
+    assert writer.removed == [os.path.join("specs", "removed", "table.json")]
+    assert not os.path.exists(os.path.join(str(tmp_path), "specs", "removed"))
+    assert os.path.isfile(table_fname(tmp_path, "api"))
+    assert os.path.isfile(os.path.join(str(tmp_path), "specs", "bundle.jsonl"))
+    with open(manifest_fname) as f:
+        assert set(json.load(f)) == {os.path.join("specs", "api", "table.json"),
+                                     os.path.join("specs", "bundle.jsonl")}
+
+
+def test_unpublished_services(tmp_path):
+    fname = str(tmp_path / ".cache/unpublished_services.json")
+    unpublished = UnpublishedServices(fname)
+    unpublished.add({"api", "kafka"})
+    unpublished.save()
+
+    # the changes of the next generation run are added to the unpublished ones
+    unpublished = UnpublishedServices(fname)
+    unpublished.add({"postgresql"})
+    assert unpublished.services == {"api", "kafka", "postgresql"}
+    unpublished.remove({"api"})
+    unpublished.save()
+    assert UnpublishedServices(fname).services == {"kafka", "postgresql"}
+
+    unpublished.remove()
+    unpublished.save()
+    assert UnpublishedServices(fname).services == set()
@@ -0,0 +1,25 @@
+import pytest
+
+from core.specs.service.spec import ServiceSpec, ServiceStatus
+from core.specs.settings import Settings
+from core.tests.conftest import META_PATH
+
+
+def test_raw_setter_compiles_fields():
+    spec = ServiceSpec("api", Settings(META_PATH))
+    spec.raw = {"status": "develop", "type": "kafka", "module": "feature", "category": "feature"}
+    assert spec.status == ServiceStatus.develop
+    assert spec.is_kafka_broker and spec.is_product
+    assert spec.service_module == "feature"
+
+    spec.raw = {"status": "ready", "type": "grpc_api", "module": "storage", "category": "external"}
+    assert spec.status == ServiceStatus.ready
+    assert not spec.is_broker and not spec.is_product
+    assert spec.service_module == "storage"
+
+
+def test_missing_module():
+    spec = ServiceSpec("api", Settings(META_PATH))
+    spec.raw = {"status": "ready"}
+    with pytest.raises(Exception, match="Could not find 'module' field of the service 'api'"):
+        spec.service_module
@@ -0,0 +1,54 @@
+from core.git.branch import Branch
+from core.specs.snapshot import ServicesSpecsSnapshot
+from core.specs.specs import ServicesSpecs
+from core.tests.conftest import read_category, write_category
+
+
+def connectors(services_specs: ServicesSpecs) -> list:
+    return sorted((c.source.service_name, c.dest.service_name, c.data_direction, c.channel_type.value)
+                  for spec in services_specs.available_services.values() for c in spec.connectors)
+
+
+def test_load_equals_parse(meta_path, tmp_path):
+    branch = Branch("develop")
+    topics_info_fname = str(tmp_path / "topics_info.yaml")
+    snapshot = ServicesSpecsSnapshot(str(tmp_path / "specs_snapshot.bin"))
+    parsed = snapshot.load_or_create(meta_path, topics_info_fname, branch)
+    loaded = snapshot.load(snapshot.inputs_hash(meta_path, topics_info_fname, branch))
+    assert loaded is not None
+    assert loaded.snapshot_state() == parsed.snapshot_state()
+    assert list(loaded.available_services) == list(parsed.available_services)
+    assert list(loaded.unavailable_services) == list(parsed.unavailable_services)
+    assert connectors(loaded) == connectors(parsed)
+    assert dict(loaded.source_hashes) == dict(parsed.source_hashes)
+
+
+def test_snapshot_is_invalidated_by_inputs(meta_path, tmp_path):
+    branch = Branch("develop")
+    topics_info_fname = str(tmp_path / "topics_info.yaml")
+    snapshot = ServicesSpecsSnapshot(str(tmp_path / "specs_snapshot.bin"))
+    snapshot.load_or_create(meta_path, topics_info_fname, branch)
+    old_hash = snapshot.inputs_hash(meta_path, topics_info_fname, branch)
+
+    specs = read_category(meta_path, "feature")
+    specs["api"]["desc"] = "changed"
+    write_category(meta_path, "feature", specs)
+    new_hash = snapshot.inputs_hash(meta_path, topics_info_fname, branch)
+    assert new_hash != old_hash
+    assert snapshot.load(new_hash) is None
+    reparsed = snapshot.load_or_create(meta_path, topics_info_fname, branch)
+    assert reparsed.get_service_spec_raw("api")["desc"] == "changed"
+    assert snapshot.load(new_hash) is not None
+
+
+def test_snapshot_is_not_code(meta_path, tmp_path):
+    branch = Branch("develop")
+    topics_info_fname = str(tmp_path / "topics_info.yaml")
+    fname = tmp_path / "specs_snapshot.bin"
+    snapshot = ServicesSpecsSnapshot(str(fname))
+    snapshot.load_or_create(meta_path, topics_info_fname, branch)
+    inputs_hash = snapshot.inputs_hash(meta_path, topics_info_fname, branch)
+    data = fname.read_bytes()
+    # a broken payload is reported and ignored
+    fname.write_bytes(data[:len(data) // 2])
+    assert snapshot.load(inputs_hash) is None
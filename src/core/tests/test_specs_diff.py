@@ -0,0 +1,119 @@
+import io
+import shutil
+import subprocess
+import tarfile
+
+import yaml
+
+from core.git.branch import Branch
+from core.git.meta_revision import GitMetaRevision
+from core.specs.diff import SpecsDiff
+from core.specs.specs import ServicesSpecs
+from core.tests.conftest import read_category, write_category
+
+
+def load_specs(meta_path: str) -> ServicesSpecs:
+    return ServicesSpecs(meta_path, "{}/topics.yaml".format(meta_path), Branch("develop"))
+
+
+def copy_meta(meta_path: str, tmp_path) -> str:
+    path = str(tmp_path / "base_meta")
+    shutil.copytree(meta_path, path)
+    return path
+
+
+def test_changed_service_affects_neighbours(meta_path, tmp_path):
+    base = load_specs(copy_meta(meta_path, tmp_path))
+    storage = read_category(meta_path, "storage")
+    storage["postgresql"]["desc"] = "changed"
+    write_category(meta_path, "storage", storage)
+
+    diff = SpecsDiff(base, load_specs(meta_path))
+    assert not diff.is_global_change
+    assert diff.modified_services == ["postgresql"]
+    assert diff.added_services == [] and diff.removed_services == []
+    assert set(diff.affected_services) == {"postgresql", "api"}
+
+
+def test_removed_connector_affects_former_peer(meta_path, tmp_path):
+    base = load_specs(copy_meta(meta_path, tmp_path))
+    feature = read_category(meta_path, "feature")
+    feature["api"]["connect_to"] = [c for c in feature["api"]["connect_to"] if c["name"] != "postgresql"]
+    write_category(meta_path, "feature", feature)
+
+    diff = SpecsDiff(base, load_specs(meta_path))
+    assert diff.modified_services == ["api"]
+    assert "postgresql" in diff.affected_services
+    assert "jaeger-query" not in diff.affected_services
+
+
+def test_changed_topic_consumer_affects_channel(meta_path, tmp_path):
+    base = load_specs(copy_meta(meta_path, tmp_path))
+    observability = read_category(meta_path, "observability")
+    observability["jaeger-ingester"]["desc"] = "changed"
+    write_category(meta_path, "observability", observability)
+
+    diff = SpecsDiff(base, load_specs(meta_path))
+    assert diff.modified_services == ["jaeger-ingester"]
+    # the broker and the producer of jaeger-spans list the consumer
+    assert {"jaeger-ingester", "kafka", "jaeger-collector"} <= set(diff.affected_services)
+
+
+def test_definitions_change_affects_all(meta_path, tmp_path):
+    base = load_specs(copy_meta(meta_path, tmp_path))
+    definitions_fname = ServicesSpecs.definitions_fname(meta_path)
+    with open(definitions_fname) as f:
+        definitions = yaml.safe_load(f)
+    definitions["definitions"]["test_definition"] = "changed"
+    with open(definitions_fname, 'w') as f:
+        yaml.safe_dump(definitions, f, sort_keys=False)
+
+    current = load_specs(meta_path)
+    diff = SpecsDiff(base, current)
+    assert diff.is_global_change
+    assert diff.changed_services == []
+    assert diff.affected_services == list(current.all_services)
+
+
+def test_settings_change_affects_all(meta_path, tmp_path):
+    base = load_specs(copy_meta(meta_path, tmp_path))
+    with open("{}/settings.yaml".format(meta_path)) as f:
+        settings = yaml.safe_load(f)
+    settings["markdown_template_vars"]["some_var"] = "changed"
+    with open("{}/settings.yaml".format(meta_path), 'w') as f:
+        yaml.safe_dump(settings, f, sort_keys=False)
+
+    current = load_specs(meta_path)
+    diff = SpecsDiff(base, current)
+    assert diff.is_global_change
+    assert diff.affected_services == list(current.all_services)
+
+
+def test_from_revision(meta_path):
+    for args in (["init", "-q"], ["add", "-A"],
+                 ["-c", "user.name=test", "-c", "user.email=test@test", "commit", "-q", "-m", "meta"]):
+        subprocess.run(["git", "-C", meta_path] + args, check=True)
+    storage = read_category(meta_path, "storage")
+    storage["postgresql"]["desc"] = "changed"
+    write_category(meta_path, "storage", storage)
+
+    diff = SpecsDiff.from_revision(meta_path, "HEAD", "{}/topics.yaml".format(meta_path), Branch("develop"))
+    assert diff.modified_services == ["postgresql"]
+
+
+def test_export_skips_unsafe_members(tmp_path):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        for name in ("settings.yaml", "../outside.yaml", "/abs.yaml"):
+            info = tarfile.TarInfo(name)
+            info.size = 1
+            tar.addfile(info, io.BytesIO(b"x"))
+        link = tarfile.TarInfo("link.yaml")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        tar.addfile(link)
+    buffer.seek(0)
+    out_path = str(tmp_path / "out")
+    with tarfile.open(fileobj=buffer) as tar:
+        names = [m.name for m in GitMetaRevision.safe_members(tar, out_path)]
+    assert names == ["settings.yaml"]
@@ -0,0 +1,45 @@
+import json
+
+from core.specs.validate.specs_validator import SpecsValidator
+from core.specs.validate.validator import Validator
+from core.tests.conftest import read_category, write_category, write_schemas
+
+SCHEMA = {"type": "object", "required": ["desc"]}
+
+
+def schema_errors(errors: list) -> list:
+    return [e for e in errors if "'desc' is a required property" in e["error"]]
+
+
+def test_schemas_are_compiled_once(meta_path, monkeypatch):
+    write_schemas(meta_path, SCHEMA)
+    compiled = []
+    original = Validator.validator
+    monkeypatch.setattr(Validator, "validator", lambda self, schema_type: compiled.append(schema_type) or
+                        original(self, schema_type))
+    valid, errors, warns = SpecsValidator(meta_path).validate()
+    assert compiled == []
+    # kafka of the example meta has no description
+    assert [e["service"] for e in schema_errors(errors)] == ["kafka"]
+
+
+def test_scoped_validation_keeps_cache(meta_path, tmp_path):
+    write_schemas(meta_path, SCHEMA)
+    cache_fname = str(tmp_path / "schema_validation.json")
+    SpecsValidator(meta_path, cache_fname).validate()
+    with open(cache_fname) as f:
+        full_cache = json.load(f)
+
+    specs = read_category(meta_path, "feature")
+    specs["api"]["desc"] = "changed"
+    write_category(meta_path, "feature", specs)
+    SpecsValidator(meta_path, cache_fname).validate({"api"})
+    with open(cache_fname) as f:
+        cache = json.load(f)
+    assert set(full_cache) < set(cache)
+    assert len(cache) == len(full_cache) + 1
+
+    # the full validation drops the results of the old spec of the service
+    SpecsValidator(meta_path, cache_fname).validate()
+    with open(cache_fname) as f:
+        assert len(json.load(f)) == len(full_cache)
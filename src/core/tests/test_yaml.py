@@ -0,0 +1,22 @@
+import pytest
+import yaml
+from yaml.constructor import ConstructorError
+
+from core.yaml import read_yaml
+
+
+def test_read_yaml(tmp_path):
+    fname = tmp_path / "specs.yaml"
+    fname.write_text("api:\n  desc: service\n  connect_to:\n    - name: kafka\n")
+    assert read_yaml(str(fname)) == {"api": {"desc": "service", "connect_to": [{"name": "kafka"}]}}
+
+
+def test_duplicate_keys(tmp_path):
+    fname = tmp_path / "specs.yaml"
+    fname.write_text("api:\n  desc: first\napi:\n  desc: second\n")
+    with pytest.raises(ConstructorError):
+        read_yaml(str(fname))
+
+
+def test_global_loaders_are_not_changed():
+    assert yaml.safe_load("a: 1\na: 2\n") == {"a": 2}
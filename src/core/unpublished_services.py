@@ -0,0 +1,56 @@
+import json
+import logging
+import os
+from typing import Iterable, Optional, Set
+
+
+class UnpublishedServices:
+    """
+    Services whose specs or diagrams files were changed by the generators and are not published to Confluence yet.
+    The generators add their changed services, the publisher removes the published ones: changes of several
+    generation runs are kept until the next publication.
+    """
+
+    __fname: str
+
+    __services: Set[str]
+
+    def __init__(self, fname: str):
+        self.__fname = fname
+        self.__services = self.__load()
+
+    @property
+    def services(self) -> Set[str]:
+        return self.__services
+
+    def __load(self) -> Set[str]:
+        if not os.path.isfile(self.__fname):
+            return set()
+        try:
+            with open(self.__fname, 'r') as f:
+                return set(json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning("Could not load unpublished services '{}': {}".format(self.__fname, e))
+            return set()
+
+    def add(self, services: Iterable[str]):
+        self.__services.update(services)
+
+    def remove(self, services: Optional[Iterable[str]] = None):
+        """None means all services were published."""
+        if services is None:
+            self.__services.clear()
+        else:
+            self.__services.difference_update(services)
+
+    def save(self):
+        try:
+            file_dir = os.path.dirname(self.__fname)
+            if file_dir and not os.path.exists(file_dir):
+                os.makedirs(file_dir)
+            tmp_fname = "{}.{}.tmp".format(self.__fname, os.getpid())
+            with open(tmp_fname, 'w') as f:
+                json.dump(sorted(self.__services), f)
+            os.replace(tmp_fname, self.__fname)
+        except OSError as e:
+            logging.warning("Could not save unpublished services '{}': {}".format(self.__fname, e))
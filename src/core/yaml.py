@@ -1,30 +1,47 @@
 import yaml
 
 from yaml.constructor import ConstructorError
+from yaml.nodes import MappingNode
 
 try:
     from yaml import CLoader as Loader
+    WITH_LIBYAML = True
 except ImportError:
     from yaml import Loader
-
-
-def no_duplicates_constructor(loader, node, deep=False):
-    """Check for duplicate keys."""
-
-    mapping = {}
-    for key_node, value_node in node.value:
-        key = loader.construct_object(key_node, deep=deep)
-        value = loader.construct_object(value_node, deep=deep)
-        if key in mapping:
-            raise ConstructorError("while constructing a mapping", node.start_mark,
-                                   "found duplicate key (%s)" % key, key_node.start_mark)
-        mapping[key] = value
-
-    return loader.construct_mapping(node, deep)
-
-yaml.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, no_duplicates_constructor)
+    WITH_LIBYAML = False
+
+
+class SpecsLoader(Loader):
+    """libyaml based loader which checks duplicate keys while constructing a mapping (single pass)."""
+
+    def construct_mapping(self, node, deep=False):
+        if not isinstance(node, MappingNode):
+            raise ConstructorError(None, None,
+                                   "expected a mapping node, but found %s" % node.id, node.start_mark)
+        merge_tag = 'tag:yaml.org,2002:merge'
+        explicit_cnt = sum(1 for key_node, _ in node.value if key_node.tag != merge_tag)
+        self.flatten_mapping(node)
+        # flatten_mapping puts merged (<<: *alias) pairs before the explicit ones,
+        # merged keys may be overridden, explicit keys should be unique
+        explicit_start = len(node.value) - explicit_cnt
+        mapping = {}
+        explicit_keys = set()
+        for idx, (key_node, value_node) in enumerate(node.value):
+            key = self.construct_object(key_node, deep=deep)
+            try:
+                hash(key)
+            except TypeError as exc:
+                raise ConstructorError("while constructing a mapping", node.start_mark,
+                                       "found unacceptable key (%s)" % exc, key_node.start_mark)
+            if idx >= explicit_start:
+                if key in explicit_keys:
+                    raise ConstructorError("while constructing a mapping", node.start_mark,
+                                           "found duplicate key (%s)" % key, key_node.start_mark)
+                explicit_keys.add(key)
+            mapping[key] = self.construct_object(value_node, deep=deep)
+        return mapping
 
 
 def read_yaml(fname: str):
     with open(fname, 'r') as stream:
-        return yaml.unsafe_load(stream)
+        return yaml.load(stream, Loader=SpecsLoader)
@@ -8,13 +8,9 @@ import cssutils
 from core.app import AppCore
 from core.git.branch import Branch
 from core.git.specs_repo import GitSpecsRepositoryHelper
-from core.specs.specs import ServicesSpecs
-from core.task.task_pool import TasksPool
-from diagrams_generator.diagrams.styles_wrapper import StylesWrapper, StyleSelector
-from diagrams_generator.diagrams.template import XmlTemplate
-from diagrams_generator.generator.generator import Generator
-from diagrams_generator.generator.service.service_network_generator import ServiceNetworkGenerator
-from diagrams_generator.generator.service.service_style_selector import ServiceStyleSelector
+from core.specs.snapshot import ServicesSpecsSnapshot
+from core.unpublished_services import UnpublishedServices
+from diagrams_generator.builder import DiagramsBuilder
 
 
 class App(AppCore):
@@ -34,6 +30,7 @@ class App(AppCore):
         args_parser.add_argument(
             "-c", "--config", dest="config", help="config", default=path + "/config/base.yaml",
             required=False)
+        AppCore.add_affected_only_args(args_parser)
         return args_parser
 
     def __init__(self):
@@ -45,69 +42,29 @@ class App(AppCore):
     def max_parallel_tasks_cnt(self):
         return self.configuration['app']['max_parallel_tasks_cnt']
 
-    async def __generate_service_diagram(self,
-                                         service_name: str,
-                                         services_specs: ServicesSpecs,
-                                         template: XmlTemplate,
-                                         styles_wrapper: StylesWrapper,
-                                         app_configuration: dict,
-                                         current_banch: Branch,
-                                         show_connect_to_arrow):
-        service = services_specs.get_service_spec(service_name)
-        styles = ServiceStyleSelector(service, styles_wrapper)
-        generator = ServiceNetworkGenerator(service_name,
-                                            app_configuration,
-                                            services_specs,
-                                            template,
-                                            styles,
-                                            current_banch,
-                                            show_connect_to_arrow)
-        await generator.generate()
-        await generator.save(self.args.specs_repo_path)
-        logging.info("[{}]. done.".format(service_name))
+    @property
+    def diagrams_workers_cnt(self):
+        return self.configuration['app']['diagrams_workers_cnt']
 
-    async def run(self):
-        diagram_name = "network"
-        show_connect_to_arrow = False
-        template_path = "{}/diagrams".format(self.args.meta_path)
+    async def run(self) -> int:
         current_branch = Branch(self.configuration["git"]["branch"])
-        services_specs = ServicesSpecs(self.args.meta_path, GitSpecsRepositoryHelper.topics_info_fname(),
-                                       current_branch)
-        styles_wrapper = StylesWrapper(template_path + "/" + diagram_name + '/styles.css',
-                                       template_path + "/" + diagram_name + '/props.yaml')
-        styles = StyleSelector(styles_wrapper)
-        template = XmlTemplate()
-        await template.load(template_path, diagram_name, "template")
-        generator = Generator(self.configuration,
-                              services_specs,
-                              template,
-                              styles,
-                              current_branch,
-                              show_connect_to_arrow)
-        await generator.generate()
-        await generator.save(self.args.specs_repo_path)
-
-        template_service = XmlTemplate()
-        await template_service.load(template_path, diagram_name, "template_service")
-        tasks_pool = TasksPool(self.max_parallel_tasks_cnt)
-        for service_name in services_specs.available_services:
-            if self.configuration["publish"]["service"] != 'all' and \
-                    self.configuration["publish"]["service"] != service_name:
-                continue
-            await tasks_pool.append(self.__generate_service_diagram(service_name,
-                                                                    services_specs,
-                                                                    template_service,
-                                                                    styles_wrapper,
-                                                                    self.configuration,
-                                                                    current_branch,
-                                                                    show_connect_to_arrow))
-        await tasks_pool.done()
+        snapshot = ServicesSpecsSnapshot(GitSpecsRepositoryHelper.specs_snapshot_fname())
+        services_specs = snapshot.load_or_create(self.args.meta_path, GitSpecsRepositoryHelper.topics_info_fname(),
+                                                 current_branch)
+        builder = DiagramsBuilder(self.configuration, self.args.meta_path, self.args.specs_repo_path,
+                                  self.max_parallel_tasks_cnt, self.diagrams_workers_cnt)
+        writer = await builder.build(services_specs, current_branch,
+                                     self.affected_services(services_specs, current_branch))
+        unpublished = UnpublishedServices(GitSpecsRepositoryHelper.unpublished_services_fname())
+        unpublished.add(writer.changed_services())
+        unpublished.save()
+        return 0
 
 
 async def main():
     app = App()
-    await app.run()
+    return await app.run()
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    exit(asyncio.run(main()))
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.git.branch import Branch
+from core.git.specs_repo import GitSpecsRepositoryHelper
+from core.output_writer import OutputWriter
+from core.specs.specs import ServicesSpecs
+from core.task.task_pool import TasksPool
+from diagrams_generator.diagrams.styles_wrapper import StylesWrapper, StyleSelector
+from diagrams_generator.diagrams.template import XmlTemplate
+from diagrams_generator.diagrams.text_pixel_size import TextPixelSize
+from diagrams_generator.diagrams.xml_service_gen import XmlServiceFragments
+from diagrams_generator.generator.generator import Generator
+from diagrams_generator.generator.service.service_network_generator import ServiceNetworkGenerator
+from diagrams_generator.generator.service.service_style_selector import ServiceStyleSelector
+
+
+class DiagramsBuilder:
+    """Generates the system network diagram and the network diagrams of the services."""
+
+    diagram_name = "network"
+
+    show_connect_to_arrow = False
+
+    min_parallel_services_cnt = 8
+
+    max_batch_size = 8
+
+    __app_configuration: dict
+
+    __meta_path: str
+
+    __specs_repo_path: str
+
+    __max_parallel_tasks_cnt: int
+
+    __workers_cnt: int
+
+    __styles_wrapper: Optional[StylesWrapper]
+
+    __template: Optional[XmlTemplate]
+
+    __template_service: Optional[XmlTemplate]
+
+    def __init__(self, app_configuration: dict, meta_path: str, specs_repo_path: str, max_parallel_tasks_cnt: int,
+                 workers_cnt: int = 1):
+        self.__app_configuration = app_configuration
+        self.__meta_path = meta_path
+        self.__specs_repo_path = specs_repo_path
+        self.__max_parallel_tasks_cnt = max_parallel_tasks_cnt
+        self.__workers_cnt = workers_cnt
+        self.__styles_wrapper = None
+        self.__template = None
+        self.__template_service = None
+
+    @property
+    def template_path(self) -> str:
+        return "{}/diagrams".format(self.__meta_path)
+
+    async def generate_service_diagram(self,
+                                       service_name: str,
+                                       services_specs: ServicesSpecs,
+                                       current_banch: Branch,
+                                       writer: OutputWriter,
+                                       fragments: XmlServiceFragments):
+        service = services_specs.get_service_spec(service_name)
+        styles = ServiceStyleSelector(service, self.__styles_wrapper)
+        generator = ServiceNetworkGenerator(service_name,
+                                            self.__app_configuration,
+                                            services_specs,
+                                            self.__template_service,
+                                            styles,
+                                            current_banch,
+                                            self.show_connect_to_arrow,
+                                            fragments)
+        await generator.generate()
+        await generator.save(self.__specs_repo_path, writer)
+        logging.info("[{}]. done.".format(service_name))
+
+    def fragments(self, services_specs: ServicesSpecs) -> XmlServiceFragments:
+        return XmlServiceFragments(self.__app_configuration, StyleSelector(self.__styles_wrapper), services_specs)
+
+    async def load_resources(self):
+        # styles and templates are loaded once and reused by the next builds (e.g. in the watch mode)
+        if self.__styles_wrapper is not None:
+            return
+        diagram_path = self.template_path + "/" + self.diagram_name
+        self.__styles_wrapper = StylesWrapper(diagram_path + '/styles.css', diagram_path + '/props.yaml')
+        self.__template = XmlTemplate()
+        await self.__template.load(self.template_path, self.diagram_name, "template")
+        self.__template_service = XmlTemplate()
+        await self.__template_service.load(self.template_path, self.diagram_name, "template_service")
+
+    async def __generate_parallel(self,
+                                  service_names: List[str],
+                                  services_specs: ServicesSpecs,
+                                  current_branch: Branch,
+                                  writer: OutputWriter):
+        # diagrams are CPU bound: the services are sharded between the processes, every worker loads the specs,
+        # styles and templates once by the initializer
+        batch_size = max(1, min(self.max_batch_size, len(service_names) // (self.__workers_cnt * 4)))
+        batches = [service_names[i:i + batch_size] for i in range(0, len(service_names), batch_size)]
+        loop = asyncio.get_running_loop()
+        workers_stats: Dict[int, List[float]] = {}
+        with ProcessPoolExecutor(max_workers=self.__workers_cnt,
+                                 initializer=init_worker,
+                                 initargs=(self.__app_configuration, self.__meta_path, self.__specs_repo_path,
+                                           self.__max_parallel_tasks_cnt, services_specs, current_branch,
+                                           writer.manifest_fname)) as executor:
+            results = await asyncio.gather(*[loop.run_in_executor(executor, generate_services_batch, batch)
+                                             for batch in batches])
+        for updated, changed, (pid, services_cnt, duration) in results:
+            writer.merge(updated, changed)
+            stats = workers_stats.setdefault(pid, [0, 0.0])
+            stats[0] += services_cnt
+            stats[1] += duration
+        for pid, (services_cnt, duration) in workers_stats.items():
+            logging.info("Diagrams worker {}: {} services in {:.2f} sec".format(pid, services_cnt, duration))
+
+    async def build(self,
+                    services_specs: ServicesSpecs,
+                    current_branch: Branch,
+                    services: Optional[Set[str]] = None) -> OutputWriter:
+        """Returns the writer of the diagrams, see writer.changed_services()."""
+        await self.load_resources()
+        text_pixel_size = TextPixelSize.shared(self.__app_configuration,
+                                               GitSpecsRepositoryHelper.text_extents_cache_fname())
+        writer = OutputWriter(self.__specs_repo_path, GitSpecsRepositoryHelper.diagrams_manifest_fname())
+        styles = StyleSelector(self.__styles_wrapper)
+        # services are built once and cloned into the system and the per-service diagrams
+        fragments = self.fragments(services_specs)
+        generator = Generator(self.__app_configuration,
+                              services_specs,
+                              self.__template,
+                              styles,
+                              current_branch,
+                              self.show_connect_to_arrow,
+                              fragments)
+        await generator.generate()
+        await generator.save(self.__specs_repo_path, writer)
+
+        service_names = [service_name for service_name in services_specs.available_services
+                         if self.__app_configuration["publish"]["service"] in ('all', service_name) and
+                         (services is None or service_name in services)]
+        if self.__workers_cnt > 1 and len(service_names) >= self.min_parallel_services_cnt:
+            await self.__generate_parallel(service_names, services_specs, current_branch, writer)
+        else:
+            tasks_pool = TasksPool(self.__max_parallel_tasks_cnt)
+            for service_name in service_names:
+                await tasks_pool.append(self.generate_service_diagram(service_name,
+                                                                      services_specs,
+                                                                      current_branch,
+                                                                      writer,
+                                                                      fragments))
+            await tasks_pool.done()
+        logging.debug("Service fragments: {} built, {} cloned".format(fragments.misses, fragments.hits))
+        writer.save_manifest(services_specs.all_services)
+        text_pixel_size.save()
+        return writer
+
+
+_worker_builder: Optional[DiagramsBuilder] = None
+
+_worker_services_specs: Optional[ServicesSpecs] = None
+
+_worker_branch: Optional[Branch] = None
+
+_worker_writer: Optional[OutputWriter] = None
+
+_worker_fragments: Optional[XmlServiceFragments] = None
+
+
+def init_worker(app_configuration: dict,
+                meta_path: str,
+                specs_repo_path: str,
+                max_parallel_tasks_cnt: int,
+                services_specs: ServicesSpecs,
+                branch: Branch,
+                output_manifest_fname: Optional[str]):
+    global _worker_builder, _worker_services_specs, _worker_branch, _worker_writer, _worker_fragments
+    GitSpecsRepositoryHelper.repo_path = specs_repo_path
+    _worker_builder = DiagramsBuilder(app_configuration, meta_path, specs_repo_path, max_parallel_tasks_cnt)
+    asyncio.run(_worker_builder.load_resources())
+    TextPixelSize.shared(app_configuration, GitSpecsRepositoryHelper.text_extents_cache_fname())
+    _worker_services_specs = services_specs
+    _worker_branch = branch
+    # the manifest is read by the workers, the parent process merges the results and saves it
+    _worker_writer = OutputWriter(specs_repo_path, output_manifest_fname)
+    _worker_fragments = _worker_builder.fragments(services_specs)
+
+
+async def _generate_services(service_names: List[str]):
+    for service_name in service_names:
+        await _worker_builder.generate_service_diagram(service_name, _worker_services_specs, _worker_branch,
+                                                       _worker_writer, _worker_fragments)
+
+
+def generate_services_batch(service_names: List[str]) -> Tuple[Dict[str, dict], List[str], Tuple[int, int, float]]:
+    """Returns the written files to be merged by the parent process and the timing (pid, services, seconds)."""
+    ts = time.monotonic()
+    updated_cnt = len(_worker_writer.updated)
+    changed_cnt = len(_worker_writer.changed)
+    asyncio.run(_generate_services(service_names))
+    return dict(list(_worker_writer.updated.items())[updated_cnt:]), \
+        _worker_writer.changed[changed_cnt:], \
+        (os.getpid(), len(service_names), time.monotonic() - ts)
@@ -0,0 +1,244 @@
+import argparse
+import glob
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class GlyphTable:
+    """
+    Per-glyph metrics of a font of one size: advances (1/64 px, as laid out by FreeType), horizontal bounds
+    and heights of the glyph boxes, and the kerning pairs. Text is measured as Pillow FreeTypeFont.getsize()
+    does it, but by vectorised sums over the arrays, so Pillow is needed only to build the table.
+    """
+    # the kerning is looked for inside these ranges only, kerning between scripts is not used by the fonts
+    KERNING_RANGES = ((0x20, 0x7f), (0xa0, 0x100), (0x400, 0x460))
+
+    CHAR_RANGES = ((0x20, 0x7f), (0xa0, 0x250), (0x400, 0x460), (0x2010, 0x2040))
+
+    # big size to find all pairs which have the kerning in the font units
+    KERNING_PROBE_SIZE = 256
+
+    codepoints: np.ndarray
+
+    advances: np.ndarray
+
+    lefts: np.ndarray
+
+    rights: np.ndarray
+
+    heights: np.ndarray
+
+    kerning_pairs: np.ndarray
+
+    kerning: np.ndarray
+
+    def __init__(self, codepoints: np.ndarray, advances: np.ndarray, lefts: np.ndarray, rights: np.ndarray,
+                 heights: np.ndarray, kerning_pairs: np.ndarray, kerning: np.ndarray):
+        self.codepoints = codepoints
+        self.advances = advances
+        self.lefts = lefts
+        self.rights = rights
+        self.heights = heights
+        self.kerning_pairs = kerning_pairs
+        self.kerning = kerning
+
+    @staticmethod
+    def font_hash(font_file: str) -> str:
+        with open(font_file, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    @classmethod
+    def kerning_candidates(cls, font_file: str) -> List[Tuple[int, int]]:
+        from PIL import ImageFont
+        font = ImageFont.truetype(font_file, cls.KERNING_PROBE_SIZE)
+        candidates = []
+        for start, end in cls.KERNING_RANGES:
+            chars = [chr(c) for c in range(start, end)]
+            lengths = {c: font.getlength(c) for c in chars}
+            for a in chars:
+                for b in chars:
+                    if font.getlength(a + b) != lengths[a] + lengths[b]:
+                        candidates.append((ord(a), ord(b)))
+        return candidates
+
+    @classmethod
+    def build(cls, font_file: str, font_size: int,
+              kerning_candidates: Optional[List[Tuple[int, int]]] = None) -> 'GlyphTable':
+        from PIL import ImageFont
+        font = ImageFont.truetype(font_file, font_size)
+        codepoints = []
+        for start, end in cls.CHAR_RANGES:
+            codepoints.extend(range(start, end))
+        advances, lefts, rights, heights = [], [], [], []
+        for c in codepoints:
+            left, _, right, _ = font.getbbox(chr(c))
+            advances.append(round(font.getlength(chr(c)) * 64))
+            lefts.append(left)
+            rights.append(right)
+            heights.append(font.getsize(chr(c))[1])
+        if kerning_candidates is None:
+            kerning_candidates = cls.kerning_candidates(font_file)
+        kerning = {}
+        for a, b in kerning_candidates:
+            k = round((font.getlength(chr(a) + chr(b)) - font.getlength(chr(a)) - font.getlength(chr(b))) * 64)
+            if k != 0:
+                kerning[(a << 32) | b] = k
+        kerning_pairs = sorted(kerning)
+        return cls(np.array(codepoints, dtype=np.uint32),
+                   np.array(advances, dtype=np.int64),
+                   np.array(lefts, dtype=np.int64),
+                   np.array(rights, dtype=np.int64),
+                   np.array(heights, dtype=np.int64),
+                   np.array(kerning_pairs, dtype=np.uint64),
+                   np.array([kerning[p] for p in kerning_pairs], dtype=np.int64))
+
+    def save(self, fname: str, font_hash: str):
+        tmp_fname = "{}.{}.tmp.npz".format(fname, os.getpid())
+        np.savez_compressed(tmp_fname, font_hash=np.array(font_hash), codepoints=self.codepoints,
+                            advances=self.advances, lefts=self.lefts, rights=self.rights, heights=self.heights,
+                            kerning_pairs=self.kerning_pairs, kerning=self.kerning)
+        os.replace(tmp_fname, fname)
+
+    @classmethod
+    def load(cls, fname: str, font_hash: str) -> Optional['GlyphTable']:
+        if not os.path.isfile(fname):
+            return None
+        try:
+            with np.load(fname) as data:
+                if str(data["font_hash"]) != font_hash:
+                    return None
+                return cls(data["codepoints"], data["advances"], data["lefts"], data["rights"], data["heights"],
+                           data["kerning_pairs"], data["kerning"])
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning("Could not load glyph table '{}': {}".format(fname, e))
+            return None
+
+    def text_sizes(self, texts: List[str]) -> List[Optional[Tuple[int, int]]]:
+        """None for the texts with the characters which are not in the table."""
+        sizes: List[Optional[Tuple[int, int]]] = [None] * len(texts)
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        if lengths.sum() == 0:
+            return [(0, 0)] * len(texts)
+        chars = np.frombuffer("".join(texts).encode('utf-32-le'), dtype=np.uint32)
+        idx = np.minimum(np.searchsorted(self.codepoints, chars), len(self.codepoints) - 1)
+        found = self.codepoints[idx] == chars
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        advances = self.advances[idx]
+        if len(chars) > 1 and len(self.kerning_pairs) > 0:
+            pairs = (chars[:-1].astype(np.uint64) << np.uint64(32)) | chars[1:].astype(np.uint64)
+            k_idx = np.minimum(np.searchsorted(self.kerning_pairs, pairs), len(self.kerning_pairs) - 1)
+            kerning = np.where(self.kerning_pairs[k_idx] == pairs, self.kerning[k_idx], 0)
+            # no kerning between the last character of a text and the first one of the next text
+            kerning[ends[(lengths > 0) & (ends < len(chars))] - 1] = 0
+            advances = advances.copy()
+            advances[:-1] += kerning
+        pens = np.cumsum(advances) - advances
+        pens -= np.repeat(pens[np.minimum(starts, len(chars) - 1)], lengths)
+        xs = (pens + 32) >> 6
+        non_empty = np.nonzero(lengths > 0)[0]
+        seg_starts = starts[non_empty]
+        rights = np.maximum.reduceat(xs + self.rights[idx], seg_starts)
+        lefts = np.minimum(np.minimum.reduceat(xs + self.lefts[idx], seg_starts), 0)
+        heights = np.maximum.reduceat(self.heights[idx], seg_starts)
+        covered = np.logical_and.reduceat(found, seg_starts)
+        for i, n in enumerate(lengths):
+            if n == 0:
+                sizes[i] = (0, 0)
+        for j, i in enumerate(non_empty):
+            if covered[j]:
+                sizes[i] = (int(rights[j] - lefts[j]), int(heights[j]))
+        return sizes
+
+
+class GlyphTables:
+    """
+    Glyph tables of the font files by size. The tables are looked for in the prebuilt path (built with the image,
+    see main()), then in the tables path, the missing ones are built with Pillow and cached in the tables path.
+    """
+    # sizes of the prebuilt tables
+    PREBUILT_SIZES = range(6, 33)
+
+    __tables_path: Optional[str]
+
+    __prebuilt_path: Optional[str]
+
+    __tables: Dict[Tuple[str, int], GlyphTable]
+
+    __font_hashes: Dict[str, str]
+
+    __kerning_candidates: Dict[str, List[Tuple[int, int]]]
+
+    def __init__(self, tables_path: Optional[str] = None, prebuilt_path: Optional[str] = None):
+        self.__tables_path = tables_path
+        self.__prebuilt_path = prebuilt_path
+        self.__tables = {}
+        self.__font_hashes = {}
+        self.__kerning_candidates = {}
+
+    @staticmethod
+    def table_fname(tables_path: Optional[str], font_file: str, font_size: int) -> Optional[str]:
+        if tables_path is None:
+            return None
+        return "{}/{}-{}.npz".format(tables_path, os.path.basename(font_file), font_size)
+
+    def __font_hash(self, font_file: str) -> str:
+        if font_file not in self.__font_hashes:
+            self.__font_hashes[font_file] = GlyphTable.font_hash(font_file)
+        return self.__font_hashes[font_file]
+
+    def table(self, font_file: str, font_size: int) -> GlyphTable:
+        key = (font_file, font_size)
+        table = self.__tables.get(key)
+        if table is not None:
+            return table
+        prebuilt_fname = self.table_fname(self.__prebuilt_path, font_file, font_size)
+        if prebuilt_fname is not None:
+            table = GlyphTable.load(prebuilt_fname, self.__font_hash(font_file))
+        fname = self.table_fname(self.__tables_path, font_file, font_size)
+        if table is None and fname is not None:
+            table = GlyphTable.load(fname, self.__font_hash(font_file))
+        if table is None:
+            logging.info("Building glyph table of '{}' size {}".format(os.path.basename(font_file), font_size))
+            if font_file not in self.__kerning_candidates:
+                self.__kerning_candidates[font_file] = GlyphTable.kerning_candidates(font_file)
+            table = GlyphTable.build(font_file, font_size, self.__kerning_candidates[font_file])
+            if fname is not None:
+                try:
+                    os.makedirs(self.__tables_path, exist_ok=True)
+                    table.save(fname, self.__font_hash(font_file))
+                except OSError as e:
+                    logging.warning("Could not save glyph table '{}': {}".format(fname, e))
+        self.__tables[key] = table
+        return table
+
+
+def main():
+    """Builds the glyph tables of the fonts, the images ship them in res/fonts/glyphs."""
+    fonts_path = os.path.join(os.path.dirname(__file__), "../res/fonts")
+    args_parser = argparse.ArgumentParser(description="glyph tables builder")
+    args_parser.add_argument("-o", "--output", dest="output", default=os.path.join(fonts_path, "glyphs"),
+                             help="output path", required=False)
+    args_parser.add_argument("--sizes", dest="sizes", type=int, nargs="+", default=list(GlyphTables.PREBUILT_SIZES),
+                             required=False)
+    args_parser.add_argument("fonts", nargs="*", help="font files, all fonts of res/fonts by default")
+    args = args_parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    font_files = args.fonts if len(args.fonts) > 0 else sorted(glob.glob(os.path.join(fonts_path, "*.ttf")))
+    os.makedirs(args.output, exist_ok=True)
+    for font_file in font_files:
+        font_hash = GlyphTable.font_hash(font_file)
+        kerning_candidates = GlyphTable.kerning_candidates(font_file)
+        for font_size in args.sizes:
+            GlyphTable.build(font_file, font_size, kerning_candidates).save(
+                GlyphTables.table_fname(args.output, font_file, font_size), font_hash)
+        logging.info("Glyph tables of '{}' were built: {} sizes".format(os.path.basename(font_file),
+                                                                         len(args.sizes)))
+
+
+if __name__ == '__main__':
+    main()
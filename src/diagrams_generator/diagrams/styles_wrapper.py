@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import cssutils
 from cssutils.css import CSSStyleSheet, CSSStyleRule, CSSRule
@@ -8,12 +8,30 @@ from core.specs.service.spec import ServiceSpec
 from core.specs.specs import read_yaml
 
 
-class Style:
-    __overrides: dict
+class StyleDeclarations:
+    """Frozen declarations of a css rule compiled once: values by name and the draw.io style string."""
+
+    __names: Tuple[str, ...]
+
+    __drawio_keys: Tuple[str, ...]
+
+    __values: Dict[str, str]
+
+    __drawio_style: str
 
     def __init__(self, css: CSSStyleRule):
-        self.css = css
-        self.__overrides = {}
+        names = []
+        values = {}
+        for e in css.style:
+            names.append(e.name)
+            val = e.value
+            if len(val) > 2 and val[0] == '"' and val[len(val) - 1] == '"':
+                val = val[1:len(val) - 1]
+            values.setdefault(e.name, val)
+        self.__names = tuple(names)
+        self.__drawio_keys = tuple(self.__get_key_in_drawio_format(name) for name in names)
+        self.__values = values
+        self.__drawio_style = self.__build_drawio_style({})
 
     @staticmethod
     def __get_key_in_drawio_format(key: str):
@@ -27,29 +45,58 @@ class Style:
                 s = s + ch
         return s
 
+    def value(self, key: str) -> Optional[str]:
+        return self.__values.get(key)
+
+    def drawio_style(self, overrides: dict) -> str:
+        if len(overrides) == 0:
+            return self.__drawio_style
+        return self.__build_drawio_style(overrides)
+
+    def __build_drawio_style(self, overrides: dict) -> str:
+        s = ""
+        for name, drawio_key in zip(self.__names, self.__drawio_keys):
+            val = overrides[name] if name in overrides else self.__values[name]
+            if val == '__':
+                s = s + "{};".format(drawio_key)
+                continue
+            s = s + "{}={};".format(drawio_key, val)
+        return s
+
+
+class Style:
+    """Style of an element: shared compiled declarations with the element's own overrides."""
+
+    __declarations: StyleDeclarations
+
+    __overrides: dict
+
+    __repr: Optional[str]
+
+    def __init__(self, declarations: StyleDeclarations):
+        self.__declarations = declarations
+        self.__overrides = {}
+        self.__repr = None
+
     def value(self, key: str):
         if key in self.__overrides:
             return self.__overrides[key]
-        for e in self.css.style:
-            if key == e.name:
-                val = e.value
-                if len(val) > 2 and val[0] == '"' and val[len(val) - 1] == '"':
-                    return val[1:len(val) - 1]
-                return e.value
-        return None
+        return self.__declarations.value(key)
 
     def set_value(self, key: str, value: str):
         self.__overrides[key] = value
+        self.__repr = None
+
+    def copy(self) -> 'Style':
+        style = Style(self.__declarations)
+        style.__overrides = dict(self.__overrides)
+        style.__repr = self.__repr
+        return style
 
     def __repr__(self):
-        s = ""
-        for e in self.css.style:
-            val = self.value(e.name)
-            if val == '__':
-                s = s + "{};".format(self.__get_key_in_drawio_format(e.name))
-                continue
-            s = s + "{}={};".format(self.__get_key_in_drawio_format(e.name), val)
-        return s
+        if self.__repr is None:
+            self.__repr = self.__declarations.drawio_style(self.__overrides)
+        return self.__repr
 
     def font_size(self):
         return self.value('font-size')
@@ -63,26 +110,40 @@ class StylesWrapper:
 
     props: dict
 
+    __declarations: Dict[str, StyleDeclarations]
+
+    __first_available: Dict[Tuple[str, ...], Optional[str]]
+
     def __init__(self, css_filename: str, props_filename: str):
         css_parser = cssutils.CSSParser()
         self.stylesheet = css_parser.parseFile(css_filename)
         self.props = read_yaml(props_filename)
+        self.__declarations = {}
+        for each_rule in self.stylesheet.cssRules:
+            if each_rule.type == CSSRule.STYLE_RULE and each_rule.selectorText not in self.__declarations:
+                self.__declarations[each_rule.selectorText] = StyleDeclarations(each_rule)
+        self.__first_available = {}
 
     def style(self, name: str) -> Optional[Style]:
-        style_name = '.' + name
-        for each_rule in self.stylesheet.cssRules:
-            if each_rule.type == CSSRule.STYLE_RULE and style_name == each_rule.selectorText:
-                return Style(each_rule)
-        return None
+        # a new Style every time: the elements set their own values on it
+        declarations = self.__declarations.get('.' + name)
+        if declarations is None:
+            return None
+        return Style(declarations)
 
     def first_available(self, names: list):
-        for name in names:
-            if name is None:
-                continue
-            s = self.style(name)
-            if s is not None:
-                return s
-        return None
+        # the fallback chain is resolved once per names (e.g. per element type, module and status)
+        key = tuple(names)
+        if key not in self.__first_available:
+            self.__first_available[key] = None
+            for name in names:
+                if name is not None and '.' + name in self.__declarations:
+                    self.__first_available[key] = name
+                    break
+        name = self.__first_available[key]
+        if name is None:
+            return None
+        return self.style(name)
 
 
 class StyleSelector:
@@ -1,4 +1,6 @@
+import copy
 import xml.etree.ElementTree as ET
+from typing import Optional
 
 from aiofile import AIOFile
 
@@ -6,10 +8,13 @@ from aiofile import AIOFile
 class XmlTemplate:
     __source: str
 
+    __root: Optional[ET.Element] = None
+
     async def load(self, template_path, diagram_template_name: str, template_file_name: str) -> str:
         file_name = "{}/{}/{}.xml".format(template_path, diagram_template_name, template_file_name)
         async with AIOFile(file_name, 'r') as afp:
             self.__source = await afp.read()
+            self.__root = None
             return self.__source
 
     @property
@@ -17,5 +22,7 @@ class XmlTemplate:
         return self.__source
 
     def parse(self) -> ET.Element:
-        e = ET.fromstring(self.__source)
-        return e
+        # the source is parsed once, every caller gets its own copy of the tree to modify
+        if self.__root is None:
+            self.__root = ET.fromstring(self.__source)
+        return copy.deepcopy(self.__root)
@@ -1,39 +1,220 @@
+import hashlib
+import json
 import logging
 import os
-from typing import Tuple
-
-from PIL import ImageFont
+from functools import lru_cache
+from importlib import metadata
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
+from diagrams_generator.diagrams.glyphs import GlyphTable, GlyphTables
 from diagrams_generator.diagrams.styles_wrapper import Style
 
+if TYPE_CHECKING:
+    from PIL import ImageFont
+
+
+@lru_cache(maxsize=None)
+def get_font(font_file: str, font_size: int) -> 'ImageFont.FreeTypeFont':
+    # Pillow is imported only if the text is measured by it
+    from PIL import ImageFont
+    return ImageFont.truetype(font_file, font_size)
+
 
 def get_text_dimensions(text: str, font_size: int, font_file='times.ttf') -> Tuple[float, float]:
-    font = ImageFont.truetype(font_file, font_size)
+    font = get_font(font_file, font_size)
     size = font.getsize(text)
     return size
 
 
+class FontRegistry:
+    """Fonts of the config loaded once per process by (family, size)."""
+
+    __font_files: Dict[str, str]
+
+    __fonts: Dict[Tuple[str, int], 'ImageFont.FreeTypeFont']
+
+    __glyph_tables: GlyphTables
+
+    __fonts_hash: Optional[str]
+
+    def __init__(self, config: dict, glyph_tables_path: Optional[str] = None):
+        path = os.path.dirname(__file__)
+        self.__font_files = {}
+        for e in config['fonts']:
+            self.__font_files.setdefault(e["family"], "{}/../res/fonts/{}".format(path, e['file']))
+        self.__fonts = {}
+        self.__glyph_tables = GlyphTables(glyph_tables_path, "{}/../res/fonts/glyphs".format(path))
+        self.__fonts_hash = None
+
+    def font_file(self, font_family: str) -> Optional[str]:
+        return self.__font_files.get(font_family)
+
+    def font(self, font_family: str, font_size: int) -> 'ImageFont.FreeTypeFont':
+        key = (font_family, font_size)
+        font = self.__fonts.get(key)
+        if font is None:
+            font_file = self.font_file(font_family)
+            if font_file is None:
+                logging.error("Could not find font '{}' in the system".format(font_family))
+            font = get_font(font_file, font_size)
+            self.__fonts[key] = font
+        return font
+
+    def glyph_table(self, font_family: str, font_size: int) -> Optional[GlyphTable]:
+        font_file = self.font_file(font_family)
+        if font_file is None:
+            return None
+        return self.__glyph_tables.table(font_file, font_size)
+
+    def fonts_hash(self) -> str:
+        """Extents depend on the font files and the rasterizer."""
+        if self.__fonts_hash is not None:
+            return self.__fonts_hash
+        try:
+            pillow_version = metadata.version("Pillow")
+        except metadata.PackageNotFoundError:
+            pillow_version = ""
+        h = hashlib.sha1(pillow_version.encode('utf8'))
+        for font_family in sorted(self.__font_files):
+            font_file = self.__font_files[font_family]
+            h.update(font_family.encode('utf8'))
+            if os.path.isfile(font_file):
+                with open(font_file, 'rb') as f:
+                    h.update(f.read())
+        self.__fonts_hash = h.hexdigest()
+        return self.__fonts_hash
+
+
 class TextPixelSize:
+    """
+    Text extents measured by Pillow ('pil' backend) or by the glyph tables built from the same fonts
+    ('glyphs' backend, Pillow is used only to build the tables and for the characters not in them).
+    """
+    BACKENDS = ("pil", "glyphs")
+
     config: dict
 
-    def __init__(self, config: dict):
+    __shared: Optional['TextPixelSize'] = None
+
+    __backend: str
+
+    __registry: FontRegistry
+
+    __extents: Dict[Tuple[str, str, int], Tuple[float, float]]
+
+    __cache_fname: Optional[str]
+
+    __loaded_cnt: int
+
+    __hits: int
+
+    __misses: int
+
+    def __init__(self, config: dict, cache_fname: Optional[str] = None, backend: Optional[str] = None):
         self.config = config
+        if backend is None:
+            backend = config.get('text_measure', {}).get('backend', "glyphs")
+        if backend not in self.BACKENDS:
+            raise Exception("Unknown text measure backend '{}', available backends: {}".format(
+                backend, ", ".join(self.BACKENDS)))
+        self.__backend = backend
+        glyph_tables_path = None
+        if cache_fname is not None:
+            glyph_tables_path = os.path.join(os.path.dirname(cache_fname), "glyphs")
+        self.__registry = FontRegistry(config, glyph_tables_path)
+        self.__extents = {}
+        self.__cache_fname = cache_fname
+        self.__loaded_cnt = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__load()
 
-    def __get_font_filename(self, font_family: str):
-        path = os.path.dirname(__file__)
-        for e in self.config['fonts']:
-            if e["family"] == font_family:
-                return "{}/../res/fonts/{}".format(path, e['file'])
-        return None
+    @classmethod
+    def shared(cls, config: dict, cache_fname: Optional[str] = None) -> 'TextPixelSize':
+        """Process-wide instance for the config, the extents cache file is set by the first caller which has it."""
+        if cls.__shared is None or cls.__shared.config is not config or \
+                (cache_fname is not None and cls.__shared.cache_fname != cache_fname):
+            cls.__shared = TextPixelSize(config, cache_fname)
+        return cls.__shared
+
+    @property
+    def backend(self) -> str:
+        return self.__backend
+
+    @property
+    def cache_fname(self) -> Optional[str]:
+        return self.__cache_fname
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def registry(self) -> FontRegistry:
+        return self.__registry
+
+    def measure(self, text: str, font_family: str, font_size: int) -> Tuple[float, float]:
+        """Uncached extents of the text."""
+        if self.__backend == "glyphs":
+            table = self.__registry.glyph_table(font_family, font_size)
+            if table is not None:
+                size = table.text_sizes([text])[0]
+                if size is not None:
+                    return size
+        return tuple(self.__registry.font(font_family, font_size).getsize(text))
 
     def text_dimensions(self, text, style: Style) -> Tuple[float, float]:
         font_size = int(style.font_size())
         font_family = style.font_family()
-        font_file = self.__get_font_filename(font_family)
-        if font_file is None:
-            logging.error("Could not find font '{}' in the system".format(font_family))
-        return get_text_dimensions(text, font_size, font_file)
+        key = (text, font_family, font_size)
+        size = self.__extents.get(key)
+        if size is not None:
+            self.__hits += 1
+            return size
+        self.__misses += 1
+        size = self.measure(text, font_family, font_size)
+        self.__extents[key] = size
+        return size
 
     @staticmethod
     def text_dim(config, text, style: Style) -> Tuple[float, float]:
-        return TextPixelSize(config).text_dimensions(text, style)
+        return TextPixelSize.shared(config).text_dimensions(text, style)
+
+    def __load(self):
+        if self.__cache_fname is None or not os.path.isfile(self.__cache_fname):
+            return
+        try:
+            with open(self.__cache_fname, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Could not load text extents cache '{}': {}".format(self.__cache_fname, e))
+            return
+        if cache.get("backend") != self.__backend or cache.get("fonts_hash") != self.__registry.fonts_hash():
+            return
+        for text, font_family, font_size, w, h in cache["extents"]:
+            self.__extents[(text, font_family, font_size)] = (w, h)
+        self.__loaded_cnt = len(self.__extents)
+
+    def save(self):
+        logging.debug("Text extents: {} hits, {} misses".format(self.__hits, self.__misses))
+        if self.__cache_fname is None or len(self.__extents) == self.__loaded_cnt:
+            return
+        try:
+            cache_dir = os.path.dirname(self.__cache_fname)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            tmp_fname = "{}.{}.tmp".format(self.__cache_fname, os.getpid())
+            with open(tmp_fname, 'w') as f:
+                json.dump({"backend": self.__backend,
+                           "fonts_hash": self.__registry.fonts_hash(),
+                           "extents": [[text, font_family, font_size, w, h]
+                                       for (text, font_family, font_size), (w, h) in self.__extents.items()]},
+                          f, ensure_ascii=False)
+            os.replace(tmp_fname, self.__cache_fname)
+            self.__loaded_cnt = len(self.__extents)
+        except OSError as e:
+            logging.warning("Could not save text extents cache '{}': {}".format(self.__cache_fname, e))
@@ -1,9 +1,10 @@
+import copy
 import xml.etree.ElementTree as ET
 from enum import Enum, auto
 from typing import Optional
 
 from diagrams_generator.diagrams.geometry import Geometry, Position
-from diagrams_generator.diagrams.styles_wrapper import StyleSelector
+from diagrams_generator.diagrams.styles_wrapper import Style, StyleSelector
 
 
 class XmlElementType(Enum):
@@ -69,6 +70,13 @@ class XmlObject:
             return self.geom.p
         return Position(self.geom.x + self._parent.position_global.x, self.geom.y + self._parent.position_global.y)
 
+    def clone(self, styles: StyleSelector) -> 'XmlObject':
+        """
+        Copy of the objects tree with its own xml elements and styles which can be repositioned and restyled,
+        the config and the specs are shared.
+        """
+        return _clone(self, styles, {})
+
     @staticmethod
     def _geom(xml: ET.Element) -> Geometry:
         geom = Geometry()
@@ -77,3 +85,29 @@ class XmlObject:
         geom.w = float(xml.attrib['width'])
         geom.h = float(xml.attrib['height'])
         return geom
+
+
+def _clone(value, styles: StyleSelector, memo: dict):
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, XmlObject):
+        obj = copy.copy(value)
+        memo[id(value)] = obj
+        for name, attr in value.__dict__.items():
+            if name != 'config':
+                obj.__dict__[name] = _clone(attr, styles, memo)
+        obj.styles = styles
+        return obj
+    if isinstance(value, ET.Element):
+        # the memo is shared with deepcopy: sub-elements referenced by the objects are copied once
+        return copy.deepcopy(value, memo)
+    if isinstance(value, Style):
+        cloned = value.copy()
+    elif isinstance(value, list):
+        cloned = [_clone(e, styles, memo) for e in value]
+    elif isinstance(value, dict):
+        cloned = {k: _clone(e, styles, memo) for k, e in value.items()}
+    else:
+        return value
+    memo[id(value)] = cloned
+    return cloned
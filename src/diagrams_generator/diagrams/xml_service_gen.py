@@ -1,3 +1,5 @@
+from typing import Dict
+
 from core.specs.service.spec import ServiceType
 from core.specs.specs import ServicesSpecs
 from diagrams_generator.diagrams.styles_wrapper import StyleSelector
@@ -28,3 +30,42 @@ class XmlServiceGen:
             xml_service = XmlService(self.config, self.styles, service_spec, self.services_specs)
         await xml_service.generate()
         return xml_service
+
+
+class XmlServiceFragments:
+    """
+    Element trees and geometry of the services built once with the default styles and shared by the system
+    and the per-service diagrams: every diagram gets its own clone to position and restyle.
+    """
+
+    __service_gen: XmlServiceGen
+
+    __fragments: Dict[str, XmlService]
+
+    __hits: int
+
+    __misses: int
+
+    def __init__(self, config: dict, styles: StyleSelector, services_specs: ServicesSpecs):
+        self.__service_gen = XmlServiceGen(config, styles, services_specs)
+        self.__fragments = {}
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    async def clone(self, service_name: str, styles: StyleSelector) -> XmlService:
+        fragment = self.__fragments.get(service_name)
+        if fragment is None:
+            self.__misses += 1
+            fragment = await self.__service_gen.generate(service_name)
+            self.__fragments[service_name] = fragment
+        else:
+            self.__hits += 1
+        return fragment.clone(styles)
@@ -3,9 +3,8 @@ import xml
 import xml.etree.ElementTree as ET
 from typing import Optional
 
-from aiofile import AIOFile
-
 from core.git.branch import Branch
+from core.output_writer import OutputWriter
 from core.specs.specs import ServicesSpecs
 from diagrams_generator.diagrams.geometry import Position
 from diagrams_generator.diagrams.styles_wrapper import StyleSelector
@@ -14,7 +13,7 @@ from diagrams_generator.diagrams.xml.arrow.connect_to_arrow import XmlConnectToA
 from diagrams_generator.diagrams.xml.arrow.topics_arrow import XmlTopicsArrow
 from diagrams_generator.diagrams.xml.arrow.topics_container_arrow import XmlTopicsContainerArrow
 from diagrams_generator.diagrams.xml.service import XmlService
-from diagrams_generator.diagrams.xml_service_gen import XmlServiceGen
+from diagrams_generator.diagrams.xml_service_gen import XmlServiceFragments, XmlServiceGen
 
 
 class Generator:
@@ -42,13 +41,16 @@ class Generator:
 
     template: XmlTemplate
 
+    fragments: Optional[XmlServiceFragments]
+
     def __init__(self,
                  config: dict,
                  services_specs: ServicesSpecs,
                  template: XmlTemplate,
                  styles: StyleSelector,
                  current_branch: Branch,
-                 show_connect_to_arrow=False):
+                 show_connect_to_arrow=False,
+                 fragments: Optional[XmlServiceFragments] = None):
         self.node_topics = {}
         self.xml_services = {}
         self.config = config
@@ -58,6 +60,7 @@ class Generator:
         self.styles = styles
         self.service_gen = XmlServiceGen(self.config, self.styles, self.services_specs)
         self.template = template
+        self.fragments = fragments
 
     async def generate(self):
         await self.__generate()
@@ -71,6 +74,8 @@ class Generator:
         return self.services_specs.available_services
 
     async def _generate_xml_service(self, service_name) -> XmlService:
+        if self.fragments is not None:
+            return await self.fragments.clone(service_name, self.styles)
         return await self.service_gen.generate(service_name)
 
     async def generate_xml_services(self, root_xml: ET.Element):
@@ -213,9 +218,10 @@ class Generator:
         self.diagram_root_xml = self.xml_root.findall('diagram/mxGraphModel/root')[0]
         await self.__add_xml_objects()
 
-    async def save(self, output_xml_path: str):
+    async def save(self, output_xml_path: str, writer: Optional[OutputWriter] = None):
         if not os.path.exists(output_xml_path):
             os.makedirs(output_xml_path)
+        if writer is None:
+            writer = OutputWriter(output_xml_path)
         xmlstr = xml.etree.ElementTree.tostring(self.xml_root, encoding='utf8', method='xml')
-        async with AIOFile(output_xml_path + '/system_arch_diagram.xml', "w+") as out:
-            await out.write(xmlstr.decode("utf8"))
+        writer.write_bytes(output_xml_path + '/system_arch_diagram.xml', xmlstr)
@@ -3,15 +3,16 @@ import xml
 from typing import Optional
 from xml.etree.ElementTree import ElementTree
 
-from aiofile import AIOFile
 import xml.etree.ElementTree as ET
 from core.git.branch import Branch
+from core.output_writer import OutputWriter
 from core.specs.service.connector import ChannelType
 from core.specs.service.spec import ServiceSpec
 from core.specs.specs import ServicesSpecs
 from diagrams_generator.diagrams.geometry import Position, Geometry
 from diagrams_generator.diagrams.template import XmlTemplate
 from diagrams_generator.diagrams.xml.service import XmlService
+from diagrams_generator.diagrams.xml_service_gen import XmlServiceFragments
 from diagrams_generator.generator.generator import Generator
 from diagrams_generator.generator.service.service_style_selector import ServiceStyleSelector
 
@@ -28,18 +29,20 @@ class ServiceNetworkGenerator(Generator):
                  template: XmlTemplate,
                  styles: ServiceStyleSelector,
                  current_branch: Branch,
-                 show_connect_to_arrow: bool):
+                 show_connect_to_arrow: bool,
+                 fragments: Optional[XmlServiceFragments] = None):
         self.service = services_specs.get_service_spec(service_name)
         self.styles_ = styles
-        super().__init__(config, services_specs, template, styles, current_branch, show_connect_to_arrow)
+        super().__init__(config, services_specs, template, styles, current_branch, show_connect_to_arrow, fragments)
 
-    async def save(self, output_xml_path: str):
+    async def save(self, output_xml_path: str, writer: Optional[OutputWriter] = None):
         diagram_dir = output_xml_path + "/specs/" + self.service.service_name
         if not os.path.exists(diagram_dir):
             os.makedirs(diagram_dir)
+        if writer is None:
+            writer = OutputWriter(output_xml_path)
         xmlstr = xml.etree.ElementTree.tostring(self.xml_root, encoding='utf8', method='xml')
-        async with AIOFile(diagram_dir + '/network_diagram.xml', "w+") as out:
-            await out.write(xmlstr.decode("utf8"))
+        writer.write_bytes(diagram_dir + '/network_diagram.xml', xmlstr)
 
     async def __highlight_topics(self):
         selected_service_topics = {}
@@ -66,33 +69,18 @@ class ServiceNetworkGenerator(Generator):
         services_list = []
         producers_list = []
         consumers_list = []
-        connectors = []
-        if self.service.has_connectors:
-            for connector in self.service.connectors:
-                services_list.append(connector.dest.service_name)
-                if connector.has_channels is False:
-                    continue
-                broker = connector.dest
-                for channel_name in connector.channels:
-                    if connector.channel_type == ChannelType.celery_task:
-                        channel = broker.celery_task(channel_name)
-                    elif connector.channel_type == ChannelType.topic:
-                        channel = broker.topic(channel_name)
-                    else:
-                        continue
-                    if channel is not None and connector.data_direction == 'rx' and 'tx' in channel:
-                        for producer_name in channel['tx']:
-                            producers_list.append(producer_name)
-                    if channel is not None and connector.data_direction == 'tx' and 'rx' in channel:
-                        for producer_name in channel['rx']:
-                            producers_list.append(producer_name)
-
-        for service_name in self.services_specs.available_services:
-            spec = self.services_specs.get_service_spec(service_name)
-            if 'connect_to' in spec.raw and spec.raw['connect_to'] is not None:
-                for connect_to in spec.raw["connect_to"]:
-                    if connect_to['name'] == self.service.service_name:
-                        connectors.append(service_name)
+        channels = self.services_specs.channels
+        for connector in self.service.connectors:
+            services_list.append(connector.dest.service_name)
+            if connector.channel_type not in [ChannelType.celery_task, ChannelType.topic]:
+                continue
+            for key in channels.connector_channels(connector):
+                if connector.data_direction == 'rx':
+                    producers_list.extend(channels.producers(key))
+                if connector.data_direction == 'tx':
+                    producers_list.extend(channels.consumers(key))
+
+        connectors = [c.source.service_name for c in channels.inbound_connectors(self.service.service_name)]
         services_list.extend(producers_list)
         services_list.append(self.service.service_name)
         services_list.extend(consumers_list)
@@ -158,6 +146,7 @@ class ServiceNetworkGenerator(Generator):
         return None
 
     async def _generate_xml_service(self, service_name) -> XmlService:
-        if service_name != self.service.service_name:
-            return await self.service_gen.generate(service_name)
+        # the neighbours look the same as in the other diagrams, only the selected service is styled differently
+        if service_name != self.service.service_name and self.fragments is not None:
+            return await self.fragments.clone(service_name, self.styles)
         return await self.service_gen.generate(service_name)
@@ -0,0 +1,80 @@
+import os
+import random
+
+import pytest
+from PIL import ImageFont
+
+from diagrams_generator.diagrams.glyphs import GlyphTable, GlyphTables
+
+# the diagrams are laid out by the sizes of FreeTypeFont.getsize(), the tables must match them
+pytestmark = pytest.mark.filterwarnings("ignore:getsize is deprecated:DeprecationWarning")
+
+FONT_FILE = os.path.join(os.path.dirname(__file__), "../res/fonts/times.ttf")
+
+FONT_SIZES = [7, 10, 12, 14, 16, 20]
+
+LABELS = [
+    "api",
+    "elasticsearch",
+    "[production]",
+    "gRPC",
+    "HTTP/REST",
+    "payments-gateway-v2",
+    "Kafka: orders.created",
+    "AVWAY To. Ly",
+    "Сервис уведомлений",
+    "Ünïcödé — «labels»",
+]
+
+
+def test_pillow_has_getsize():
+    # the tables reproduce getsize(), which was removed in Pillow 10: Pillow is pinned in requirements.txt
+    assert hasattr(ImageFont.FreeTypeFont, "getsize"), "diagrams are laid out by FreeTypeFont.getsize()"
+
+
+@pytest.fixture(scope="module")
+def kerning_candidates():
+    return GlyphTable.kerning_candidates(FONT_FILE)
+
+
+def random_labels(cnt: int):
+    rnd = random.Random(1)
+    chars = [chr(c) for start, end in GlyphTable.CHAR_RANGES for c in range(start, end)]
+    return ["".join(rnd.choice(chars) for _ in range(rnd.randint(1, 30))) for _ in range(cnt)]
+
+
+@pytest.mark.parametrize("font_size", FONT_SIZES)
+def test_text_sizes_match_pillow(kerning_candidates, font_size):
+    table = GlyphTable.build(FONT_FILE, font_size, kerning_candidates)
+    font = ImageFont.truetype(FONT_FILE, font_size)
+    labels = LABELS + random_labels(200)
+    for label, size in zip(labels, table.text_sizes(labels)):
+        expected = font.getsize(label)
+        assert size is not None, label
+        assert abs(size[0] - expected[0]) <= 1, label
+        assert abs(size[1] - expected[1]) <= 1, label
+
+
+def test_text_sizes_of_uncovered_and_empty_texts(kerning_candidates):
+    table = GlyphTable.build(FONT_FILE, 12, kerning_candidates)
+    assert table.text_sizes(["", "api", "中文"]) == [(0, 0), table.text_sizes(["api"])[0], None]
+
+
+def test_prebuilt_tables_are_used(tmp_path, kerning_candidates):
+    prebuilt_path = str(tmp_path / "prebuilt")
+    os.makedirs(prebuilt_path)
+    table = GlyphTable.build(FONT_FILE, 12, kerning_candidates)
+    table.save(GlyphTables.table_fname(prebuilt_path, FONT_FILE, 12), GlyphTable.font_hash(FONT_FILE))
+    tables = GlyphTables(str(tmp_path / "cache"), prebuilt_path)
+    assert tables.table(FONT_FILE, 12).text_sizes(LABELS) == table.text_sizes(LABELS)
+    # nothing is built and cached if the table is prebuilt
+    assert not os.path.exists(str(tmp_path / "cache"))
+
+
+def test_save_and_load(tmp_path, kerning_candidates):
+    table = GlyphTable.build(FONT_FILE, 12, kerning_candidates)
+    fname = str(tmp_path / "times.ttf-12.npz")
+    table.save(fname, "hash")
+    assert GlyphTable.load(fname, "other") is None
+    loaded = GlyphTable.load(fname, "hash")
+    assert loaded.text_sizes(LABELS) == table.text_sizes(LABELS)
@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Set
+
+import cssutils
+
+from core.app import AppCore
+from core.git.branch import Branch
+from core.git.specs_repo import GitSpecsRepositoryHelper
+from core.output_writer import OutputWriter
+from core.specs.diff import SpecsDiff
+from core.specs.snapshot import ServicesSpecsSnapshot
+from core.specs.specs import ServicesSpecs
+from core.specs.validate.graph_lint import GraphLinter
+from core.specs.validate.specs_validator import SpecsValidator
+from core.specs.validate.topics_validator import TopicsValidator
+from core.specs.watcher import SpecsWatcher
+from core.unpublished_services import UnpublishedServices
+from data.confluence.service import ConfluenceService
+from data.specs.owners_validator import OwnersValidator
+from data.template.templates_storage import HtmlTemplatesStorage
+from diagrams_generator.builder import DiagramsBuilder
+from publisher import PagesPublisher
+from specs_generator.generator import SpecsGenerator
+
+
+def generate_specs(meta_path: str,
+                   app_configuration: dict,
+                   topics_info_filename: str,
+                   current_branch: Branch,
+                   services_specs: ServicesSpecs,
+                   output_path: str,
+                   services: Optional[Set[str]],
+                   markdown_cache_fname: Optional[str] = None,
+                   workers_cnt: int = 1,
+                   writer: Optional[OutputWriter] = None,
+                   bundle: bool = False) -> Set[str]:
+    """Returns services with changed specs files."""
+    generator = SpecsGenerator(meta_path, app_configuration, topics_info_filename, current_branch, services_specs,
+                               markdown_cache_fname)
+    generator.save(output_path, services, workers_cnt, writer, bundle)
+    return generator.writer.changed_services()
+
+
+class App(AppCore):
+    STAGES = ("validate", "specs", "diagrams", "confluence")
+
+    __timings: Dict[str, float]
+
+    __diagrams_builder: DiagramsBuilder
+
+    @staticmethod
+    def prepare_args_parser():
+        path = os.path.dirname(__file__)
+        m_desc = "runs validate, specs, diagrams and confluence stages in one process"
+        args_parser = argparse.ArgumentParser(
+            fromfile_prefix_chars='@', description=m_desc, formatter_class=argparse.RawTextHelpFormatter)
+        args_parser.add_argument(
+            "-m", "--meta_path", dest="meta_path", help="meta_path", required=True)
+        args_parser.add_argument(
+            "-specs_repo_path", "--specs_repo_path", dest="specs_repo_path", help="specs_repo_path",
+            default="../../arch_specs_autogen", required=False)
+        args_parser.add_argument(
+            "-c", "--config", dest="config", help="config", default=path + "/config/base.yaml",
+            required=False)
+        args_parser.add_argument(
+            "--cache_path", "--cache_path", dest="cache_path", help="cache_path", default="/tmp", required=False)
+        args_parser.add_argument(
+            "--html_templates_path", "--html_templates_path", dest="html_templates_path",
+            help="html_templates_path", default=path + "/../confluence_publisher/res/template-onprem",
+            required=False)
+        args_parser.add_argument(
+            "--stages", "--stages", dest="stages", help="comma separated stages: {}".format(",".join(App.STAGES)),
+            default=",".join(App.STAGES), required=False)
+        args_parser.add_argument(
+            '--watch', action='store_true',
+            help="watch meta and regenerate specs and diagrams of the affected services on every change")
+        args_parser.add_argument(
+            "--watch_interval", "--watch_interval", dest="watch_interval", help="watch_interval (secs)",
+            type=float, default=0.5, required=False)
+        args_parser.add_argument(
+            '--publish_changed_only', '--publish-changed-only', dest="publish_changed_only", action='store_true',
+            help="publish only services whose specs or diagrams files were changed and not published yet")
+        AppCore.add_affected_only_args(args_parser)
+        return args_parser
+
+    def __init__(self):
+        super().__init__(self.prepare_args_parser())
+        cssutils.log.setLevel(logging.FATAL)
+        GitSpecsRepositoryHelper.repo_path = self.args.specs_repo_path
+        self.__timings = {}
+        self.__diagrams_builder = DiagramsBuilder(self.configuration, self.args.meta_path,
+                                                  self.args.specs_repo_path, self.max_parallel_tasks_cnt,
+                                                  self.diagrams_workers_cnt)
+
+    @property
+    def stages(self) -> List[str]:
+        stages = [e.strip() for e in self.args.stages.split(",") if e.strip()]
+        for stage in stages:
+            if stage not in self.STAGES:
+                raise Exception("Unknown stage '{}', available stages: {}".format(stage, ", ".join(self.STAGES)))
+        return stages
+
+    @property
+    def max_parallel_tasks_cnt(self):
+        return self.configuration['app']['max_parallel_tasks_cnt']
+
+    @property
+    def max_parallel_publish_tasks_cnt(self):
+        return self.configuration['app']['max_parallel_publish_tasks_cnt']
+
+    def specs_writer(self) -> OutputWriter:
+        return OutputWriter(self.args.specs_repo_path, GitSpecsRepositoryHelper.specs_manifest_fname())
+
+    @property
+    def specs_workers_cnt(self):
+        return self.configuration['app']['specs_workers_cnt']
+
+    @property
+    def diagrams_workers_cnt(self):
+        return self.configuration['app']['diagrams_workers_cnt']
+
+    @property
+    def specs_bundle(self) -> bool:
+        return bool(self.configuration['app']['specs_bundle'])
+
+    @property
+    def max_releases_cnt(self):
+        return self.configuration['publish']['max_releases_cnt']
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        logging.info("STAGE[{}]: starting...".format(name))
+        ts = time.monotonic()
+        try:
+            yield
+        finally:
+            self.__timings[name] = time.monotonic() - ts
+        logging.info("STAGE[{}]: done in {:.2f} sec".format(name, self.__timings[name]))
+
+    def print_timings(self):
+        for name, duration in self.__timings.items():
+            logging.info("timing [{}]: {:.2f} sec".format(name, duration))
+
+    async def __validate(self) -> bool:
+        async with self.stage("validate"):
+            specs_validator = SpecsValidator(self.args.meta_path,
+                                             GitSpecsRepositoryHelper.schema_validation_cache_fname())
+            valid, errors, warns = specs_validator.validate(self.validated_services(specs_validator))
+            specs_validator.print(errors, warns)
+            return valid
+
+    async def __validate_graph(self, services_specs: ServicesSpecs) -> bool:
+        async with self.stage("validate_graph"):
+            topics_validator = TopicsValidator(services_specs, self.configuration['app']['dash_repo_path'])
+            valid, errors, warns = topics_validator.validate()
+            topics_validator.print(errors, warns)
+            graph_linter = GraphLinter(services_specs)
+            graph_valid, errors, warns = graph_linter.validate()
+            graph_linter.print(errors, warns)
+            return valid and graph_valid
+
+    async def __generate_specs(self,
+                               services_specs: ServicesSpecs,
+                               current_branch: Branch,
+                               services: Optional[Set[str]]) -> Set[str]:
+        # json tables are generated in a separate process while diagrams are built in the event loop
+        async with self.stage("specs"):
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                return await asyncio.get_running_loop().run_in_executor(executor,
+                                                                 generate_specs,
+                                                                 self.args.meta_path,
+                                                                 self.configuration,
+                                                                 GitSpecsRepositoryHelper.topics_info_fname(),
+                                                                 current_branch,
+                                                                 services_specs,
+                                                                 "{}/specs".format(self.args.specs_repo_path),
+                                                                 services,
+                                                                 GitSpecsRepositoryHelper.markdown_cache_fname(),
+                                                                 self.specs_workers_cnt,
+                                                                 self.specs_writer(),
+                                                                 self.specs_bundle)
+
+    async def __generate_diagrams(self,
+                                  services_specs: ServicesSpecs,
+                                  current_branch: Branch,
+                                  services: Optional[Set[str]]) -> Set[str]:
+        async with self.stage("diagrams"):
+            writer = await self.__diagrams_builder.build(services_specs, current_branch, services)
+            return writer.changed_services()
+
+    async def __publish(self,
+                        services_specs: ServicesSpecs,
+                        current_branch: Branch,
+                        services: Optional[Set[str]]) -> bool:
+        if not current_branch.is_master and not current_branch.is_release:
+            raise Exception("You try to execute confluence stage for the non-master/non-release "
+                            "branch '{}'!".format(current_branch.name))
+        confluence = None
+        async with self.stage("confluence"):
+            try:
+                confluence = ConfluenceService(self.configuration['confluence'])
+                validator = OwnersValidator(services_specs, confluence, self.args.cache_path)
+                valid, errors = await validator.validate()
+                if valid is False:
+                    logging.error("Owner`s names Validation - FAILED")
+                    return False
+                html_templates_storage = HtmlTemplatesStorage(self.args.html_templates_path)
+                confluence_pages = PagesPublisher(html_templates_storage,
+                                                  self.max_releases_cnt,
+                                                  self.configuration,
+                                                  services_specs,
+                                                  confluence,
+                                                  self.max_parallel_publish_tasks_cnt,
+                                                  current_branch,
+                                                  self.args.cache_path,
+                                                  False,
+                                                  services,
+                                                  GitSpecsRepositoryHelper.markdown_cache_fname())
+                await confluence_pages.publish()
+            finally:
+                if confluence is not None:
+                    await confluence.release()
+        return True
+
+    async def __on_specs_change(self, specs_diff: SpecsDiff):
+        specs_diff.log()
+        services_specs = specs_diff.current
+        current_branch = Branch(self.configuration["git"]["branch"])
+        services = set(specs_diff.affected_services)
+        stages = self.stages
+        ts = time.monotonic()
+        # warm diagrams builder is reused, json tables are generated in process by one worker: no pool start-up
+        changed_services = set()
+        if "specs" in stages:
+            changed_services = generate_specs(self.args.meta_path, self.configuration,
+                                              GitSpecsRepositoryHelper.topics_info_fname(), current_branch,
+                                              services_specs, "{}/specs".format(self.args.specs_repo_path), services,
+                                              GitSpecsRepositoryHelper.markdown_cache_fname(), 1,
+                                              self.specs_writer(), self.specs_bundle)
+        if "diagrams" in stages:
+            writer = await self.__diagrams_builder.build(services_specs, current_branch, services)
+            changed_services.update(writer.changed_services())
+        unpublished = UnpublishedServices(GitSpecsRepositoryHelper.unpublished_services_fname())
+        unpublished.add(changed_services)
+        unpublished.save()
+        logging.info("Specs watcher: {} services were regenerated in {:.2f} sec".format(len(services),
+                                                                                         time.monotonic() - ts))
+
+    async def run(self) -> int:
+        stages = self.stages
+        watcher = None
+        try:
+            if "validate" in stages and not await self.__validate():
+                return 1
+            current_branch = Branch(self.configuration["git"]["branch"])
+            async with self.stage("load"):
+                if self.args.watch:
+                    watcher = SpecsWatcher(self.args.meta_path, GitSpecsRepositoryHelper.topics_info_fname(),
+                                           current_branch)
+                    services_specs = watcher.services_specs
+                else:
+                    snapshot = ServicesSpecsSnapshot(GitSpecsRepositoryHelper.specs_snapshot_fname())
+                    services_specs = snapshot.load_or_create(self.args.meta_path,
+                                                             GitSpecsRepositoryHelper.topics_info_fname(),
+                                                             current_branch)
+                services = self.affected_services(services_specs, current_branch)
+            if "validate" in stages and not await self.__validate_graph(services_specs):
+                return 1
+
+            generate_tasks = []
+            if "specs" in stages:
+                generate_tasks.append(self.__generate_specs(services_specs, current_branch, services))
+            if "diagrams" in stages:
+                generate_tasks.append(self.__generate_diagrams(services_specs, current_branch, services))
+            unpublished = UnpublishedServices(GitSpecsRepositoryHelper.unpublished_services_fname())
+            for stage_changed_services in await asyncio.gather(*generate_tasks):
+                unpublished.add(stage_changed_services)
+            unpublished.save()
+            if self.args.publish_changed_only:
+                logging.info("{} services with changed specs/diagrams will be published".format(
+                    len(unpublished.services)))
+                services = set(unpublished.services) if services is None else services & unpublished.services
+
+            if watcher is not None:
+                # preview mode: confluence pages are not published on every edit
+                self.print_timings()
+                logging.info("Watching '{}' for changes...".format(self.args.meta_path))
+                await watcher.watch(self.__on_specs_change, self.args.watch_interval)
+
+            if "confluence" in stages:
+                if not await self.__publish(services_specs, current_branch, services):
+                    return 1
+                unpublished.remove(services)
+                unpublished.save()
+            return 0
+        finally:
+            self.print_timings()
+
+
+async def main():
+    app = App()
+    return await app.run()
+
+
+if __name__ == '__main__':
+    exit(asyncio.run(main()))
@@ -6,7 +6,12 @@ import os
 from core.app import AppCore
 from core.git.branch import Branch
 from core.git.specs_repo import GitSpecsRepositoryHelper
+from core.output_writer import OutputWriter
+from core.specs.snapshot import ServicesSpecsSnapshot
+from core.specs.validate.graph_lint import GraphLinter
 from core.specs.validate.specs_validator import SpecsValidator
+from core.specs.validate.topics_validator import TopicsValidator
+from core.unpublished_services import UnpublishedServices
 from specs_generator.generator import SpecsGenerator
 
 
@@ -27,6 +32,7 @@ class App(AppCore):
             "-c", "--config", dest="config", help="config", default=path + "/config/base.yaml",
             required=False)
         args_parser.add_argument('--validate', action='store_true')
+        AppCore.add_affected_only_args(args_parser)
 
         return args_parser
 
@@ -36,16 +42,37 @@ class App(AppCore):
 
     async def run(self) -> int:
         if self.args.validate:
-            specs_validator = SpecsValidator(self.args.meta_path)
-            valid, errors, warns = specs_validator.validate()
+            specs_validator = SpecsValidator(self.args.meta_path,
+                                             GitSpecsRepositoryHelper.schema_validation_cache_fname())
+            valid, errors, warns = specs_validator.validate(self.validated_services(specs_validator))
             specs_validator.print(errors, warns)
             if valid is False:
                 exit(1)
 
         current_branch = Branch(self.configuration["git"]["branch"])
+        snapshot = ServicesSpecsSnapshot(GitSpecsRepositoryHelper.specs_snapshot_fname())
+        services_specs = snapshot.load_or_create(self.args.meta_path, GitSpecsRepositoryHelper.topics_info_fname(),
+                                                 current_branch)
+        if self.args.validate:
+            topics_validator = TopicsValidator(services_specs, self.configuration['app']['dash_repo_path'])
+            valid, errors, warns = topics_validator.validate()
+            topics_validator.print(errors, warns)
+            graph_linter = GraphLinter(services_specs)
+            graph_valid, errors, warns = graph_linter.validate()
+            graph_linter.print(errors, warns)
+            if valid is False or graph_valid is False:
+                exit(1)
         generator = SpecsGenerator(self.args.meta_path, self.configuration,
-                                   GitSpecsRepositoryHelper.topics_info_fname(), current_branch)
-        generator.save("{}/specs".format(self.args.specs_repo_path))
+                                   GitSpecsRepositoryHelper.topics_info_fname(), current_branch, services_specs,
+                                   GitSpecsRepositoryHelper.markdown_cache_fname())
+        generator.save("{}/specs".format(self.args.specs_repo_path),
+                       self.affected_services(services_specs, current_branch),
+                       self.configuration['app']['specs_workers_cnt'],
+                       OutputWriter(self.args.specs_repo_path, GitSpecsRepositoryHelper.specs_manifest_fname()),
+                       bool(self.configuration['app']['specs_bundle']))
+        unpublished = UnpublishedServices(GitSpecsRepositoryHelper.unpublished_services_fname())
+        unpublished.add(generator.writer.changed_services())
+        unpublished.save()
         return 0
 
 
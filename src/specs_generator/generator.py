@@ -1,12 +1,15 @@
-import json
 import logging
 import os
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
-import markdown2
 from jinja2 import Template
 
 from core.git.branch import Branch
+from core.git.specs_bundle import SpecsBundle, SpecsBundleBuilder
+from core.output_writer import OutputWriter
+from core.render.markdown import MarkdownRenderer
+from core.specs.channels import ChannelKey
 from core.specs.service.connector import ChannelType
 from core.specs.service.spec import ServiceSpec, ServiceType
 from core.specs.specs import ServicesSpecs
@@ -23,10 +26,36 @@ class SpecsGenerator:
 
     __branch: Branch
 
-    def __init__(self, meta_path, app_configuration: dict, topics_info_filename: str, branch: Branch):
+    __markdown_renderer: MarkdownRenderer
+
+    __markdown_cache_fname: Optional[str]
+
+    __writer: Optional[OutputWriter]
+
+    __service_links: Dict[str, Optional[str]]
+
+    __participant_links: Dict[str, Optional[str]]
+
+    __participants_cells: Dict[Tuple[ChannelKey, str], Optional[str]]
+
+    min_parallel_services_cnt = 64
+
+    max_batch_size = 32
+
+    def __init__(self, meta_path, app_configuration: dict, topics_info_filename: str, branch: Branch,
+                 services_specs: Optional[ServicesSpecs] = None, markdown_cache_fname: Optional[str] = None):
         self.conf = app_configuration
         self.__branch = branch
-        self.services_specs = ServicesSpecs(meta_path, topics_info_filename, branch)
+        if services_specs is None:
+            services_specs = ServicesSpecs(meta_path, topics_info_filename, branch)
+        self.services_specs = services_specs
+        self.__markdown_cache_fname = markdown_cache_fname
+        self.__writer = None
+        self.__service_links = {}
+        self.__participant_links = {}
+        self.__participants_cells = {}
+        self.__markdown_renderer = MarkdownRenderer(services_specs.settings.markdown_template_vars,
+                                                    markdown_cache_fname)
 
     def is_show_service(self, service_specs: ServiceSpec):
         if self.__branch.is_release and not service_specs.is_release_service:
@@ -42,6 +71,8 @@ class SpecsGenerator:
         return "<a href=\"{}\">{}</a>".format(link, title)
 
     def service_link(self, service_name):
+        if service_name in self.__service_links:
+            return self.__service_links[service_name]
         service = self.services_specs.get_service_spec(service_name)
         if service.service_module == 'external':
             link = None
@@ -50,32 +81,31 @@ class SpecsGenerator:
                 self.services_specs.settings.confluence.link,
                 self.services_specs.settings.confluence.space,
                 service.wiki_name)
+        self.__service_links[service_name] = link
         return link
 
-    def get_topics_info_from_producer(self, kafka_service_name: str, topic_name: str) -> Optional[dict]:
-        for service_name in self.services_specs.available_services:
-            service_specs = self.services_specs.get_service_spec(service_name)
-            if service_specs.raw is None or \
-                    'connect_to' not in service_specs.raw or \
-                    service_specs.raw['connect_to'] is None:
-                continue
-            for c in service_specs.raw['connect_to']:
-                if "topics" not in c or \
-                        not isinstance(c["topics"], list) or \
-                        c['name'] != kafka_service_name or \
-                        c['data_direction'] != "tx":
-                    continue
-                for topic in c['topics']:
-                    if topic['name'] == topic_name:
-                        return topic
-        return None
+    def participant_link(self, service_name: str) -> Optional[str]:
+        """Link of a producer/consumer with the status prefix, None if the service is not shown on the branch."""
+        if service_name in self.__participant_links:
+            return self.__participant_links[service_name]
+        service_spec = self.services_specs.get_service_spec(service_name)
+        if not self.is_show_service(service_spec):
+            html = None
+        else:
+            if not service_spec.is_release_service:
+                postfix_name = "[{}]".format(service_spec.raw["status"])
+            else:
+                postfix_name = ""
+            html = self.html_link(self.service_link(service_name), postfix_name + service_spec.service_name)
+        self.__participant_links[service_name] = html
+        return html
 
+    @property
+    def markdown_renderer(self) -> MarkdownRenderer:
+        return self.__markdown_renderer
 
     def markdown2html(self, md_template_text: str) -> str:
-        j2_template = Template(md_template_text)
-        vars = self.services_specs.settings.markdown_template_vars
-        md_text = j2_template.render(vars)
-        return markdown2.markdown(md_text)
+        return self.__markdown_renderer.render(md_template_text)
 
     def build_service_topics_table(self, service: ServiceSpec, direction: str):
         if service is None or len(service.connectors) == 0:
@@ -108,22 +138,9 @@ class SpecsGenerator:
                     if topic_info is not None and "protocol" in topic_info and topic_info["protocol"] is not None:
                         row["Protocol"] = self.markdown2html(topic_info["protocol"])
 
-                    if direction == "rx":
-                        producer_topic_info = self.get_topics_info_from_producer(connector.dest.service_name, channel_name)
-                        if producer_topic_info is not None and \
-                                "Description" not in row and \
-                                "desc" in producer_topic_info and \
-                                producer_topic_info['desc'] is not None and \
-                                len(producer_topic_info['desc']) > 0:
-                            row["Description"] = self.markdown2html(producer_topic_info["desc"])
-                        if producer_topic_info is not None and \
-                                "Protocol" not in row and \
-                                "protocol" in producer_topic_info and \
-                                producer_topic_info["protocol"] is not None:
-                            row["Protocol"] = self.markdown2html(producer_topic_info["protocol"])
-
-                    self.__producers_row(connector.dest, channel_name, row)
-                    self.__consumers_row(connector.dest, channel_name, row)
+                    channel_key = ChannelKey(broker.service_name, connector.channel_type, channel_name)
+                    self.__producers_row(channel_key, row)
+                    self.__consumers_row(channel_key, row)
                     if 'Producers' not in row:
                         row['Producers'] = "-"
                     if 'Consumers' not in row:
@@ -154,8 +171,9 @@ class SpecsGenerator:
                             channel['desc']) > 0:
                         row["Description"] = self.markdown2html(channel["desc"])
 
-                    self.__producers_row(connector.dest, channel_name, row)
-                    self.__consumers_row(connector.dest, channel_name, row)
+                    channel_key = ChannelKey(broker.service_name, connector.channel_type, channel_name)
+                    self.__producers_row(channel_key, row)
+                    self.__consumers_row(channel_key, row)
                     if 'Producers' not in row:
                         row['Producers'] = "-"
                     if 'Consumers' not in row:
@@ -186,8 +204,9 @@ class SpecsGenerator:
                         row["Description"] = self.markdown2html(channel["desc"])
                     elif queue_info is  not None and "desc" in queue_info:
                         row["Description"] = self.markdown2html(queue_info["desc"])
-                    self.__producers_row(connector.dest, channel_name, row)
-                    self.__consumers_row(connector.dest, channel_name, row)
+                    channel_key = ChannelKey(broker.service_name, connector.channel_type, channel_name)
+                    self.__producers_row(channel_key, row)
+                    self.__consumers_row(channel_key, row)
                     if 'Producers' not in row:
                         row['Producers'] = "-"
                     if 'Consumers' not in row:
@@ -195,48 +214,29 @@ class SpecsGenerator:
                     rows.append(row)
         return rows
 
-    def __producers_row(self, service: ServiceSpec, channel_name, output_row):
-        if service.is_kafka_broker:
-            channel = service.topics[channel_name]
-        if service.is_celery_broker:
-            channel = service.celery_tasks[channel_name]
-        if service.is_mq_broker:
-            channel = service.queues[channel_name]
-
-        if channel is not None and 'tx' in channel:
-            for service_name in channel['tx']:
-                service_spec = self.services_specs.get_service_spec(service_name)
-                if not self.is_show_service(service_spec):
-                    continue
-                if not service_spec.is_release_service:
-                    postfix_name = "[{}]".format(service_spec.raw["status"])
-                else:
-                    postfix_name = ""
-                html_link = self.html_link(self.service_link(service_name), postfix_name + service_spec.service_name)
-                if 'Producers' not in output_row:
-                    output_row['Producers'] = ""
-                output_row['Producers'] = str(output_row['Producers']) + " " + html_link
-
-    def __consumers_row(self, service: ServiceSpec, channel_name, output_row):
-        if service.is_kafka_broker:
-            channel = service.topics[channel_name]
-        if service.is_celery_broker:
-            channel = service.celery_tasks[channel_name]
-        if service.is_mq_broker:
-            channel = service.queues[channel_name]
-        if channel is not None and 'rx' in channel:
-            for service_name in channel['rx']:
-                service_spec = self.services_specs.get_service_spec(service_name)
-                if not self.is_show_service(service_spec):
-                    continue
-                if not service_spec.is_release_service:
-                    postfix_name = "[{}]".format(service_spec.raw["status"])
-                else:
-                    postfix_name = ""
-                if 'Consumers' not in output_row:
-                    output_row['Consumers'] = ""
-                html_link = self.html_link(self.service_link(service_name), postfix_name + service_spec.service_name)
-                output_row['Consumers'] = str(output_row['Consumers']) + " " + html_link
+    def __participants_cell(self, key: ChannelKey, direction: str) -> Optional[str]:
+        # the same channel is shown in the broker table and in the tables of all its producers and consumers
+        cell_key = (key, direction)
+        if cell_key in self.__participants_cells:
+            return self.__participants_cells[cell_key]
+        cell = None
+        channels = self.services_specs.channels
+        participants = channels.producers(key) if direction == "tx" else channels.consumers(key)
+        links = [link for link in map(self.participant_link, participants) if link is not None]
+        if len(links) > 0:
+            cell = " " + " ".join(links)
+        self.__participants_cells[cell_key] = cell
+        return cell
+
+    def __producers_row(self, key: ChannelKey, output_row):
+        cell = self.__participants_cell(key, 'tx')
+        if cell is not None:
+            output_row['Producers'] = cell
+
+    def __consumers_row(self, key: ChannelKey, output_row):
+        cell = self.__participants_cell(key, 'rx')
+        if cell is not None:
+            output_row['Consumers'] = cell
 
     def build_topics_usage_table(self, service: ServiceSpec):
         rows = []
@@ -245,8 +245,9 @@ class SpecsGenerator:
             row = {
                 'Topic': topic_name,
             }
-            self.__producers_row(service, topic_name, row)
-            self.__consumers_row(service, topic_name, row)
+            channel_key = ChannelKey(service.service_name, ChannelType.topic, topic_name)
+            self.__producers_row(channel_key, row)
+            self.__consumers_row(channel_key, row)
 
             if 'Producers' not in row and 'Consumers' not in row:
                 continue
@@ -276,8 +277,9 @@ class SpecsGenerator:
             row = {
                 'Queue': queue_name,
             }
-            self.__producers_row(service, queue_name, row)
-            self.__consumers_row(service, queue_name, row)
+            channel_key = ChannelKey(service.service_name, ChannelType.queue, queue_name)
+            self.__producers_row(channel_key, row)
+            self.__consumers_row(channel_key, row)
 
             if 'Producers' not in row and 'Consumers' not in row:
                 continue
@@ -306,8 +308,9 @@ class SpecsGenerator:
             row = {
                 'Task': task_name,
             }
-            self.__producers_row(service, task_name, row)
-            self.__consumers_row(service, task_name, row)
+            channel_key = ChannelKey(service.service_name, ChannelType.celery_task, task_name)
+            self.__producers_row(channel_key, row)
+            self.__consumers_row(channel_key, row)
 
             if 'Producers' not in row and 'Consumers' not in row:
                 continue
@@ -356,32 +359,27 @@ class SpecsGenerator:
                     row["Description"] = c["desc"]
                 rx_rows_dict[connect_to_service.service_name] = row
 
-        for tx_service_name in self.services_specs.available_services:
-            tx_service_specs = self.services_specs.get_service_spec(tx_service_name)
-            if tx_service_specs is not None and \
-                    'connect_to' in tx_service_specs.raw and \
-                    tx_service_specs.raw['connect_to'] is not None:
-                for c in tx_service_specs.raw['connect_to']:
-                    if c['name'] != service_name:
-                        continue
-                    if tx_service_specs.service_module == 'external':
-                        tx_service_link = ""
-                    else:
-                        wiki_link = self.services_specs.settings.confluence.link
-                        wiki_space = self.services_specs.settings.confluence.space
-                        tx_service_link = '{}/{}/'.format(wiki_link, wiki_space) + tx_service_specs.wiki_name
-                    protocol = c["transport"]
-                    if "protocol" in c:
-                        protocol = c["protocol"]
-                    row = {
-                        "ServiceName": self.html_link(tx_service_link, tx_service_specs.wiki_name),
-                        "ConnectDirection": "Inbound",
-                        "Protocol": protocol,
-                        "Description": " "
-                    }
-                    if "desc" in c:
-                        row["Description"] = c["desc"]
-                    tx_rows_dict[tx_service_specs.service_name] = row
+        for connector in self.services_specs.channels.inbound_connectors(service_name):
+            tx_service_specs = connector.source
+            c = connector.raw
+            if tx_service_specs.service_module == 'external':
+                tx_service_link = ""
+            else:
+                wiki_link = self.services_specs.settings.confluence.link
+                wiki_space = self.services_specs.settings.confluence.space
+                tx_service_link = '{}/{}/'.format(wiki_link, wiki_space) + tx_service_specs.wiki_name
+            protocol = c["transport"]
+            if "protocol" in c:
+                protocol = c["protocol"]
+            row = {
+                "ServiceName": self.html_link(tx_service_link, tx_service_specs.wiki_name),
+                "ConnectDirection": "Inbound",
+                "Protocol": protocol,
+                "Description": " "
+            }
+            if "desc" in c:
+                row["Description"] = c["desc"]
+            tx_rows_dict[tx_service_specs.service_name] = row
 
         for s in rx_rows_dict:
             rows.append(rx_rows_dict[s])
@@ -409,44 +407,161 @@ class SpecsGenerator:
             rows.append(row)
         return rows
 
-    @staticmethod
-    def store_as_json_file(obj, fname):
-        with open(fname, 'w+', encoding='utf-8') as f:
-            json.dump(obj, f, ensure_ascii=False, indent=4)
-
-    def save(self, output_path: str):
-        for service_name in self.services_specs.available_services:
-            service_dir = output_path + "/" + service_name
-            service_specs = self.services_specs.get_service_spec(service_name)
-            if not os.path.exists(service_dir):
-                os.makedirs(service_dir)
-
-            internal_storages_table = self.build_internal_storages_table(service_name)
-            self.store_as_json_file(internal_storages_table, service_dir + "/internal_storages.json")
-
-            network_table = self.build_service_network_table(service_name)
-            self.store_as_json_file(network_table, service_dir + "/network.json")
-
-            if service_specs.is_broker:
-                if service_specs.celery_tasks is not None:
-                    tasks_usage_table = self.build_celery_tasks_usage_table(service_specs)
-                    self.store_as_json_file(tasks_usage_table, service_dir + "/celery_tasks.json")
-                if service_specs.topics is not None:
-                    topics_usage_table = self.build_topics_usage_table(service_specs)
-                    self.store_as_json_file(topics_usage_table, service_dir + "/topics.json")
-                if service_specs.queues is not None:
-                    queues_usage_table = self.build_queues_usage_table(service_specs)
-                    self.store_as_json_file(queues_usage_table, service_dir + "/queues.json")
+    @property
+    def writer(self) -> Optional[OutputWriter]:
+        return self.__writer
+
+    @writer.setter
+    def writer(self, writer: OutputWriter):
+        self.__writer = writer
+
+    def store_as_json_file(self, obj, fname):
+        self.__writer.write_json(fname, obj)
+
+    def build_service_tables(self, service_name: str) -> Dict[str, list]:
+        service_specs = self.services_specs.get_service_spec(service_name)
+        tables = {
+            "internal_storages": self.build_internal_storages_table(service_name),
+            "network": self.build_service_network_table(service_name)
+        }
+        if service_specs.is_broker:
+            if service_specs.celery_tasks is not None:
+                tables["celery_tasks"] = self.build_celery_tasks_usage_table(service_specs)
+            if service_specs.topics is not None:
+                tables["topics"] = self.build_topics_usage_table(service_specs)
+            if service_specs.queues is not None:
+                tables["queues"] = self.build_queues_usage_table(service_specs)
+        else:
+            tables["rx_topics"] = self.build_service_topics_table(service_specs, "rx")
+            tables["tx_topics"] = self.build_service_topics_table(service_specs, "tx")
+            tables["rx_celery_tasks"] = self.build_service_tasks_table(service_specs, "rx")
+            tables["tx_celery_tasks"] = self.build_service_tasks_table(service_specs, "tx")
+            tables["rx_queues"] = self.build_service_queues_table(service_specs, "rx")
+            tables["tx_queues"] = self.build_service_queues_table(service_specs, "tx")
+        return tables
+
+    def save_service(self, output_path: str, service_name: str):
+        service_dir = output_path + "/" + service_name
+        if not os.path.exists(service_dir):
+            os.makedirs(service_dir)
+        for table, rows in self.build_service_tables(service_name).items():
+            self.store_as_json_file(rows, "{}/{}.json".format(service_dir, table))
+
+    def bundle_service(self, service_name: str) -> List[Tuple[str, str, bytes]]:
+        builder = SpecsBundleBuilder()
+        builder.add(service_name, self.build_service_tables(service_name))
+        return builder.entries
+
+    def __save_parallel(self, output_path: str, service_names: List[str], workers_cnt: int,
+                        bundle: Optional[SpecsBundleBuilder]):
+        # services are sharded in contiguous batches, every worker gets the specs once by the initializer
+        batch_size = max(1, min(self.max_batch_size, len(service_names) // (workers_cnt * 4)))
+        batches = [service_names[i:i + batch_size] for i in range(0, len(service_names), batch_size)]
+        with ProcessPoolExecutor(max_workers=workers_cnt,
+                                 initializer=init_worker,
+                                 initargs=(self.conf, self.__branch, self.services_specs,
+                                           self.__markdown_cache_fname,
+                                           self.__writer.root_path, self.__writer.manifest_fname)) as executor:
+            batches_results = executor.map(save_services_batch,
+                                           [output_path] * len(batches),
+                                           batches,
+                                           [bundle is not None] * len(batches))
+            # results are merged by the service names in the order of the services
+            for batch, results in zip(batches, batches_results):
+                for service_name in batch:
+                    rendered, updated, changed, entries = results[service_name]
+                    self.__markdown_renderer.add(rendered)
+                    self.__writer.merge(updated, changed)
+                    if bundle is not None:
+                        bundle.extend(entries)
+
+    def __save_bundle(self, output_path: str, service_names: List[str], workers_cnt: int):
+        bundle_fname = SpecsBundle.fname(output_path)
+        base = SpecsBundle.load(bundle_fname)
+        # the services which are not in the previous bundle (or all services without it) are generated as well,
+        # otherwise a scoped run would write the bundle with only the requested services
+        generated = set(service_names)
+        service_names = service_names + [service_name for service_name in self.services_specs.available_services
+                                         if service_name not in generated and
+                                         (base is None or not base.tables(service_name))]
+        builder = SpecsBundleBuilder()
+        if workers_cnt > 1 and len(service_names) >= self.min_parallel_services_cnt:
+            self.__save_parallel(output_path, service_names, workers_cnt, builder)
+        else:
+            for service_name in service_names:
+                builder.extend(self.bundle_service(service_name))
+        # the tables of the services which were not regenerated are kept from the previous bundle
+        if base is not None:
+            generated = set(service_names)
+            for service_name in self.services_specs.available_services:
+                if service_name in generated:
+                    continue
+                for table in base.tables(service_name):
+                    builder.add_raw(service_name, table, base.raw_table(service_name, table))
+            base.close()
+        builder.sort(list(self.services_specs.available_services))
+        builder.save(bundle_fname, self.__writer, base)
+
+    def save(self,
+             output_path: str,
+             services: Optional[Set[str]] = None,
+             workers_cnt: int = 1,
+             writer: Optional[OutputWriter] = None,
+             bundle: bool = False):
+        """
+        Files are written by the writer only if they were changed, see writer.changed_services().
+        With bundle=True all tables are written to one indexed JSON-lines file instead of <service>/<table>.json.
+        """
+        self.__writer = writer if writer is not None else OutputWriter(output_path)
+        service_names = [service_name for service_name in self.services_specs.available_services
+                         if services is None or service_name in services]
+        if bundle:
+            self.__save_bundle(output_path, service_names, workers_cnt)
+        else:
+            # the stale bundle would shadow the files for the readers
+            SpecsBundle.remove(SpecsBundle.fname(output_path))
+            if workers_cnt > 1 and len(service_names) >= self.min_parallel_services_cnt:
+                self.__save_parallel(output_path, service_names, workers_cnt, None)
             else:
-                rx_topics_table = self.build_service_topics_table(service_specs, "rx")
-                self.store_as_json_file(rx_topics_table, service_dir + "/rx_topics.json")
-                tx_topics_table = self.build_service_topics_table(service_specs, "tx")
-                self.store_as_json_file(tx_topics_table, service_dir + "/tx_topics.json")
-                rx_tasks_table = self.build_service_tasks_table(service_specs, "rx")
-                self.store_as_json_file(rx_tasks_table, service_dir + "/rx_celery_tasks.json")
-                tx_tasks_table = self.build_service_tasks_table(service_specs, "tx")
-                self.store_as_json_file(tx_tasks_table, service_dir + "/tx_celery_tasks.json")
-                rx_queues_table = self.build_service_queues_table(service_specs, "rx")
-                self.store_as_json_file(rx_queues_table, service_dir + "/rx_queues.json")
-                tx_queues_table = self.build_service_queues_table(service_specs, "tx")
-                self.store_as_json_file(tx_queues_table, service_dir + "/tx_queues.json")
\ No newline at end of file
+                for service_name in service_names:
+                    self.save_service(output_path, service_name)
+        self.__writer.save_manifest(self.services_specs.all_services)
+        self.__markdown_renderer.save()
+        logging.debug("Markdown renderer: {} hits, {} misses".format(self.__markdown_renderer.hits,
+                                                                     self.__markdown_renderer.misses))
+
+_worker_generator: Optional[SpecsGenerator] = None
+
+
+def init_worker(app_configuration: dict,
+                branch: Branch,
+                services_specs: ServicesSpecs,
+                markdown_cache_fname: Optional[str],
+                output_root_path: str,
+                output_manifest_fname: Optional[str]):
+    global _worker_generator
+    _worker_generator = SpecsGenerator(None, app_configuration, None, branch, services_specs, markdown_cache_fname)
+    # the manifest is read by the workers, the parent process merges the results and saves it
+    _worker_generator.writer = OutputWriter(output_root_path, output_manifest_fname)
+
+
+def save_services_batch(output_path: str,
+                        service_names: List[str],
+                        bundle: bool = False) -> Dict[str, Tuple[Dict[str, str], Dict[str, dict], List[str],
+                                                                 List[Tuple[str, str, bytes]]]]:
+    """
+    Returns by the service name: html rendered for the service, the written files and the serialized tables
+    of the bundle to be merged by the parent process.
+    """
+    renderer = _worker_generator.markdown_renderer
+    writer = _worker_generator.writer
+    results = {}
+    for service_name in service_names:
+        entries = []
+        if bundle:
+            entries = _worker_generator.bundle_service(service_name)
+        else:
+            _worker_generator.save_service(output_path, service_name)
+        updated, changed = writer.take_written()
+        results[service_name] = (renderer.take_rendered(), updated, changed, entries)
+    return results
@@ -0,0 +1,95 @@
+import json
+import os
+
+import pytest
+
+from core.config.loader import ConfigurationLoader
+from core.git.branch import Branch
+from core.git.specs_repo import GitSpecsRepositoryHelper
+from core.output_writer import OutputWriter
+from core.specs.specs import ServicesSpecs
+from core.tests.conftest import META_PATH, meta_path, read_category, write_category  # noqa: F401
+from specs_generator.generator import SpecsGenerator
+
+CONFIG_FNAME = os.path.join(os.path.dirname(__file__), "../config/base.yaml")
+
+
+def read_tree(path: str) -> dict:
+    files = {}
+    for root, dirs, fnames in os.walk(path):
+        for fname in fnames:
+            full_fname = os.path.join(root, fname)
+            with open(full_fname, 'rb') as f:
+                files[os.path.relpath(full_fname, path)] = f.read()
+    return files
+
+
+def save_specs(repo_path: str, workers_cnt: int, bundle: bool) -> OutputWriter:
+    branch = Branch("develop")
+    topics_info_fname = "{}/topics_info.yaml".format(repo_path)
+    services_specs = ServicesSpecs(META_PATH, topics_info_fname, branch)
+    generator = SpecsGenerator(META_PATH, ConfigurationLoader.load(CONFIG_FNAME), topics_info_fname, branch,
+                               services_specs)
+    writer = OutputWriter(repo_path)
+    generator.save("{}/specs".format(repo_path), None, workers_cnt, writer, bundle)
+    return writer
+
+
+@pytest.mark.parametrize("bundle", [False, True])
+def test_parallel_output_is_identical(tmp_path, monkeypatch, bundle):
+    # the example meta is small, every service gets its own batch
+    monkeypatch.setattr(SpecsGenerator, "min_parallel_services_cnt", 1)
+    sequential_writer = save_specs(str(tmp_path / "sequential"), 1, bundle)
+    parallel_writer = save_specs(str(tmp_path / "parallel"), 2, bundle)
+
+    sequential = read_tree(str(tmp_path / "sequential"))
+    assert len(sequential) > 0
+    assert read_tree(str(tmp_path / "parallel")) == sequential
+    assert parallel_writer.changed == sequential_writer.changed
+    assert parallel_writer.changed_services() == sequential_writer.changed_services()
+
+
+def test_bundle_round_trip(tmp_path, monkeypatch):
+    files_path = str(tmp_path / "files")
+    bundle_path = str(tmp_path / "bundle")
+    save_specs(files_path, 1, False)
+    save_specs(bundle_path, 1, True)
+
+    files_tables = {}
+    for fname, data in read_tree(files_path).items():
+        specs_dir, service_name, table_fname = fname.split(os.sep)
+        files_tables[(service_name, os.path.splitext(table_fname)[0])] = data
+    assert len(files_tables) > 0
+    # no json tables are written to specs/<service>/ in the bundle mode
+    assert set(os.listdir(os.path.join(bundle_path, "specs"))) == {"bundle.jsonl", "bundle.index.json"}
+
+    monkeypatch.setattr(GitSpecsRepositoryHelper, "repo_path", bundle_path, raising=False)
+    bundle = GitSpecsRepositoryHelper.specs_bundle()
+    assert {(s, t) for s in bundle.services for t in bundle.tables(s)} == set(files_tables)
+    for (service_name, table), data in files_tables.items():
+        assert GitSpecsRepositoryHelper.specs_table(service_name, table) == json.loads(data)
+
+
+def test_participants_are_taken_from_channel_graph(meta_path):
+    feature = read_category(meta_path, "feature")
+    feature["relay"] = dict(feature["api"], connect_to=[
+        {"name": "kafka", "data_direction": "rx", "offset_storage": "kafka", "topics": {"jaeger-spans": None}},
+        {"name": "kafka", "data_direction": "tx", "topics": {"jaeger-spans": None}}])
+    write_category(meta_path, "feature", feature)
+    branch = Branch("develop")
+    services_specs = ServicesSpecs(meta_path, "{}/topics_info.yaml".format(meta_path), branch)
+    generator = SpecsGenerator(meta_path, ConfigurationLoader.load(CONFIG_FNAME), None, branch, services_specs)
+
+    rows = generator.build_topics_usage_table(services_specs.get_service_spec("kafka"))
+    assert len(rows) == 1
+    key = services_specs.channels.channels("kafka")[0]
+    assert set(services_specs.channels.producers(key)) == {"jaeger-collector", "relay"}
+    assert rows[0]["Producers"].count("<a ") == 2 and ">relay<" in rows[0]["Producers"]
+    assert set(services_specs.channels.consumers(key)) == {"jaeger-ingester", "relay"}
+    assert rows[0]["Consumers"].count("<a ") == 2 and ">relay<" in rows[0]["Consumers"]
+
+    # the cells of the producers and consumers tables are the same as of the broker table
+    for service_name, direction in (("jaeger-ingester", "rx"), ("jaeger-collector", "tx")):
+        service_rows = generator.build_service_topics_table(services_specs.get_service_spec(service_name), direction)
+        assert service_rows[0]["Producers"] == rows[0]["Producers"]
+        assert service_rows[0]["Consumers"] == rows[0]["Consumers"]